@@ -17,8 +17,12 @@ def main():
         pyglet.app.run()
     finally:
         logger.info('shutting down Client')
-        window.gameClient.quit()
+        window.gameClient.close()
 
 
 if __name__ == '__main__':
+    import multiprocessing
+
+    # the texture decoding workers are spawned processes, starting from this script in the packaged client
+    multiprocessing.freeze_support()
     main()
@@ -5,11 +5,25 @@ from pyglet.window import key
 
 from ahriman import logger
 from ahriman import strings
+from ahriman.profiler import Profiler
 
 
 class Activity(metaclass=ABCMeta):
     """interface defining base interactions with the window for different views"""
 
+    # shows the profiler overlay, with shift: starts recording a trace or saves it
+    PROFILER_KEY = key.F3
+
+    # handlers of the events by (kind, subkind), filled from the methods decorated by events.handles
+    HANDLERS = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.HANDLERS = dict(cls.HANDLERS)
+        for attribute in vars(cls).values():
+            for event_key in getattr(attribute, 'handled_events', ()):
+                cls.HANDLERS[event_key] = attribute
+
     def __init__(self, window):
         self.window = window
 
@@ -35,6 +49,13 @@ class Activity(metaclass=ABCMeta):
         pass
 
     def event_handler(self, event):
+        handler = self.HANDLERS.get(event.key)
+        if handler is None:
+            self.unhandled_event(event)
+        else:
+            handler(self, event)
+
+    def unhandled_event(self, event):
         logger.warning(event, title="unhandled event in {}".format(self))
 
     def on_key_press(self, KEY, _MOD):
@@ -42,6 +63,11 @@ class Activity(metaclass=ABCMeta):
             from .popupActivity import PopupActivity
             self.window.force_activity(PopupActivity(self.window, self, strings.QUIT_POPUP_MESSAGE,
                                                      on_true=self.window.close, no_option=True))
+        elif KEY == Activity.PROFILER_KEY:
+            if _MOD & key.MOD_SHIFT:
+                Profiler.toggle_trace()
+            else:
+                Profiler.toggle()
 
     @abstractmethod
     def draw(self):
@@ -1,11 +1,11 @@
-import pickle
-
 from pyglet.window import key
 
 from ahriman import constants, logger
 from ahriman import strings
+from ahriman.events import handles
 from ahriman.game import Game
 from ahriman.game import Overlay
+from ahriman.game.board_state import BoardState
 from . import Activity
 from .popupActivity import PopupActivity
 from .timerActivity import TimerActivity
@@ -24,10 +24,15 @@ class GameActivity(Activity):
 
         self.overlay = Overlay(window, player_names)
 
+        # set while waiting for the answer to a state request
+        self.state_requested = False
+
         if player_num == 0 and not reconnection:
             self.game.init_board()
             self.send_state()
             self.overlay.update(self.game.state_dict)
+        elif reconnection:
+            self.request_state()
 
     def on_mouse_move(self, x, y):
         self.game.on_mouse_move(x, y)
@@ -58,69 +63,111 @@ class GameActivity(Activity):
         self.game.draw()
         self.overlay.draw()
 
-    def event_handler(self, event):
+    @handles(constants.Event.GAME_EVENT, constants.GameEvent.CONNECTION)
+    def on_connection(self, event):
+        if event.info.connection:
+            self.unhandled_event(event)
+        else:
+            from .homeActivity import HomeActivity
+            back = lambda: self.window.change_activity(HomeActivity(self.window),
+                                                       fade_out=True, fade_in=True)
 
-        if event[0] == constants.Event.GAME_EVENT:
+            player_num = event.info.player.playerNum
+            self.game.disconnect(player_num)
 
-            if event[1] == constants.GameEvent.CONNECTION:
-                if event[2].connection:
-                    super().event_handler(event)
-                else:
-                    from .homeActivity import HomeActivity
-                    back = lambda: self.window.change_activity(HomeActivity(self.window),
-                                                               fade_out=True, fade_in=True)
+            self.window.force_activity(
+                TimerActivity(self.window, self, strings.PLAYER_DISCONNECTED_TIMER,
+                              yes_title=strings.LEAVE_BUTTON,
+                              timer=constants.LEAVING_TIMEOUT, on_true=back,
+                              resume_on_event=False))
 
-                    player_num = event[2].player.playerNum
-                    self.game.disconnect(player_num)
+    @handles(constants.Event.GAME_EVENT, constants.GameEvent.ACTION)
+    def on_action(self, event):
+        if event.action == constants.GameAction.TURN_DONE:
+            self.game.validate_turn(player_num=event.player)
 
-                    self.window.force_activity(
-                        TimerActivity(self.window, self, strings.PLAYER_DISCONNECTED_TIMER,
-                                      yes_title=strings.LEAVE_BUTTON,
-                                      timer=constants.LEAVING_TIMEOUT, on_true=back,
-                                      resume_on_event=False))
+        else:
+            if not self.game.perform(player=event.player, action=event.action, coord=event.coord):
+                self.hack_detected()
+            else:
+                self.overlay.update(self.game.state_dict)
 
-            elif event[1] == constants.GameEvent.ACTION:
+    @handles(constants.Event.GAME_EVENT, constants.GameEvent.ROOM_FULL)
+    def on_room_full(self, event):
+        # the game stream was reopened, the lost messages are sent again by the client
+        logger.confirm('all players connected')
 
-                if event[2] == constants.GameAction.TURN_DONE:
-                    self.game.validate_turn(player_num=event[3])
+    @handles(constants.Event.GAME_EVENT, constants.GameEvent.BOARD_STATE)
+    def on_board_state(self, event):
+        self.sync_state(event.board_bytes)
 
-                else:
-                    if not self.game.perform(player=event[3], action=event[2], coord=event[4]):
-                        self.hack_detected()
-                    else:
-                        self.overlay.update(self.game.state_dict)
+    @handles(constants.Event.GAME_EVENT, constants.GameEvent.OUT_OF_SYNC)
+    def on_out_of_sync(self, event):
+        self.request_state()
 
-            elif event[1] == constants.GameEvent.BOARD_STATE:
-                if (not self.game.initialized) and (event[2].issuer == 0 or self.reconnection):
-                    load_state = pickle.loads(event[2].state)
-                    self.game.load_state(load_state)
-                    self.overlay.update(self.game.state_dict)
+    @handles(constants.Event.PLAYER_EVENT, constants.PlayerEvent.END_TURN)
+    def on_end_turn(self, event):
+        self.game.validate_turn()
 
-                else:
-                    self.hack_detected()
-                    return
+        self.overlay.update(self.game.state_dict)
 
-            else:
-                super().event_handler(event)
+    @handles(constants.Event.PLAYER_EVENT, constants.PlayerEvent.SYMBOLS_TOGGLE)
+    def on_symbols_toggle(self, event):
+        self.game.graphic_board.toggle_symbols(event.shown)
 
-        elif event[0] == constants.Event.PLAYER_EVENT:
-            if event[1] == constants.PlayerEvent.END_TURN:
-                self.game.validate_turn()
+    def send_state(self, since=None):
+        """send the board to the other players, only the changes after turn since if possible"""
+        byte_state = None
+        if since is not None:
+            byte_state = BoardState.encode_delta(self.game.logic, since)
+        if byte_state is None:
+            byte_state = BoardState.encode(self.game.logic)
+        self.window.gameClient.send_game_state(byte_state)
+
+    def request_state(self, full=False):
+        """ask the other players for the changes since the last known turn, or for the whole board"""
+        turn = self.game.logic.turn if self.game.initialized and not full else None
+        self.state_requested = True
+        self.window.gameClient.send_game_state(BoardState.encode_request(turn))
+
+    def sync_state(self, board_bytes):
+        kind = BoardState.kind(board_bytes.state)
+
+        try:
+            if kind == BoardState.REQUEST:
+                since = BoardState.decode_request(board_bytes.state)
+                if self.game.initialized:
+                    self.send_state(since)
+
+            elif kind == BoardState.DELTA and self.state_requested and self.game.initialized:
+                try:
+                    to_update = BoardState.apply_delta(self.game.logic, board_bytes.state)
+                except ValueError as e:
+                    logger.warning(e, title='in GameActivity.sync_state')
+                    self.request_state(full=True)
+                    return
 
+                self.state_requested = False
+                self.game.refresh(to_update)
                 self.overlay.update(self.game.state_dict)
 
-            elif event[1] == constants.PlayerEvent.SYMBOLS_TOGGLE:
-                self.game.graphic_board.toggle_symbols(event[2])
+            elif kind == BoardState.SNAPSHOT and (self.state_requested or (
+                    not self.game.initialized and board_bytes.issuer == 0)):
+                load_state = BoardState.decode(board_bytes.state, tile_names=Game.OBJECTS_DICT['tiles'],
+                                               players=self.game.logic.total_players)
+                if (load_state.rows, load_state.cols) != (self.game.logic.rows, self.game.logic.cols):
+                    raise ValueError('invalid board size')
 
-            else:
-                super().event_handler(event)
+                self.state_requested = False
+                self.game.load_state(load_state)
+                self.overlay.update(self.game.state_dict)
 
-        else:
-            super().event_handler(event)
+            else:
+                self.hack_detected()
 
-    def send_state(self):
-        byte_state = pickle.dumps(self.game.logic)
-        self.window.gameClient.send_game_state(byte_state)
+        except ValueError as e:
+            logger.warning(e, title='invalid board state')
+            self.hack_detected()
 
     def on_key_press(self, KEY, _MOD):
         if KEY == key.ESCAPE:
@@ -132,6 +179,8 @@ class GameActivity(Activity):
                 TimerActivity(self.window, self, strings.QUIT_POPUP_MESSAGE, on_true=back,
                               no_option=True, timer=constants.LEAVING_TIMEOUT,
                               resume_on_event=True))
+        else:
+            super().on_key_press(KEY, _MOD)
 
     def delete(self):
         self.window.gameClient.quit()
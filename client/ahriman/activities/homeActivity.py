@@ -15,6 +15,7 @@ from ahriman.activities.customGUIs import FixOneTimeButton, FixButton
 from ahriman.activities.customGUIs import Themes
 from ahriman.activities.loadingActivity import LoadingActivity
 from ahriman.activities.popupActivity import PopupActivity
+from ahriman.events import ErrorEvent, handles
 
 
 class HomeActivity(Activity):
@@ -50,37 +51,33 @@ class HomeActivity(Activity):
     def on_resize(self, width, height):
         self.update_bg()
 
-    def event_handler(self, event):
-        if event[0] == constants.Event.SEARCH_EVENT:
-
-            if event[1] == constants.SearchEvent.GAME_FOUND:
-                self.window.change_activity(LoadingActivity(self.window), fade_in=True,
-                                            fade_out=True)
-
-            elif event[1] == constants.SearchEvent.PENDING_FOUND:
-                self.window.change_activity(LoadingActivity(self.window, reconnecting=True),
-                                            fade_in=True, fade_out=True)
-
-            elif event[1] == constants.SearchEvent.CANCELED:
-                logger.confirm('canceled game request')
-
-            elif event[1] == constants.SearchEvent.OUT_OF_ID:
-                self.playButton.change_state()
-                self.window.force_activity(PopupActivity(self.window, self, strings.NO_ROOMS_POPUP))
-
-            elif event[1] == constants.SearchEvent.ERROR:
-                self.playButton.change_state()
-                self.window.fire_event(
-                    (constants.Event.WINDOW_EVENT, constants.WindowEvent.ERROR, strings.SERVER_DOWN_POPUP),
-                    priority=True)
-
-            else:
-                super().event_handler(event)
-
-        elif event[0] == constants.Event.GAME_EVENT and event[1] == constants.GameEvent.END_OF_CONNECTION:
-            logger.confirm('game session closed')
-        else:
-            super().event_handler(event)
+    @handles(constants.Event.SEARCH_EVENT, constants.SearchEvent.GAME_FOUND)
+    def on_game_found(self, event):
+        self.window.change_activity(LoadingActivity(self.window), fade_in=True,
+                                    fade_out=True)
+
+    @handles(constants.Event.SEARCH_EVENT, constants.SearchEvent.PENDING_FOUND)
+    def on_pending_found(self, event):
+        self.window.change_activity(LoadingActivity(self.window, reconnecting=True),
+                                    fade_in=True, fade_out=True)
+
+    @handles(constants.Event.SEARCH_EVENT, constants.SearchEvent.CANCELED)
+    def on_search_canceled(self, event):
+        logger.confirm('canceled game request')
+
+    @handles(constants.Event.SEARCH_EVENT, constants.SearchEvent.OUT_OF_ID)
+    def on_out_of_id(self, event):
+        self.playButton.change_state()
+        self.window.force_activity(PopupActivity(self.window, self, strings.NO_ROOMS_POPUP))
+
+    @handles(constants.Event.SEARCH_EVENT, constants.SearchEvent.ERROR)
+    def on_search_error(self, event):
+        self.playButton.change_state()
+        self.window.fire_event(ErrorEvent(strings.SERVER_DOWN_POPUP), priority=True)
+
+    @handles(constants.Event.GAME_EVENT, constants.GameEvent.END_OF_CONNECTION)
+    def on_end_of_connection(self, event):
+        logger.confirm('game session closed')
 
     def delete(self):
         self.man.delete()
@@ -21,6 +21,8 @@ class IntroActivity(Activity):
 
         self.current_screen = 0
         self.ended = False
+        # the TLS handshakes with the servers happen while the intro plays
+        self.window.gameClient.warm_up()
         Themes.load()
         self.load_screen()
 
@@ -7,11 +7,15 @@ from ahriman import constants
 from ahriman import logger
 from ahriman.activities import Activity
 from ahriman.activities.gameActivity import GameActivity
+from ahriman.events import ErrorEvent, handles
 from ahriman.game import Game
 from ahriman.game import TextureManager
 
 
 class LoadingActivity(Activity):
+    # decoded texture frames gathered per update, decoding runs in background threads
+    COLLECT_SLICE = 16
+
     def __init__(self, window, reconnecting=False):
         super().__init__(window)
 
@@ -24,11 +28,20 @@ class LoadingActivity(Activity):
         self.update_bg()
 
         self.window.gameClient.start_game()
+        self.collecting = True
         try:
-            TextureManager.load_textures()
+            TextureManager.start_loading()
             Game.parse_logic()
         except Exception as e:
-            self.window.fire_event((constants.Event.WINDOW_EVENT, constants.WindowEvent.ERROR, str(e)), priority=True)
+            self.window.fire_event(ErrorEvent(str(e)), priority=True)
+
+    def update(self, dt, bg=False):
+        if self.collecting:
+            try:
+                self.collecting = not TextureManager.collect_textures(LoadingActivity.COLLECT_SLICE)
+            except Exception as e:
+                self.collecting = False
+                self.window.fire_event(ErrorEvent(str(e)), priority=True)
 
     def on_resize(self, width, height):
         self.update_bg()
@@ -37,28 +50,22 @@ class LoadingActivity(Activity):
         self.window.draw_2D()
         self.background.draw()
 
-    def event_handler(self, event):
-        if event[0] == constants.Event.GAME_EVENT:
-
-            if event[1] == constants.GameEvent.CONNECTION:
-                if event[2].connection:
-                    logger.info(event[2].player.playerID, title='player connected')
-                else:
-                    logger.info(event[2].player.playerID, title='player disconnected')
-
-            elif event[1] == constants.GameEvent.ROOM_FULL:
-                logger.confirm('all players connected')
-                player_names = [''] * event[2].roomSize
-                for player in event[2].player:
-                    player_names[player.playerNum] = player.playerID
-                self.window.change_activity(
-                    GameActivity(self.window, player_names, reconnection=self.reconnecting),
-                    fade_out=True, fade_in=True)
-
-            else:
-                super().event_handler(event)
+    @handles(constants.Event.GAME_EVENT, constants.GameEvent.CONNECTION)
+    def on_connection(self, event):
+        if event.info.connection:
+            logger.info(event.info.player.playerID, title='player connected')
         else:
-            super().event_handler(event)
+            logger.info(event.info.player.playerID, title='player disconnected')
+
+    @handles(constants.Event.GAME_EVENT, constants.GameEvent.ROOM_FULL)
+    def on_room_full(self, event):
+        logger.confirm('all players connected')
+        player_names = [''] * event.room.roomSize
+        for player in event.room.player:
+            player_names[player.playerNum] = player.playerID
+        self.window.change_activity(
+            GameActivity(self.window, player_names, reconnection=self.reconnecting),
+            fade_out=True, fade_in=True)
 
     def update_bg(self):
         h_scale = self.window.height / self.image.height
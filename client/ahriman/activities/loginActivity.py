@@ -14,6 +14,7 @@ from pyglet_gui.text_input import TextInput
 from ahriman import constants
 from ahriman import logger
 from ahriman import strings
+from ahriman.events import Event, ErrorEvent, handles
 from . import Activity
 from .customGUIs import FixOneTimeButton, PasswordInput, Themes
 from .homeActivity import HomeActivity
@@ -105,7 +106,7 @@ class LoginActivity(Activity):
             LoginActivity.logout()
 
         if self.password == '' or self.userID == '':
-            self.window.fire_event((constants.Event.AUTH_EVENT, constants.AuthEvent.REFUSED))
+            self.window.fire_event(Event(constants.Event.AUTH_EVENT, constants.AuthEvent.REFUSED))
             return
 
         logger.info('authenticating')
@@ -119,29 +120,25 @@ class LoginActivity(Activity):
     def on_resize(self, width, height):
         self.update_bg()
 
-    def event_handler(self, event):
-        if event[0] == constants.Event.AUTH_EVENT:
-            if event[1] == constants.AuthEvent.ERROR:
-                self.window.fire_event(
-                    (constants.Event.WINDOW_EVENT, constants.WindowEvent.ERROR, strings.SERVER_DOWN_POPUP),
-                    priority=True)
-
-            elif event[1] == constants.AuthEvent.SUCCESS:
-                if self.remember and event[2] != "":
-                    with open(LoginActivity.save_file, 'wb') as file:
-                        info_string = '\n'.join((self.userID, event[2]))
-                        encoded = base64.b64encode(info_string.encode())
-                        file.write(encoded)
-
-                self.window.change_activity(HomeActivity(self.window), fade_out=True, fade_in=True)
-
-            elif event[1] == constants.AuthEvent.REFUSED:
-                self.password_field.set_text('')
-                self.info_text.set_text(strings.INVALID_CREDENTIALS)
-                self.login_button.activate()
-
-        else:
-            super().event_handler(event)
+    @handles(constants.Event.AUTH_EVENT, constants.AuthEvent.ERROR)
+    def on_auth_error(self, event):
+        self.window.fire_event(ErrorEvent(strings.SERVER_DOWN_POPUP), priority=True)
+
+    @handles(constants.Event.AUTH_EVENT, constants.AuthEvent.SUCCESS)
+    def on_auth_success(self, event):
+        if self.remember and event.code != "":
+            with open(LoginActivity.save_file, 'wb') as file:
+                info_string = '\n'.join((self.userID, event.code))
+                encoded = base64.b64encode(info_string.encode())
+                file.write(encoded)
+
+        self.window.change_activity(HomeActivity(self.window), fade_out=True, fade_in=True)
+
+    @handles(constants.Event.AUTH_EVENT, constants.AuthEvent.REFUSED)
+    def on_auth_refused(self, event):
+        self.password_field.set_text('')
+        self.info_text.set_text(strings.INVALID_CREDENTIALS)
+        self.login_button.activate()
 
     def on_key_press(self, KEY, _MOD):
         if KEY == key.ENTER or KEY == key.NUM_ENTER:
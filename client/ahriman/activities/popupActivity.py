@@ -6,6 +6,7 @@ from pyglet_gui.gui import *
 
 from ahriman import logger
 from ahriman import strings
+from ahriman.activities import Activity
 from ahriman.activities.customGUIs import FixOneTimeButton, FullFrame, Themes
 from ahriman.activities.overLayerActivity import OverLayerActivity
 
@@ -73,7 +74,11 @@ class PopupActivity(OverLayerActivity):
         if self.resume_on_event:
             super().event_handler(event)
         else:
-            logger.warning(event, title='event ignored')
+            # only the events handled by the popup itself, the background activity is paused
+            Activity.event_handler(self, event)
+
+    def unhandled_event(self, event):
+        logger.warning(event, title='event ignored')
 
     def draw(self):
         super().draw()
@@ -5,6 +5,7 @@ from ahriman import constants
 from ahriman import logger
 from ahriman import strings
 from ahriman.activities.popupActivity import PopupActivity
+from ahriman.events import handles
 
 
 class TimerActivity(PopupActivity):
@@ -46,25 +47,15 @@ class TimerActivity(PopupActivity):
             self.yesButton.reload()
             self.yesButton.reset_size()
 
-    def event_handler(self, event):
-        if self.resume_on_event:
-            super().event_handler(event)
-        else:
-            if event[0] == constants.Event.GAME_EVENT:
-
-                if event[1] == constants.GameEvent.ROOM_FULL:
-                    self.bg_activity.send_state()
-                    self.resume()
-
-                elif event[1] == constants.GameEvent.CONNECTION:
-                    if event[2].connection:
-                        logger.info(event[2].player.playerID, title='player connected')
-
-                else:
-                    super().event_handler(event)
+    @handles(constants.Event.GAME_EVENT, constants.GameEvent.ROOM_FULL)
+    def on_room_full(self, event):
+        # the reconnected player requests the board state it is missing
+        self.resume()
 
-            else:
-                super().event_handler(event)
+    @handles(constants.Event.GAME_EVENT, constants.GameEvent.CONNECTION)
+    def on_connection(self, event):
+        if event.info.connection:
+            logger.info(event.info.player.playerID, title='player connected')
 
     def click_yes(self, is_clicked=False):
         if self.yesButton.active:
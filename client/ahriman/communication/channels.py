@@ -0,0 +1,61 @@
+import grpc
+
+from ahriman import constants
+
+
+class ChannelManager:
+    """
+    long lived secure channels to the servers, one per endpoint, shared by all the stubs
+    the root certificates are read once, the channels are created on first use on the loop of the client (aio
+    channels belong to the loop they are created in) and kept, with their TLS session, until close
+    """
+
+    # the servers keep the default enforcement of grpc-go: pings at least 5 minutes apart, only during calls
+    KEEPALIVE_TIME = 5 * 60 * 1000
+    KEEPALIVE_TIMEOUT = 20 * 1000
+
+    # reconnection delays (ms), the default maximum of 2 minutes is too long to resume a game
+    MIN_RECONNECT_BACKOFF = 500
+    MAX_RECONNECT_BACKOFF = 10 * 1000
+
+    OPTIONS = (('grpc.keepalive_time_ms', KEEPALIVE_TIME),
+               ('grpc.keepalive_timeout_ms', KEEPALIVE_TIMEOUT),
+               ('grpc.keepalive_permit_without_calls', 0),
+               # long game streams may stay silent while a player thinks
+               ('grpc.http2.max_pings_without_data', 0),
+               ('grpc.initial_reconnect_backoff_ms', MIN_RECONNECT_BACKOFF),
+               ('grpc.min_reconnect_backoff_ms', MIN_RECONNECT_BACKOFF),
+               ('grpc.max_reconnect_backoff_ms', MAX_RECONNECT_BACKOFF))
+
+    def __init__(self, cert_file=constants.CERT_FILE):
+        # load the certification file for authenticated communication
+        with open(cert_file, 'rb') as file:
+            root_certs = file.read()
+        self.credentials = grpc.ssl_channel_credentials(root_certificates=root_certs)
+
+        self.channels = {}
+        self.stubs = {}
+
+    def channel(self, target):
+        """channel to the target endpoint, created on first use (loop thread only)"""
+        if target not in self.channels:
+            self.channels[target] = grpc.aio.secure_channel(target, self.credentials,
+                                                            options=ChannelManager.OPTIONS)
+        return self.channels[target]
+
+    def stub(self, stub_class, target):
+        key = (stub_class, target)
+        if key not in self.stubs:
+            self.stubs[key] = stub_class(self.channel(target))
+        return self.stubs[key]
+
+    async def warm_up(self, *targets):
+        """start connecting to the targets (resolution, TCP and TLS handshakes) before their first call"""
+        for target in targets:
+            self.channel(target).get_state(try_to_connect=True)
+
+    async def close(self):
+        for channel in self.channels.values():
+            await channel.close()
+        self.channels = {}
+        self.stubs = {}
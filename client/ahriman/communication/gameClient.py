@@ -1,8 +1,15 @@
-import queue
+import asyncio
+import random
 import threading
+from collections import deque
+
+import grpc
 
 from ahriman import constants
 from ahriman import logger
+from ahriman.events import ActionEvent, AuthSuccessEvent, BoardStateEvent, ConnectionEvent, ErrorEvent, Event
+from ahriman.events import RoomFullEvent
+from .channels import ChannelManager
 from .grpc_proto.server_proto_pb2 import *
 from .grpc_proto.server_proto_pb2_grpc import *
 
@@ -11,59 +18,113 @@ class GameClient:
     """
     communication client that will connect to the game server and send info
     also remembers the state (game room, player token, etc.)
+    all the calls run on one asyncio loop (grpc.aio) in a background thread, the public methods only schedule
+    coroutines on it and return their concurrent.futures.Future
     """
 
-    def __init__(self, window):
-        self.window = window
-        # load the certification file for authenticated communication
-        with open(constants.CERT_FILE, 'rb') as cert_file:
-            root_certs = cert_file.read()
+    # seconds given to the streams to end after a half-close, before cancelling them
+    CLOSE_TIMEOUT = 2
+
+    # reopening of a broken game stream: attempts, first delay and maximum delay between them (seconds)
+    RECONNECT_ATTEMPTS = 8
+    RECONNECT_DELAY = 0.5
+    RECONNECT_MAX_DELAY = 8
+    # seconds a peer disconnection is held back, covering the first reconnection attempts of a short outage
+    # the popup then shown waits for the player to come back (room full again) or to be left
+    DISCONNECTION_GRACE = 2
 
-        credentials = grpc.ssl_channel_credentials(
-            root_certificates=root_certs)
-        channel = grpc.secure_channel(constants.GAME_SERVER, credentials)
-        self.gameStub = GameStub(channel)
+    # sent messages kept until the other players acknowledge them, to be sent again after a reconnection
+    REPLAY_BUFFER = 256
+    # received messages after which an acknowledgement is sent, when the player sends nothing
+    ACK_INTERVAL = 32
 
-        # message sending queue for room request
-        self.rr_queue = StubQueue()
+    # seconds the writer waits after a message for the next ones, sent in the same write, and maximum batch size
+    COALESCE_WINDOW = 0.002
+    MAX_BATCH = 64
 
-        # message sending queue for game stream
-        self.gs_queue = StubQueue()
+    def __init__(self, window):
+        self.window = window
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='GameClient', daemon=True)
+        self.thread.start()
+
+        self.channels = ChannelManager()
+
+        # running room request and game stream
+        self.room_call = None
+        self.game_call = None
+
+        # message sending queue of the current game, a new one per game, written by the writer task
+        self.gs_queue = self.submit(self.create_queue()).result()
+        self.writer = None
+        self.playing = False
+        # task of the current game stream, and of the quit in progress that the next game waits for
+        self.game_task = None
+        self.closing = None
+
+        # numbering of the game stream messages, see new_session
+        self.session = 0
+        self.sequence = 0
+        self.replay = deque(maxlen=GameClient.REPLAY_BUFFER)
+        # by player number: (session, sequence) of the last message received in order, sequence acknowledged
+        self.received = {}
+        self.acked = {}
+        # players asked to resume, who did not answer yet
+        self.waiting = set()
+        self.unacknowledged = 0
+        self.room_size = 0
+        self.failures = 0
+        # by player number: timer handle of a disconnection not reported yet, the player may be reconnecting
+        self.disconnections = {}
 
         self.token = ''
         self.roomID = -1
         self.playerNum = -1
 
+    def submit(self, coroutine):
+        """run a coroutine on the client loop, from any thread"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    @staticmethod
+    async def create_queue():
+        return asyncio.Queue()
+
+    @property
+    def gameStub(self):
+        return self.channels.stub(GameStub, constants.GAME_SERVER)
+
+    def warm_up(self):
+        """connect to the servers ahead of the first calls (while the intro plays)"""
+        return self.submit(self.channels.warm_up(constants.AUTH_SERVER, constants.GAME_SERVER))
+
     def authenticate(self, user_id, password, remember):
         """
         connect to the authentication server providing credentials
         triggers constants.AuthEvent on success or failure
-        :param user_id: 
+        :param user_id:
         :param password:
-        :param remember: 
+        :param remember:
         """
-        with open(constants.CERT_FILE, 'rb') as cert_file:
-            root_certs = cert_file.read()
-        credentials = grpc.ssl_channel_credentials(
-            root_certificates=root_certs)
-        channel = grpc.secure_channel(constants.AUTH_SERVER, credentials)
-        auth_stub = AuthStub(channel)
+        return self.submit(self.run_authentication(user_id, password, remember))
+
+    async def run_authentication(self, user_id, password, remember):
         try:
-            response = auth_stub.Authentication(
+            auth_stub = self.channels.stub(AuthStub, constants.AUTH_SERVER)
+            response = await auth_stub.Authentication(
                 AuthRequest(user_id=user_id, password=password, remember=remember))
 
             if response.WhichOneof('response') == 'payload':
                 self.token = response.payload.token
-                self.window.fire_event((
-                    constants.Event.AUTH_EVENT, constants.AuthEvent.SUCCESS, response.payload.code))
+                self.window.fire_event(AuthSuccessEvent(response.payload.code))
             else:
-                self.window.fire_event((constants.Event.AUTH_EVENT, constants.AuthEvent.REFUSED))
+                self.window.fire_event(Event(constants.Event.AUTH_EVENT, constants.AuthEvent.REFUSED))
 
         except Exception as e:
             logger.warning(e, title='in AuthClient.authenticate')
-            self.window.fire_event((constants.Event.AUTH_EVENT, constants.AuthEvent.ERROR))
+            self.window.fire_event(Event(constants.Event.AUTH_EVENT, constants.AuthEvent.ERROR))
 
-    def check_pending_game(self):
+    async def check_pending_game(self):
         """
         ask the game server if the player is already in a running game
         :return: constants.SearchEvent (not fired)
@@ -71,7 +132,7 @@ class GameClient:
         metadata = [(b'token', self.token)]
         event = constants.SearchEvent.ERROR
         try:
-            response = self.gameStub.RoomCheck(RoomRequestMessage(cancel=False), metadata=metadata)
+            response = await self.gameStub.RoomCheck(RoomRequestMessage(cancel=False), metadata=metadata)
             if response.WhichOneof('response') == 'info':
                 self.roomID = response.info.roomID
                 self.playerNum = response.info.playerNum
@@ -82,46 +143,40 @@ class GameClient:
         except Exception as e:
             logger.warning(e, title='in GameClient.check_pending_game')
 
-        finally:
-            return event
+        return event
 
     def start_game(self):
         """
-        start the thread handling the game
-        :return: the thread
+        start handling the game stream
+        :return: the future of the stream
         """
-        thread = threading.Thread(target=self.run_game)
-        thread.start()
-        return thread
+        return self.submit(self.run_game())
 
     def search_game(self, game_mode):
         """
-        start the thread to search for a new game
+        start searching for a new game
         :param game_mode: the queue to apply for
-        :return: the thread
+        :return: the future of the search
         """
-        thread = threading.Thread(target=self.request_game, args=(game_mode,))
-        thread.start()
-        return thread
+        return self.submit(self.request_game(game_mode))
 
-    def request_game(self, game_mode):
+    async def request_game(self, game_mode):
         """
         search for a current pending game
         if none, asks for a new game
         fires constants.SearchEvent on success or failure
         :param game_mode:
         """
-        pg_event = self.check_pending_game()
+        pg_event = await self.check_pending_game()
 
         # this means no pending game was found, start a new request
         if pg_event == constants.SearchEvent.CANCELED:
             metadata = [(b'token', self.token), (b'roomtype', str(game_mode))]
-            self.rr_queue.reset()
             event = constants.SearchEvent.ERROR
-            response = self.gameStub.RoomRequest(self.rr_queue.read(), metadata=metadata)
+            self.room_call = self.gameStub.RoomRequest(metadata=metadata)
 
             try:
-                for payload in response:
+                async for payload in self.room_call:
                     response_type = payload.WhichOneof('response')
                     if response_type == 'info':
                         event = constants.SearchEvent.GAME_FOUND
@@ -132,7 +187,7 @@ class GameClient:
                     else:
                         logger.warning(response_type, title='invalid field in roomResponse')
 
-                    self.rr_queue.stop()
+                    await self.room_call.done_writing()
 
                 if event == constants.SearchEvent.ERROR:
                     event = constants.SearchEvent.CANCELED
@@ -141,82 +196,334 @@ class GameClient:
                 logger.warning(e, title='in GameClient.search_game')
 
             finally:
-                self.rr_queue.stop()
-                self.window.fire_event((constants.Event.SEARCH_EVENT, event))
+                self.room_call.cancel()
+                self.room_call = None
+                self.window.fire_event(Event(constants.Event.SEARCH_EVENT, event))
         else:
-            self.window.fire_event((constants.Event.SEARCH_EVENT, pg_event))
+            self.window.fire_event(Event(constants.Event.SEARCH_EVENT, pg_event))
 
     def cancel_search(self):
         """
         cancel room request (will eventually trigger a constants.SearchEvent.CANCELED)
         """
-        self.rr_queue.put(RoomRequestMessage(cancel=True))
+        return self.submit(self.write_cancel())
 
-    def run_game(self):
+    async def write_cancel(self):
+        if self.room_call is not None and not self.room_call.done():
+            try:
+                await self.room_call.write(RoomRequestMessage(cancel=True))
+            except asyncio.InvalidStateError:
+                # the request already ended
+                pass
+
+    def new_session(self):
+        """start numbering the messages of a new game stream session (loop thread)"""
+        self.gs_queue = asyncio.Queue()
+        self.session = random.randrange(1, 2 ** 32)
+        self.sequence = 0
+        self.replay.clear()
+        self.received = {}
+        self.acked = {}
+        self.waiting = set()
+        self.unacknowledged = 0
+        self.room_size = 0
+        self.failures = 0
+        self.cancel_disconnections()
+
+    async def run_game(self):
         """
-        the function called by the game handling thread
+        the coroutine handling the game stream
         communicates with the window through constants.GameEvent
+        when the stream breaks, it is opened again after a delay doubling with each failure, and the players send
+        again the messages the others did not acknowledge
+        the previous game is closed first if quit is still ending it
         """
-        self.gs_queue.reset()
+        if self.closing is not None:
+            await asyncio.wait([self.closing])
+        self.game_task = asyncio.current_task()
+        self.new_session()
+        self.playing = True
+
+        try:
+            while True:
+                try:
+                    await self.stream_game()
+                    break
+
+                except grpc.aio.AioRpcError as e:
+                    if not self.playing:
+                        # cancelled by quit
+                        break
+                    if self.failures >= GameClient.RECONNECT_ATTEMPTS:
+                        raise
+                    delay = min(GameClient.RECONNECT_DELAY * 2 ** self.failures, GameClient.RECONNECT_MAX_DELAY)
+                    self.failures += 1
+                    logger.warning('{}, reconnecting in {:.1f}s'.format(e.code(), delay), title='game stream lost')
+                    await asyncio.sleep(delay)
+                    if not self.playing:
+                        break
+
+            self.window.fire_event(Event(constants.Event.GAME_EVENT, constants.GameEvent.END_OF_CONNECTION))
 
+        except Exception as e:
+            logger.error(e, title='in GameClient.run_game')
+            self.window.fire_event(ErrorEvent(str(e)), priority=True)
+
+        finally:
+            self.playing = False
+
+    async def stream_game(self):
         # establish a connection with the server
         metadata = [(b'token', self.token), (b'roomid', str(self.roomID)),
                     (b'playernum', str(self.playerNum))]
-        response = self.gameStub.GameStream(self.gs_queue.read(), metadata=metadata)
+        self.game_call = self.gameStub.GameStream(metadata=metadata)
+        self.writer = asyncio.ensure_future(self.write_messages(self.game_call, self.gs_queue))
 
         try:
-            for message in response:
-                one_of = message.WhichOneof('payload')
-
-                if one_of == 'action':
-                    sub_one_of = message.action.WhichOneof('coordinate')
-                    if sub_one_of == 'tilePos':
-                        self.window.fire_event(
-                            (constants.Event.GAME_EVENT, constants.GameEvent.ACTION,
-                             constants.GameAction(message.action.action),
-                             message.action.issuer, (
-                                 message.action.tilePos.horizontal,
-                                 message.action.tilePos.vertical)))
-                    else:
-                        self.window.fire_event(
-                            (constants.Event.GAME_EVENT, constants.GameEvent.ACTION,
-                             constants.GameAction(message.action.action),
-                             message.action.issuer, (
-                                 message.action.nodePos.horizontal,
-                                 message.action.nodePos.vertical,
-                                 int(message.action.nodePos.upper))))
-
-                elif one_of == 'connectionInfo':
-                    self.window.fire_event((
-                        constants.Event.GAME_EVENT, constants.GameEvent.CONNECTION,
-                        message.connectionInfo))
-                elif one_of == 'roomInfo':
-                    self.window.fire_event((
-                        constants.Event.GAME_EVENT, constants.GameEvent.ROOM_FULL,
-                        message.roomInfo))
-                elif one_of == 'boardState':
-                    self.window.fire_event((
-                        constants.Event.GAME_EVENT, constants.GameEvent.BOARD_STATE,
-                        message.boardState))
-                else:
-                    logger.warning(one_of, title='invalid field in gameMessage')
-
-            self.window.fire_event(
-                (constants.Event.GAME_EVENT, constants.GameEvent.END_OF_CONNECTION))
-
-        except Exception as e:
-            logger.error(e, title='in GameClient.run_game')
-            self.window.fire_event((constants.Event.WINDOW_EVENT, constants.WindowEvent.ERROR, str(e)), priority=True)
+            async for received in self.game_call:
+                for message in self.unbatch(received):
+                    self.handle(message)
 
         finally:
-            self.gs_queue.stop()
+            self.writer.cancel()
+            self.game_call.cancel()
+            self.game_call = None
+
+    def handle(self, message):
+        """handle a received message in order (loop thread)"""
+        one_of = message.WhichOneof('payload')
+
+        if one_of == 'action':
+            sub_one_of = message.action.WhichOneof('coordinate')
+            if sub_one_of == 'tilePos':
+                self.window.fire_event(ActionEvent(
+                    constants.GameAction(message.action.action), message.action.issuer,
+                    (message.action.tilePos.horizontal, message.action.tilePos.vertical)))
+            else:
+                self.window.fire_event(ActionEvent(
+                    constants.GameAction(message.action.action), message.action.issuer,
+                    (message.action.nodePos.horizontal, message.action.nodePos.vertical,
+                     int(message.action.nodePos.upper))))
+
+        elif one_of == 'connectionInfo':
+            player_num = message.connectionInfo.player.playerNum
+            if message.connectionInfo.connection:
+                self.cancel_disconnections(player_num)
+                self.window.fire_event(ConnectionEvent(message.connectionInfo))
+            elif player_num not in self.disconnections:
+                # a player back within the grace period resumes transparently
+                self.disconnections[player_num] = self.loop.call_later(
+                    GameClient.DISCONNECTION_GRACE, self.report_disconnection, message.connectionInfo)
+        elif one_of == 'roomInfo':
+            # all the players are connected: ask them for the messages lost while the room was incomplete
+            self.cancel_disconnections()
+            self.room_size = message.roomInfo.roomSize
+            self.failures = 0
+            self.waiting = {player for player in range(self.room_size) if player != self.playerNum}
+            self.enqueue(GameMessage(resume=True), numbered=False)
+            self.window.fire_event(RoomFullEvent(message.roomInfo))
+        elif one_of == 'boardState':
+            self.window.fire_event(BoardStateEvent(message.boardState))
+        else:
+            logger.warning(one_of, title='invalid field in gameMessage')
+
+    def report_disconnection(self, connection_info):
+        del self.disconnections[connection_info.player.playerNum]
+        self.window.fire_event(ConnectionEvent(connection_info))
+
+    def cancel_disconnections(self, player_num=None):
+        """forget the pending disconnection of a player, or of all of them (loop thread)"""
+        players = list(self.disconnections) if player_num is None else [player_num]
+        for player in players:
+            if player in self.disconnections:
+                self.disconnections.pop(player).cancel()
+
+    def receive(self, message):
+        """
+        sequence checks of a received message, and handling of its acknowledgements (loop thread)
+        :return: True if the message must be handled, False for the duplicates and the acknowledgements only
+        """
+        if not message.session:
+            # the messages of the server are not numbered
+            return True
+
+        if self.playerNum < len(message.acks) and message.acks[self.playerNum].session == self.session:
+            ack = message.acks[self.playerNum].sequence
+            self.acked[message.issuer] = max(ack, self.acked.get(message.issuer, 0))
+            self.trim_replay()
+
+        if message.resume:
+            # answer, then send again the messages the player did not receive (the acknowledgements of a batched
+            # message are carried by its batch)
+            self.enqueue(GameMessage(replay=True), numbered=False)
+            # without acknowledgement of this session, the player received none of its messages
+            ack = self.acked.get(message.issuer, 0)
+            for sent in self.replay:
+                if sent.sequence > ack:
+                    self.gs_queue.put_nowait(sent)
+        if message.replay:
+            self.waiting.discard(message.issuer)
+
+        if not message.sequence:
+            return False
+
+        session, sequence = self.received.get(message.issuer, (None, 0))
+        if message.session != session:
+            # new session of the player: its numbering starts again, the messages of the previous sessions were
+            # synchronised with the board state
+            sequence = 0
+
+        if message.sequence <= sequence:
+            return False
+        if message.sequence > sequence + 1:
+            if message.issuer in self.waiting:
+                # sent before the replay of the missing messages
+                return False
+            logger.warning('{} messages of player {} lost'.format(message.sequence - sequence - 1, message.issuer),
+                           title='game stream')
+            self.window.fire_event(Event(constants.Event.GAME_EVENT, constants.GameEvent.OUT_OF_SYNC))
+
+        self.received[message.issuer] = (message.session, message.sequence)
+        self.unacknowledged += 1
+        if self.unacknowledged >= GameClient.ACK_INTERVAL:
+            self.enqueue(GameMessage(), numbered=False)
+        return True
+
+    def unbatch(self, received):
+        """
+        messages to handle from a received message: itself, or the messages of its batch, in order
+        the acknowledgements of a batch are checked before its messages
+        """
+        if self.receive(received):
+            yield received
+        for message in received.batch:
+            if self.receive(message):
+                yield message
+
+    def trim_replay(self):
+        """forget the sent messages acknowledged by all the other players"""
+        others = [player for player in range(self.room_size) if player != self.playerNum]
+        if others:
+            acked = min(self.acked.get(player, 0) for player in others)
+            while self.replay and self.replay[0].sequence <= acked:
+                self.replay.popleft()
+
+    def acknowledge(self, message):
+        """set the last message received from each player in the acknowledgements of a message"""
+        del message.acks[:]
+        for player in range(self.room_size):
+            session, sequence = self.received.get(player, (0, 0))
+            message.acks.add(session=session, sequence=sequence)
+        self.unacknowledged = 0
+
+    def enqueue(self, message, numbered=True):
+        """
+        queue a message on the game stream (loop thread)
+        numbered messages are kept in the replay buffer until every player acknowledges them
+        """
+        message.issuer = self.playerNum
+        message.session = self.session
+        if numbered:
+            self.sequence += 1
+            message.sequence = self.sequence
+            self.replay.append(message)
+        self.gs_queue.put_nowait(message)
+
+    def coalesce(self, messages):
+        """:return: the message to write for the queued messages, a batch if there are several"""
+        if len(messages) == 1:
+            return messages[0]
+
+        for message in messages:
+            # the acknowledgements are only set on the batch
+            del message.acks[:]
+        return GameMessage(issuer=self.playerNum, session=self.session, batch=messages)
+
+    async def write_messages(self, call, queue):
+        """
+        write the queued messages on the game stream, until cancelled
+        the messages queued together (in one frame, or within COALESCE_WINDOW of the first one) are sent in one write
+        """
+        while True:
+            messages = [await queue.get()]
+            try:
+                if GameClient.COALESCE_WINDOW:
+                    await asyncio.sleep(GameClient.COALESCE_WINDOW)
+                while len(messages) < GameClient.MAX_BATCH and not queue.empty():
+                    messages.append(queue.get_nowait())
+
+                message = self.coalesce(messages)
+                self.acknowledge(message)
+                await call.write(message)
+            except (asyncio.InvalidStateError, grpc.aio.AioRpcError) as e:
+                # the stream broke, the messages are sent again after the reconnection if they were lost
+                logger.warning(e, title='in GameClient.write_messages')
+                return
+            finally:
+                for _ in messages:
+                    queue.task_done()
 
     def quit(self):
         """
         close all connections with the servers
+        the queued messages are sent, then the streams are half-closed and cancelled if the server does not end them
+        """
+        return self.submit(self.close_calls())
+
+    async def close_calls(self):
+        """
+        end the calls running when quit was called: a game started meanwhile waits for this one to end (run_game),
+        its calls, writer and queue are never touched
         """
-        self.rr_queue.stop()
-        self.gs_queue.stop()
+        self.closing = asyncio.current_task()
+        self.playing = False
+        self.cancel_disconnections()
+        writer, queue, game_task = self.writer, self.gs_queue, self.game_task
+        calls = [call for call in (self.room_call, self.game_call) if call is not None and not call.done()]
+
+        try:
+            if writer is not None and not writer.done():
+                try:
+                    await asyncio.wait_for(queue.join(), GameClient.CLOSE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    logger.warning('messages not sent', title='in GameClient.quit')
+                writer.cancel()
+
+            for call in calls:
+                await call.done_writing()
+
+            try:
+                await asyncio.wait_for(asyncio.gather(*(call.code() for call in calls)), GameClient.CLOSE_TIMEOUT)
+            except asyncio.TimeoutError:
+                for call in calls:
+                    call.cancel()
+
+            if game_task is not None and not game_task.done():
+                # the game stream ends with its call, unless it is waiting to reconnect
+                try:
+                    await asyncio.wait_for(asyncio.shield(game_task), GameClient.CLOSE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    game_task.cancel()
+
+        finally:
+            if self.closing is asyncio.current_task():
+                self.closing = None
+
+    def close(self):
+        """quit, then close the channels and stop the loop of the client (application shutdown)"""
+        try:
+            self.quit().result(timeout=3 * GameClient.CLOSE_TIMEOUT)
+            self.submit(self.channels.close()).result(timeout=GameClient.CLOSE_TIMEOUT)
+        except Exception as e:
+            logger.warning(e, title='in GameClient.close')
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.loop.close()
+
+    def send(self, message):
+        """queue a message on the game stream, from any thread"""
+        self.loop.call_soon_threadsafe(self.enqueue, message)
 
     def send_game_state(self, byte_state):
         """
@@ -225,7 +532,7 @@ class GameClient:
         """
         board_bytes = BoardBytes(state=byte_state, issuer=self.playerNum)
         message = GameMessage(boardState=board_bytes)
-        self.gs_queue.put(message)
+        self.send(message)
 
     def send_game_action(self, action, coord=(0, 0)):
         """
@@ -246,25 +553,4 @@ class GameClient:
             raise (ValueError('invalid coordinate length: {} - expected [2, 3]'.format(len(coord))))
 
         message = GameMessage(action=action_message)
-        self.gs_queue.put(message)
-
-
-class StubQueue(queue.Queue):
-    """
-    implements a sending queue for the stubs
-    this is just a conventional queue with yield enhancement and reset ability
-    """
-
-    def read(self):
-        while True:
-            message = self.get()
-            if message is None:
-                break
-            yield message
-
-    def reset(self):
-        with self.mutex:
-            self.queue.clear()
-
-    def stop(self):
-        self.put(None)
+        self.send(message)
@@ -1,13 +1,22 @@
+# -*- coding: utf-8 -*-
 # Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
 # source: server_proto.proto
-
-import sys
-_b=sys.version_info[0]<3 and (lambda x:x) or (lambda x:x.encode('latin1'))
+# Protobuf Python Version: 7.35.1
+"""Generated protocol buffer code."""
 from google.protobuf import descriptor as _descriptor
-from google.protobuf import message as _message
-from google.protobuf import reflection as _reflection
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
 from google.protobuf import symbol_database as _symbol_database
-from google.protobuf import descriptor_pb2
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    7,
+    35,
+    1,
+    '',
+    'server_proto.proto'
+)
 # @@protoc_insertion_point(imports)
 
 _sym_db = _symbol_database.Default()
@@ -15,813 +24,45 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor.FileDescriptor(
-  name='server_proto.proto',
-  package='',
-  syntax='proto3',
-  serialized_pb=_b('\n\x12server_proto.proto\"B\n\x0b\x41uthRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\x12\x10\n\x08remember\x18\x03 \x01(\x08\".\n\x0f\x41uthCredentials\x12\r\n\x05token\x18\x01 \x01(\t\x12\x0c\n\x04\x63ode\x18\x02 \x01(\t\"T\n\x0c\x41uthResponse\x12\x13\n\tavailable\x18\x01 \x01(\x08H\x00\x12#\n\x07payload\x18\x02 \x01(\x0b\x32\x10.AuthCredentialsH\x00\x42\n\n\x08response\"1\n\tTileCoord\x12\x12\n\nhorizontal\x18\x01 \x01(\r\x12\x10\n\x08vertical\x18\x02 \x01(\r\"@\n\tNodeCoord\x12\x12\n\nhorizontal\x18\x01 \x01(\r\x12\x10\n\x08vertical\x18\x02 \x01(\r\x12\r\n\x05upper\x18\x03 \x01(\x08\"x\n\nGameAction\x12\x1d\n\x07tilePos\x18\x01 \x01(\x0b\x32\n.TileCoordH\x00\x12\x1d\n\x07nodePos\x18\x02 \x01(\x0b\x32\n.NodeCoordH\x00\x12\x0e\n\x06\x61\x63tion\x18\x03 \x01(\r\x12\x0e\n\x06issuer\x18\x04 \x01(\rB\x0c\n\ncoordinate\"D\n\x11\x43onnectionMessage\x12\x12\n\nconnection\x18\x01 \x01(\x08\x12\x1b\n\x06player\x18\x02 \x01(\x0b\x32\x0b.PlayerInfo\"+\n\nBoardBytes\x12\r\n\x05state\x18\x01 \x01(\x0c\x12\x0e\n\x06issuer\x18\x02 \x01(\r\"\xa9\x01\n\x0bGameMessage\x12\x1d\n\x06\x61\x63tion\x18\x01 \x01(\x0b\x32\x0b.GameActionH\x00\x12,\n\x0e\x63onnectionInfo\x18\x02 \x01(\x0b\x32\x12.ConnectionMessageH\x00\x12\x1f\n\x08roomInfo\x18\x03 \x01(\x0b\x32\x0b.RoomDetailH\x00\x12!\n\nboardState\x18\x04 \x01(\x0b\x32\x0b.BoardBytesH\x00\x42\t\n\x07payload\"$\n\x12RoomRequestMessage\x12\x0e\n\x06\x63\x61ncel\x18\x01 \x01(\x08\"J\n\x0cRoomResponse\x12\x13\n\tavailable\x18\x01 \x01(\x08H\x00\x12\x19\n\x04info\x18\x02 \x01(\x0b\x32\t.RoomInfoH\x00\x42\n\n\x08response\";\n\nRoomDetail\x12\x10\n\x08roomSize\x18\x01 \x01(\r\x12\x1b\n\x06player\x18\x02 \x03(\x0b\x32\x0b.PlayerInfo\"1\n\nPlayerInfo\x12\x11\n\tplayerNum\x18\x01 \x01(\r\x12\x10\n\x08playerID\x18\x02 \x01(\t\"-\n\x08RoomInfo\x12\x0e\n\x06roomID\x18\x01 \x01(\r\x12\x11\n\tplayerNum\x18\x02 \x01(\r2\xa2\x01\n\x04Game\x12.\n\nGameStream\x12\x0c.GameMessage\x1a\x0c.GameMessage\"\x00(\x01\x30\x01\x12\x37\n\x0bRoomRequest\x12\x13.RoomRequestMessage\x1a\r.RoomResponse\"\x00(\x01\x30\x01\x12\x31\n\tRoomCheck\x12\x13.RoomRequestMessage\x1a\r.RoomResponse\"\x00\x32\x37\n\x04\x41uth\x12/\n\x0e\x41uthentication\x12\x0c.AuthRequest\x1a\r.AuthResponse\"\x00\x62\x06proto3')
-)
-
-
-
-
-_AUTHREQUEST = _descriptor.Descriptor(
-  name='AuthRequest',
-  full_name='AuthRequest',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='user_id', full_name='AuthRequest.user_id', index=0,
-      number=1, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=_b("").decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='password', full_name='AuthRequest.password', index=1,
-      number=2, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=_b("").decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='remember', full_name='AuthRequest.remember', index=2,
-      number=3, type=8, cpp_type=7, label=1,
-      has_default_value=False, default_value=False,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=22,
-  serialized_end=88,
-)
-
-
-_AUTHCREDENTIALS = _descriptor.Descriptor(
-  name='AuthCredentials',
-  full_name='AuthCredentials',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='token', full_name='AuthCredentials.token', index=0,
-      number=1, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=_b("").decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='code', full_name='AuthCredentials.code', index=1,
-      number=2, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=_b("").decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=90,
-  serialized_end=136,
-)
-
-
-_AUTHRESPONSE = _descriptor.Descriptor(
-  name='AuthResponse',
-  full_name='AuthResponse',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='available', full_name='AuthResponse.available', index=0,
-      number=1, type=8, cpp_type=7, label=1,
-      has_default_value=False, default_value=False,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='payload', full_name='AuthResponse.payload', index=1,
-      number=2, type=11, cpp_type=10, label=1,
-      has_default_value=False, default_value=None,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-    _descriptor.OneofDescriptor(
-      name='response', full_name='AuthResponse.response',
-      index=0, containing_type=None, fields=[]),
-  ],
-  serialized_start=138,
-  serialized_end=222,
-)
-
-
-_TILECOORD = _descriptor.Descriptor(
-  name='TileCoord',
-  full_name='TileCoord',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='horizontal', full_name='TileCoord.horizontal', index=0,
-      number=1, type=13, cpp_type=3, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='vertical', full_name='TileCoord.vertical', index=1,
-      number=2, type=13, cpp_type=3, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=224,
-  serialized_end=273,
-)
-
-
-_NODECOORD = _descriptor.Descriptor(
-  name='NodeCoord',
-  full_name='NodeCoord',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='horizontal', full_name='NodeCoord.horizontal', index=0,
-      number=1, type=13, cpp_type=3, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='vertical', full_name='NodeCoord.vertical', index=1,
-      number=2, type=13, cpp_type=3, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='upper', full_name='NodeCoord.upper', index=2,
-      number=3, type=8, cpp_type=7, label=1,
-      has_default_value=False, default_value=False,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=275,
-  serialized_end=339,
-)
-
-
-_GAMEACTION = _descriptor.Descriptor(
-  name='GameAction',
-  full_name='GameAction',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='tilePos', full_name='GameAction.tilePos', index=0,
-      number=1, type=11, cpp_type=10, label=1,
-      has_default_value=False, default_value=None,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='nodePos', full_name='GameAction.nodePos', index=1,
-      number=2, type=11, cpp_type=10, label=1,
-      has_default_value=False, default_value=None,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='action', full_name='GameAction.action', index=2,
-      number=3, type=13, cpp_type=3, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='issuer', full_name='GameAction.issuer', index=3,
-      number=4, type=13, cpp_type=3, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-    _descriptor.OneofDescriptor(
-      name='coordinate', full_name='GameAction.coordinate',
-      index=0, containing_type=None, fields=[]),
-  ],
-  serialized_start=341,
-  serialized_end=461,
-)
-
-
-_CONNECTIONMESSAGE = _descriptor.Descriptor(
-  name='ConnectionMessage',
-  full_name='ConnectionMessage',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='connection', full_name='ConnectionMessage.connection', index=0,
-      number=1, type=8, cpp_type=7, label=1,
-      has_default_value=False, default_value=False,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='player', full_name='ConnectionMessage.player', index=1,
-      number=2, type=11, cpp_type=10, label=1,
-      has_default_value=False, default_value=None,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=463,
-  serialized_end=531,
-)
-
-
-_BOARDBYTES = _descriptor.Descriptor(
-  name='BoardBytes',
-  full_name='BoardBytes',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='state', full_name='BoardBytes.state', index=0,
-      number=1, type=12, cpp_type=9, label=1,
-      has_default_value=False, default_value=_b(""),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='issuer', full_name='BoardBytes.issuer', index=1,
-      number=2, type=13, cpp_type=3, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=533,
-  serialized_end=576,
-)
-
-
-_GAMEMESSAGE = _descriptor.Descriptor(
-  name='GameMessage',
-  full_name='GameMessage',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='action', full_name='GameMessage.action', index=0,
-      number=1, type=11, cpp_type=10, label=1,
-      has_default_value=False, default_value=None,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='connectionInfo', full_name='GameMessage.connectionInfo', index=1,
-      number=2, type=11, cpp_type=10, label=1,
-      has_default_value=False, default_value=None,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='roomInfo', full_name='GameMessage.roomInfo', index=2,
-      number=3, type=11, cpp_type=10, label=1,
-      has_default_value=False, default_value=None,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='boardState', full_name='GameMessage.boardState', index=3,
-      number=4, type=11, cpp_type=10, label=1,
-      has_default_value=False, default_value=None,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-    _descriptor.OneofDescriptor(
-      name='payload', full_name='GameMessage.payload',
-      index=0, containing_type=None, fields=[]),
-  ],
-  serialized_start=579,
-  serialized_end=748,
-)
-
-
-_ROOMREQUESTMESSAGE = _descriptor.Descriptor(
-  name='RoomRequestMessage',
-  full_name='RoomRequestMessage',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='cancel', full_name='RoomRequestMessage.cancel', index=0,
-      number=1, type=8, cpp_type=7, label=1,
-      has_default_value=False, default_value=False,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=750,
-  serialized_end=786,
-)
-
-
-_ROOMRESPONSE = _descriptor.Descriptor(
-  name='RoomResponse',
-  full_name='RoomResponse',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='available', full_name='RoomResponse.available', index=0,
-      number=1, type=8, cpp_type=7, label=1,
-      has_default_value=False, default_value=False,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='info', full_name='RoomResponse.info', index=1,
-      number=2, type=11, cpp_type=10, label=1,
-      has_default_value=False, default_value=None,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-    _descriptor.OneofDescriptor(
-      name='response', full_name='RoomResponse.response',
-      index=0, containing_type=None, fields=[]),
-  ],
-  serialized_start=788,
-  serialized_end=862,
-)
-
-
-_ROOMDETAIL = _descriptor.Descriptor(
-  name='RoomDetail',
-  full_name='RoomDetail',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='roomSize', full_name='RoomDetail.roomSize', index=0,
-      number=1, type=13, cpp_type=3, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='player', full_name='RoomDetail.player', index=1,
-      number=2, type=11, cpp_type=10, label=3,
-      has_default_value=False, default_value=[],
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=864,
-  serialized_end=923,
-)
-
-
-_PLAYERINFO = _descriptor.Descriptor(
-  name='PlayerInfo',
-  full_name='PlayerInfo',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='playerNum', full_name='PlayerInfo.playerNum', index=0,
-      number=1, type=13, cpp_type=3, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='playerID', full_name='PlayerInfo.playerID', index=1,
-      number=2, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=_b("").decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=925,
-  serialized_end=974,
-)
-
-
-_ROOMINFO = _descriptor.Descriptor(
-  name='RoomInfo',
-  full_name='RoomInfo',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='roomID', full_name='RoomInfo.roomID', index=0,
-      number=1, type=13, cpp_type=3, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='playerNum', full_name='RoomInfo.playerNum', index=1,
-      number=2, type=13, cpp_type=3, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=976,
-  serialized_end=1021,
-)
-
-_AUTHRESPONSE.fields_by_name['payload'].message_type = _AUTHCREDENTIALS
-_AUTHRESPONSE.oneofs_by_name['response'].fields.append(
-  _AUTHRESPONSE.fields_by_name['available'])
-_AUTHRESPONSE.fields_by_name['available'].containing_oneof = _AUTHRESPONSE.oneofs_by_name['response']
-_AUTHRESPONSE.oneofs_by_name['response'].fields.append(
-  _AUTHRESPONSE.fields_by_name['payload'])
-_AUTHRESPONSE.fields_by_name['payload'].containing_oneof = _AUTHRESPONSE.oneofs_by_name['response']
-_GAMEACTION.fields_by_name['tilePos'].message_type = _TILECOORD
-_GAMEACTION.fields_by_name['nodePos'].message_type = _NODECOORD
-_GAMEACTION.oneofs_by_name['coordinate'].fields.append(
-  _GAMEACTION.fields_by_name['tilePos'])
-_GAMEACTION.fields_by_name['tilePos'].containing_oneof = _GAMEACTION.oneofs_by_name['coordinate']
-_GAMEACTION.oneofs_by_name['coordinate'].fields.append(
-  _GAMEACTION.fields_by_name['nodePos'])
-_GAMEACTION.fields_by_name['nodePos'].containing_oneof = _GAMEACTION.oneofs_by_name['coordinate']
-_CONNECTIONMESSAGE.fields_by_name['player'].message_type = _PLAYERINFO
-_GAMEMESSAGE.fields_by_name['action'].message_type = _GAMEACTION
-_GAMEMESSAGE.fields_by_name['connectionInfo'].message_type = _CONNECTIONMESSAGE
-_GAMEMESSAGE.fields_by_name['roomInfo'].message_type = _ROOMDETAIL
-_GAMEMESSAGE.fields_by_name['boardState'].message_type = _BOARDBYTES
-_GAMEMESSAGE.oneofs_by_name['payload'].fields.append(
-  _GAMEMESSAGE.fields_by_name['action'])
-_GAMEMESSAGE.fields_by_name['action'].containing_oneof = _GAMEMESSAGE.oneofs_by_name['payload']
-_GAMEMESSAGE.oneofs_by_name['payload'].fields.append(
-  _GAMEMESSAGE.fields_by_name['connectionInfo'])
-_GAMEMESSAGE.fields_by_name['connectionInfo'].containing_oneof = _GAMEMESSAGE.oneofs_by_name['payload']
-_GAMEMESSAGE.oneofs_by_name['payload'].fields.append(
-  _GAMEMESSAGE.fields_by_name['roomInfo'])
-_GAMEMESSAGE.fields_by_name['roomInfo'].containing_oneof = _GAMEMESSAGE.oneofs_by_name['payload']
-_GAMEMESSAGE.oneofs_by_name['payload'].fields.append(
-  _GAMEMESSAGE.fields_by_name['boardState'])
-_GAMEMESSAGE.fields_by_name['boardState'].containing_oneof = _GAMEMESSAGE.oneofs_by_name['payload']
-_ROOMRESPONSE.fields_by_name['info'].message_type = _ROOMINFO
-_ROOMRESPONSE.oneofs_by_name['response'].fields.append(
-  _ROOMRESPONSE.fields_by_name['available'])
-_ROOMRESPONSE.fields_by_name['available'].containing_oneof = _ROOMRESPONSE.oneofs_by_name['response']
-_ROOMRESPONSE.oneofs_by_name['response'].fields.append(
-  _ROOMRESPONSE.fields_by_name['info'])
-_ROOMRESPONSE.fields_by_name['info'].containing_oneof = _ROOMRESPONSE.oneofs_by_name['response']
-_ROOMDETAIL.fields_by_name['player'].message_type = _PLAYERINFO
-DESCRIPTOR.message_types_by_name['AuthRequest'] = _AUTHREQUEST
-DESCRIPTOR.message_types_by_name['AuthCredentials'] = _AUTHCREDENTIALS
-DESCRIPTOR.message_types_by_name['AuthResponse'] = _AUTHRESPONSE
-DESCRIPTOR.message_types_by_name['TileCoord'] = _TILECOORD
-DESCRIPTOR.message_types_by_name['NodeCoord'] = _NODECOORD
-DESCRIPTOR.message_types_by_name['GameAction'] = _GAMEACTION
-DESCRIPTOR.message_types_by_name['ConnectionMessage'] = _CONNECTIONMESSAGE
-DESCRIPTOR.message_types_by_name['BoardBytes'] = _BOARDBYTES
-DESCRIPTOR.message_types_by_name['GameMessage'] = _GAMEMESSAGE
-DESCRIPTOR.message_types_by_name['RoomRequestMessage'] = _ROOMREQUESTMESSAGE
-DESCRIPTOR.message_types_by_name['RoomResponse'] = _ROOMRESPONSE
-DESCRIPTOR.message_types_by_name['RoomDetail'] = _ROOMDETAIL
-DESCRIPTOR.message_types_by_name['PlayerInfo'] = _PLAYERINFO
-DESCRIPTOR.message_types_by_name['RoomInfo'] = _ROOMINFO
-_sym_db.RegisterFileDescriptor(DESCRIPTOR)
-
-AuthRequest = _reflection.GeneratedProtocolMessageType('AuthRequest', (_message.Message,), dict(
-  DESCRIPTOR = _AUTHREQUEST,
-  __module__ = 'server_proto_pb2'
-  # @@protoc_insertion_point(class_scope:AuthRequest)
-  ))
-_sym_db.RegisterMessage(AuthRequest)
-
-AuthCredentials = _reflection.GeneratedProtocolMessageType('AuthCredentials', (_message.Message,), dict(
-  DESCRIPTOR = _AUTHCREDENTIALS,
-  __module__ = 'server_proto_pb2'
-  # @@protoc_insertion_point(class_scope:AuthCredentials)
-  ))
-_sym_db.RegisterMessage(AuthCredentials)
-
-AuthResponse = _reflection.GeneratedProtocolMessageType('AuthResponse', (_message.Message,), dict(
-  DESCRIPTOR = _AUTHRESPONSE,
-  __module__ = 'server_proto_pb2'
-  # @@protoc_insertion_point(class_scope:AuthResponse)
-  ))
-_sym_db.RegisterMessage(AuthResponse)
-
-TileCoord = _reflection.GeneratedProtocolMessageType('TileCoord', (_message.Message,), dict(
-  DESCRIPTOR = _TILECOORD,
-  __module__ = 'server_proto_pb2'
-  # @@protoc_insertion_point(class_scope:TileCoord)
-  ))
-_sym_db.RegisterMessage(TileCoord)
-
-NodeCoord = _reflection.GeneratedProtocolMessageType('NodeCoord', (_message.Message,), dict(
-  DESCRIPTOR = _NODECOORD,
-  __module__ = 'server_proto_pb2'
-  # @@protoc_insertion_point(class_scope:NodeCoord)
-  ))
-_sym_db.RegisterMessage(NodeCoord)
-
-GameAction = _reflection.GeneratedProtocolMessageType('GameAction', (_message.Message,), dict(
-  DESCRIPTOR = _GAMEACTION,
-  __module__ = 'server_proto_pb2'
-  # @@protoc_insertion_point(class_scope:GameAction)
-  ))
-_sym_db.RegisterMessage(GameAction)
-
-ConnectionMessage = _reflection.GeneratedProtocolMessageType('ConnectionMessage', (_message.Message,), dict(
-  DESCRIPTOR = _CONNECTIONMESSAGE,
-  __module__ = 'server_proto_pb2'
-  # @@protoc_insertion_point(class_scope:ConnectionMessage)
-  ))
-_sym_db.RegisterMessage(ConnectionMessage)
-
-BoardBytes = _reflection.GeneratedProtocolMessageType('BoardBytes', (_message.Message,), dict(
-  DESCRIPTOR = _BOARDBYTES,
-  __module__ = 'server_proto_pb2'
-  # @@protoc_insertion_point(class_scope:BoardBytes)
-  ))
-_sym_db.RegisterMessage(BoardBytes)
-
-GameMessage = _reflection.GeneratedProtocolMessageType('GameMessage', (_message.Message,), dict(
-  DESCRIPTOR = _GAMEMESSAGE,
-  __module__ = 'server_proto_pb2'
-  # @@protoc_insertion_point(class_scope:GameMessage)
-  ))
-_sym_db.RegisterMessage(GameMessage)
-
-RoomRequestMessage = _reflection.GeneratedProtocolMessageType('RoomRequestMessage', (_message.Message,), dict(
-  DESCRIPTOR = _ROOMREQUESTMESSAGE,
-  __module__ = 'server_proto_pb2'
-  # @@protoc_insertion_point(class_scope:RoomRequestMessage)
-  ))
-_sym_db.RegisterMessage(RoomRequestMessage)
-
-RoomResponse = _reflection.GeneratedProtocolMessageType('RoomResponse', (_message.Message,), dict(
-  DESCRIPTOR = _ROOMRESPONSE,
-  __module__ = 'server_proto_pb2'
-  # @@protoc_insertion_point(class_scope:RoomResponse)
-  ))
-_sym_db.RegisterMessage(RoomResponse)
-
-RoomDetail = _reflection.GeneratedProtocolMessageType('RoomDetail', (_message.Message,), dict(
-  DESCRIPTOR = _ROOMDETAIL,
-  __module__ = 'server_proto_pb2'
-  # @@protoc_insertion_point(class_scope:RoomDetail)
-  ))
-_sym_db.RegisterMessage(RoomDetail)
-
-PlayerInfo = _reflection.GeneratedProtocolMessageType('PlayerInfo', (_message.Message,), dict(
-  DESCRIPTOR = _PLAYERINFO,
-  __module__ = 'server_proto_pb2'
-  # @@protoc_insertion_point(class_scope:PlayerInfo)
-  ))
-_sym_db.RegisterMessage(PlayerInfo)
-
-RoomInfo = _reflection.GeneratedProtocolMessageType('RoomInfo', (_message.Message,), dict(
-  DESCRIPTOR = _ROOMINFO,
-  __module__ = 'server_proto_pb2'
-  # @@protoc_insertion_point(class_scope:RoomInfo)
-  ))
-_sym_db.RegisterMessage(RoomInfo)
-
-
-
-_GAME = _descriptor.ServiceDescriptor(
-  name='Game',
-  full_name='Game',
-  file=DESCRIPTOR,
-  index=0,
-  options=None,
-  serialized_start=1024,
-  serialized_end=1186,
-  methods=[
-  _descriptor.MethodDescriptor(
-    name='GameStream',
-    full_name='Game.GameStream',
-    index=0,
-    containing_service=None,
-    input_type=_GAMEMESSAGE,
-    output_type=_GAMEMESSAGE,
-    options=None,
-  ),
-  _descriptor.MethodDescriptor(
-    name='RoomRequest',
-    full_name='Game.RoomRequest',
-    index=1,
-    containing_service=None,
-    input_type=_ROOMREQUESTMESSAGE,
-    output_type=_ROOMRESPONSE,
-    options=None,
-  ),
-  _descriptor.MethodDescriptor(
-    name='RoomCheck',
-    full_name='Game.RoomCheck',
-    index=2,
-    containing_service=None,
-    input_type=_ROOMREQUESTMESSAGE,
-    output_type=_ROOMRESPONSE,
-    options=None,
-  ),
-])
-_sym_db.RegisterServiceDescriptor(_GAME)
-
-DESCRIPTOR.services_by_name['Game'] = _GAME
-
-
-_AUTH = _descriptor.ServiceDescriptor(
-  name='Auth',
-  full_name='Auth',
-  file=DESCRIPTOR,
-  index=1,
-  options=None,
-  serialized_start=1188,
-  serialized_end=1243,
-  methods=[
-  _descriptor.MethodDescriptor(
-    name='Authentication',
-    full_name='Auth.Authentication',
-    index=0,
-    containing_service=None,
-    input_type=_AUTHREQUEST,
-    output_type=_AUTHRESPONSE,
-    options=None,
-  ),
-])
-_sym_db.RegisterServiceDescriptor(_AUTH)
-
-DESCRIPTOR.services_by_name['Auth'] = _AUTH
-
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x12server_proto.proto\"B\n\x0b\x41uthRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\x12\x10\n\x08remember\x18\x03 \x01(\x08\".\n\x0f\x41uthCredentials\x12\r\n\x05token\x18\x01 \x01(\t\x12\x0c\n\x04\x63ode\x18\x02 \x01(\t\"T\n\x0c\x41uthResponse\x12\x13\n\tavailable\x18\x01 \x01(\x08H\x00\x12#\n\x07payload\x18\x02 \x01(\x0b\x32\x10.AuthCredentialsH\x00\x42\n\n\x08response\"1\n\tTileCoord\x12\x12\n\nhorizontal\x18\x01 \x01(\r\x12\x10\n\x08vertical\x18\x02 \x01(\r\"@\n\tNodeCoord\x12\x12\n\nhorizontal\x18\x01 \x01(\r\x12\x10\n\x08vertical\x18\x02 \x01(\r\x12\r\n\x05upper\x18\x03 \x01(\x08\"x\n\nGameAction\x12\x1d\n\x07tilePos\x18\x01 \x01(\x0b\x32\n.TileCoordH\x00\x12\x1d\n\x07nodePos\x18\x02 \x01(\x0b\x32\n.NodeCoordH\x00\x12\x0e\n\x06\x61\x63tion\x18\x03 \x01(\r\x12\x0e\n\x06issuer\x18\x04 \x01(\rB\x0c\n\ncoordinate\"D\n\x11\x43onnectionMessage\x12\x12\n\nconnection\x18\x01 \x01(\x08\x12\x1b\n\x06player\x18\x02 \x01(\x0b\x32\x0b.PlayerInfo\"+\n\nBoardBytes\x12\r\n\x05state\x18\x01 \x01(\x0c\x12\x0e\n\x06issuer\x18\x02 \x01(\r\"\xb3\x02\n\x0bGameMessage\x12\x1d\n\x06\x61\x63tion\x18\x01 \x01(\x0b\x32\x0b.GameActionH\x00\x12,\n\x0e\x63onnectionInfo\x18\x02 \x01(\x0b\x32\x12.ConnectionMessageH\x00\x12\x1f\n\x08roomInfo\x18\x03 \x01(\x0b\x32\x0b.RoomDetailH\x00\x12!\n\nboardState\x18\x04 \x01(\x0b\x32\x0b.BoardBytesH\x00\x12\x0e\n\x06issuer\x18\x05 \x01(\r\x12\x0f\n\x07session\x18\x06 \x01(\r\x12\x10\n\x08sequence\x18\x07 \x01(\r\x12\x18\n\x04\x61\x63ks\x18\x08 \x03(\x0b\x32\n.StreamAck\x12\x0e\n\x06resume\x18\t \x01(\x08\x12\x0e\n\x06replay\x18\n \x01(\x08\x12\x1b\n\x05\x62\x61tch\x18\x0b \x03(\x0b\x32\x0c.GameMessageB\t\n\x07payload\".\n\tStreamAck\x12\x0f\n\x07session\x18\x01 \x01(\r\x12\x10\n\x08sequence\x18\x02 \x01(\r\"$\n\x12RoomRequestMessage\x12\x0e\n\x06\x63\x61ncel\x18\x01 \x01(\x08\"J\n\x0cRoomResponse\x12\x13\n\tavailable\x18\x01 \x01(\x08H\x00\x12\x19\n\x04info\x18\x02 \x01(\x0b\x32\t.RoomInfoH\x00\x42\n\n\x08response\";\n\nRoomDetail\x12\x10\n\x08roomSize\x18\x01 \x01(\r\x12\x1b\n\x06player\x18\x02 \x03(\x0b\x32\x0b.PlayerInfo\"1\n\nPlayerInfo\x12\x11\n\tplayerNum\x18\x01 \x01(\r\x12\x10\n\x08playerID\x18\x02 \x01(\t\"-\n\x08RoomInfo\x12\x0e\n\x06roomID\x18\x01 \x01(\r\x12\x11\n\tplayerNum\x18\x02 \x01(\r2\xa2\x01\n\x04Game\x12.\n\nGameStream\x12\x0c.GameMessage\x1a\x0c.GameMessage\"\x00(\x01\x30\x01\x12\x37\n\x0bRoomRequest\x12\x13.RoomRequestMessage\x1a\r.RoomResponse\"\x00(\x01\x30\x01\x12\x31\n\tRoomCheck\x12\x13.RoomRequestMessage\x1a\r.RoomResponse\"\x00\x32\x37\n\x04\x41uth\x12/\n\x0e\x41uthentication\x12\x0c.AuthRequest\x1a\r.AuthResponse\"\x00\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'server_proto_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_AUTHREQUEST']._serialized_start=22
+  _globals['_AUTHREQUEST']._serialized_end=88
+  _globals['_AUTHCREDENTIALS']._serialized_start=90
+  _globals['_AUTHCREDENTIALS']._serialized_end=136
+  _globals['_AUTHRESPONSE']._serialized_start=138
+  _globals['_AUTHRESPONSE']._serialized_end=222
+  _globals['_TILECOORD']._serialized_start=224
+  _globals['_TILECOORD']._serialized_end=273
+  _globals['_NODECOORD']._serialized_start=275
+  _globals['_NODECOORD']._serialized_end=339
+  _globals['_GAMEACTION']._serialized_start=341
+  _globals['_GAMEACTION']._serialized_end=461
+  _globals['_CONNECTIONMESSAGE']._serialized_start=463
+  _globals['_CONNECTIONMESSAGE']._serialized_end=531
+  _globals['_BOARDBYTES']._serialized_start=533
+  _globals['_BOARDBYTES']._serialized_end=576
+  _globals['_GAMEMESSAGE']._serialized_start=579
+  _globals['_GAMEMESSAGE']._serialized_end=886
+  _globals['_STREAMACK']._serialized_start=888
+  _globals['_STREAMACK']._serialized_end=934
+  _globals['_ROOMREQUESTMESSAGE']._serialized_start=936
+  _globals['_ROOMREQUESTMESSAGE']._serialized_end=972
+  _globals['_ROOMRESPONSE']._serialized_start=974
+  _globals['_ROOMRESPONSE']._serialized_end=1048
+  _globals['_ROOMDETAIL']._serialized_start=1050
+  _globals['_ROOMDETAIL']._serialized_end=1109
+  _globals['_PLAYERINFO']._serialized_start=1111
+  _globals['_PLAYERINFO']._serialized_end=1160
+  _globals['_ROOMINFO']._serialized_start=1162
+  _globals['_ROOMINFO']._serialized_end=1207
+  _globals['_GAME']._serialized_start=1210
+  _globals['_GAME']._serialized_end=1372
+  _globals['_AUTH']._serialized_start=1374
+  _globals['_AUTH']._serialized_end=1429
 # @@protoc_insertion_point(module_scope)
@@ -1,122 +1,258 @@
 # Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
 import grpc
+import warnings
 
 from . import server_proto_pb2 as server__proto__pb2
 
+GRPC_GENERATED_VERSION = '1.84.0'
+GRPC_VERSION = grpc.__version__
+_version_not_supported = False
 
-class GameStub(object):
-  """Interface exported by the server.
-  """
+try:
+    from grpc._utilities import first_version_is_lower
+    _version_not_supported = first_version_is_lower(GRPC_VERSION, GRPC_GENERATED_VERSION)
+except ImportError:
+    _version_not_supported = True
 
-  def __init__(self, channel):
-    """Constructor.
+if _version_not_supported:
+    raise RuntimeError(
+        f'The grpc package installed is at version {GRPC_VERSION},'
+        + ' but the generated code in server_proto_pb2_grpc.py depends on'
+        + f' grpcio>={GRPC_GENERATED_VERSION}.'
+        + f' Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}'
+        + f' or downgrade your generated code using grpcio-tools<={GRPC_VERSION}.'
+    )
 
-    Args:
-      channel: A grpc.Channel.
+
+class GameStub:
+    """Interface exported by the server.
+    """
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.GameStream = channel.stream_stream(
+                '/Game/GameStream',
+                request_serializer=server__proto__pb2.GameMessage.SerializeToString,
+                response_deserializer=server__proto__pb2.GameMessage.FromString,
+                _registered_method=True)
+        self.RoomRequest = channel.stream_stream(
+                '/Game/RoomRequest',
+                request_serializer=server__proto__pb2.RoomRequestMessage.SerializeToString,
+                response_deserializer=server__proto__pb2.RoomResponse.FromString,
+                _registered_method=True)
+        self.RoomCheck = channel.unary_unary(
+                '/Game/RoomCheck',
+                request_serializer=server__proto__pb2.RoomRequestMessage.SerializeToString,
+                response_deserializer=server__proto__pb2.RoomResponse.FromString,
+                _registered_method=True)
+
+
+class GameServicer:
+    """Interface exported by the server.
     """
-    self.GameStream = channel.stream_stream(
-        '/Game/GameStream',
-        request_serializer=server__proto__pb2.GameMessage.SerializeToString,
-        response_deserializer=server__proto__pb2.GameMessage.FromString,
-        )
-    self.RoomRequest = channel.stream_stream(
-        '/Game/RoomRequest',
-        request_serializer=server__proto__pb2.RoomRequestMessage.SerializeToString,
-        response_deserializer=server__proto__pb2.RoomResponse.FromString,
-        )
-    self.RoomCheck = channel.unary_unary(
-        '/Game/RoomCheck',
-        request_serializer=server__proto__pb2.RoomRequestMessage.SerializeToString,
-        response_deserializer=server__proto__pb2.RoomResponse.FromString,
-        )
-
-
-class GameServicer(object):
-  """Interface exported by the server.
-  """
-
-  def GameStream(self, request_iterator, context):
-    # missing associated documentation comment in .proto file
-    pass
-    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
-    context.set_details('Method not implemented!')
-    raise NotImplementedError('Method not implemented!')
-
-  def RoomRequest(self, request_iterator, context):
-    # missing associated documentation comment in .proto file
-    pass
-    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
-    context.set_details('Method not implemented!')
-    raise NotImplementedError('Method not implemented!')
-
-  def RoomCheck(self, request, context):
-    # missing associated documentation comment in .proto file
-    pass
-    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
-    context.set_details('Method not implemented!')
-    raise NotImplementedError('Method not implemented!')
+
+    def GameStream(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def RoomRequest(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def RoomCheck(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
 
 
 def add_GameServicer_to_server(servicer, server):
-  rpc_method_handlers = {
-      'GameStream': grpc.stream_stream_rpc_method_handler(
-          servicer.GameStream,
-          request_deserializer=server__proto__pb2.GameMessage.FromString,
-          response_serializer=server__proto__pb2.GameMessage.SerializeToString,
-      ),
-      'RoomRequest': grpc.stream_stream_rpc_method_handler(
-          servicer.RoomRequest,
-          request_deserializer=server__proto__pb2.RoomRequestMessage.FromString,
-          response_serializer=server__proto__pb2.RoomResponse.SerializeToString,
-      ),
-      'RoomCheck': grpc.unary_unary_rpc_method_handler(
-          servicer.RoomCheck,
-          request_deserializer=server__proto__pb2.RoomRequestMessage.FromString,
-          response_serializer=server__proto__pb2.RoomResponse.SerializeToString,
-      ),
-  }
-  generic_handler = grpc.method_handlers_generic_handler(
-      'Game', rpc_method_handlers)
-  server.add_generic_rpc_handlers((generic_handler,))
-
-
-class AuthStub(object):
-  # missing associated documentation comment in .proto file
-  pass
-
-  def __init__(self, channel):
-    """Constructor.
-
-    Args:
-      channel: A grpc.Channel.
+    rpc_method_handlers = {
+            'GameStream': grpc.stream_stream_rpc_method_handler(
+                    servicer.GameStream,
+                    request_deserializer=server__proto__pb2.GameMessage.FromString,
+                    response_serializer=server__proto__pb2.GameMessage.SerializeToString,
+            ),
+            'RoomRequest': grpc.stream_stream_rpc_method_handler(
+                    servicer.RoomRequest,
+                    request_deserializer=server__proto__pb2.RoomRequestMessage.FromString,
+                    response_serializer=server__proto__pb2.RoomResponse.SerializeToString,
+            ),
+            'RoomCheck': grpc.unary_unary_rpc_method_handler(
+                    servicer.RoomCheck,
+                    request_deserializer=server__proto__pb2.RoomRequestMessage.FromString,
+                    response_serializer=server__proto__pb2.RoomResponse.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'Game', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('Game', rpc_method_handlers)
+
+
+ # This class is part of an EXPERIMENTAL API.
+class Game:
+    """Interface exported by the server.
     """
-    self.Authentication = channel.unary_unary(
-        '/Auth/Authentication',
-        request_serializer=server__proto__pb2.AuthRequest.SerializeToString,
-        response_deserializer=server__proto__pb2.AuthResponse.FromString,
-        )
 
+    @staticmethod
+    def GameStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/Game/GameStream',
+            server__proto__pb2.GameMessage.SerializeToString,
+            server__proto__pb2.GameMessage.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
 
-class AuthServicer(object):
-  # missing associated documentation comment in .proto file
-  pass
+    @staticmethod
+    def RoomRequest(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/Game/RoomRequest',
+            server__proto__pb2.RoomRequestMessage.SerializeToString,
+            server__proto__pb2.RoomResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
 
-  def Authentication(self, request, context):
-    # missing associated documentation comment in .proto file
-    pass
-    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
-    context.set_details('Method not implemented!')
-    raise NotImplementedError('Method not implemented!')
+    @staticmethod
+    def RoomCheck(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/Game/RoomCheck',
+            server__proto__pb2.RoomRequestMessage.SerializeToString,
+            server__proto__pb2.RoomResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+
+class AuthStub:
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.Authentication = channel.unary_unary(
+                '/Auth/Authentication',
+                request_serializer=server__proto__pb2.AuthRequest.SerializeToString,
+                response_deserializer=server__proto__pb2.AuthResponse.FromString,
+                _registered_method=True)
+
+
+class AuthServicer:
+    """Missing associated documentation comment in .proto file."""
+
+    def Authentication(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
 
 
 def add_AuthServicer_to_server(servicer, server):
-  rpc_method_handlers = {
-      'Authentication': grpc.unary_unary_rpc_method_handler(
-          servicer.Authentication,
-          request_deserializer=server__proto__pb2.AuthRequest.FromString,
-          response_serializer=server__proto__pb2.AuthResponse.SerializeToString,
-      ),
-  }
-  generic_handler = grpc.method_handlers_generic_handler(
-      'Auth', rpc_method_handlers)
-  server.add_generic_rpc_handlers((generic_handler,))
+    rpc_method_handlers = {
+            'Authentication': grpc.unary_unary_rpc_method_handler(
+                    servicer.Authentication,
+                    request_deserializer=server__proto__pb2.AuthRequest.FromString,
+                    response_serializer=server__proto__pb2.AuthResponse.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'Auth', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('Auth', rpc_method_handlers)
+
+
+ # This class is part of an EXPERIMENTAL API.
+class Auth:
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def Authentication(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/Auth/Authentication',
+            server__proto__pb2.AuthRequest.SerializeToString,
+            server__proto__pb2.AuthResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -10,6 +10,13 @@ LOGIC_OBJECTS = os.path.join(LOGIC_PATH, 'objects.json')
 LOGIC_RULES = os.path.join(LOGIC_PATH, 'rules.json')
 
 LOGIN_SAVE_FILE = 'keep_login'
+TEXTURE_CACHE_PATH = os.path.join(LOCAL_PATH, 'texture_cache')
+PROFILER_TRACE_FILE = os.path.join(LOCAL_PATH, 'profiler_trace.json')
+# texture memory of the images packed in the atlas (bytes), unused textures are evicted above it
+TEXTURE_MEMORY_BUDGET = 64 * 1024 * 1024
+
+# set before importing ahriman.game to use the game logic without pyglet graphics (simulations)
+HEADLESS = False
 
 # TODO do this someway else ?
 if not os.path.exists(LOCAL_PATH):
@@ -50,6 +57,8 @@ BOARD_X_Y_SLOPE = 0.5
 BOARD_Y_STRIDE = 0.75
 BOARD_X_STRIDE = 0.866
 CAMERA_ANGLE = 45
+# board renderer, a RenderMode value: 'batch' (pyglet batch) or 'instanced' (instanced draw calls, OpenGL 3.3)
+BOARD_RENDER_MODE = 'batch'
 
 # double-click max delay
 MOUSE_DOUBLE_CLICK_DELAY = 0.5
@@ -97,6 +106,8 @@ class GameEvent(Enum):
     ROOM_FULL = auto()
     END_OF_CONNECTION = auto()
     BOARD_STATE = auto()
+    # messages of a player were lost, the board must be synchronised
+    OUT_OF_SYNC = auto()
 
 
 class AuthEvent(Enum):
@@ -112,3 +123,8 @@ class GameAction(Enum):
 
     def __int__(self):
         return self.value
+
+
+class RenderMode(Enum):
+    BATCH = 'batch'
+    INSTANCED = 'instanced'
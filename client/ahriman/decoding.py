@@ -0,0 +1,12 @@
+# pure python PNG decoder used by pyglet, imported alone: pyglet.image needs an OpenGL context
+from pyglet.extlibs import png
+
+
+def decode_png(file):
+    """
+    decode a PNG file in a worker process of the texture loader, kept out of ahriman.game so that the workers only
+    import this module
+    :return: (width, height, RGBA bytes), rows from the bottom like pyglet images
+    """
+    width, height, rows, _ = png.Reader(filename=file).asRGBA8()
+    return width, height, b''.join(reversed([bytes(row) for row in rows]))
@@ -31,7 +31,7 @@ def dev_main():
         pyglet.app.run()
     finally:
         logger.info('shutting down Client')
-        window.gameClient.quit()
+        window.gameClient.close()
 
 
 if __name__ == '__main__':
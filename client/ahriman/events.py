@@ -0,0 +1,180 @@
+import threading
+from collections import deque
+from time import perf_counter
+
+from ahriman import constants
+
+
+class Event:
+    """event posted on the window bus, dispatched to the handler registered for its (kind, subkind)"""
+    __slots__ = ('kind', 'subkind')
+
+    def __init__(self, kind, subkind):
+        self.kind = kind
+        self.subkind = subkind
+
+    @property
+    def key(self):
+        return self.kind, self.subkind
+
+    def __repr__(self):
+        slots = [slot for cls in reversed(type(self).__mro__) for slot in getattr(cls, '__slots__', ())]
+        return '{}({})'.format(type(self).__name__,
+                               ', '.join('{}={}'.format(slot, getattr(self, slot)) for slot in slots))
+
+
+class ErrorEvent(Event):
+    """fatal error, shown by the window before quitting"""
+    __slots__ = ('message',)
+
+    def __init__(self, message):
+        super().__init__(constants.Event.WINDOW_EVENT, constants.WindowEvent.ERROR)
+        self.message = message
+
+
+class AuthSuccessEvent(Event):
+    __slots__ = ('code',)
+
+    def __init__(self, code):
+        super().__init__(constants.Event.AUTH_EVENT, constants.AuthEvent.SUCCESS)
+        self.code = code
+
+
+class SymbolsToggleEvent(Event):
+    __slots__ = ('shown',)
+
+    def __init__(self, shown):
+        super().__init__(constants.Event.PLAYER_EVENT, constants.PlayerEvent.SYMBOLS_TOGGLE)
+        self.shown = shown
+
+
+class ActionEvent(Event):
+    """game action of a player, received from the server"""
+    __slots__ = ('action', 'player', 'coord')
+
+    def __init__(self, action, player, coord):
+        super().__init__(constants.Event.GAME_EVENT, constants.GameEvent.ACTION)
+        self.action = action
+        self.player = player
+        self.coord = coord
+
+
+class ConnectionEvent(Event):
+    __slots__ = ('info',)
+
+    def __init__(self, info):
+        super().__init__(constants.Event.GAME_EVENT, constants.GameEvent.CONNECTION)
+        self.info = info
+
+
+class RoomFullEvent(Event):
+    __slots__ = ('room',)
+
+    def __init__(self, room):
+        super().__init__(constants.Event.GAME_EVENT, constants.GameEvent.ROOM_FULL)
+        self.room = room
+
+
+class BoardStateEvent(Event):
+    __slots__ = ('board_bytes',)
+
+    def __init__(self, board_bytes):
+        super().__init__(constants.Event.GAME_EVENT, constants.GameEvent.BOARD_STATE)
+        self.board_bytes = board_bytes
+
+
+def handles(kind, subkind):
+    """register the decorated method of an activity as the handler of the events (kind, subkind)"""
+
+    def register(method):
+        method.handled_events = getattr(method, 'handled_events', ()) + ((kind, subkind),)
+        return method
+
+    return register
+
+
+class EventRing:
+    """
+    bounded ring buffer carrying events to the main thread
+    producers share a lock to claim a slot, the consumer only locks when the ring overflowed: only it moves the read
+    index, and an event is published by moving the write index once it is stored
+    producers never wait (the grpc loop must not block): when the ring is full, the events go to an overflow deque,
+    and the next ones follow them there until the consumer emptied both, which keeps the order of the events
+    """
+
+    def __init__(self, capacity):
+        # power of two, the slot of an index is found by masking
+        capacity = 1 << (capacity - 1).bit_length()
+        self.mask = capacity - 1
+        self.slots = [None] * capacity
+        self.read = 0
+        self.write = 0
+        self.overflow = deque()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.write - self.read + len(self.overflow)
+
+    def put(self, event):
+        with self.lock:
+            if self.overflow or self.write - self.read > self.mask:
+                self.overflow.append(event)
+            else:
+                self.slots[self.write & self.mask] = event
+                self.write += 1
+
+    def get(self):
+        """:return: the oldest event, None if the ring is empty (main thread only)"""
+        if self.read == self.write:
+            # the ring holds the events older than the overflow, which is only read once the ring is empty
+            if not self.overflow:
+                return None
+            with self.lock:
+                return self.overflow.popleft()
+        index = self.read & self.mask
+        event = self.slots[index]
+        self.slots[index] = None
+        self.read += 1
+        return event
+
+
+class EventBus:
+    """
+    events of the window: posted from any thread, handled by the main thread in Window.process_events
+    the events of every thread go through the ring, in the order they were posted, priority events (errors) are
+    appended to a deque (atomic appends and pops) and handled first
+    """
+
+    # seconds of event handling per frame, the remaining events wait for the next frames
+    FRAME_BUDGET = 0.004
+    RING_CAPACITY = 1024
+
+    def __init__(self):
+        self.priority = deque()
+        self.ring = EventRing(EventBus.RING_CAPACITY)
+
+    def __len__(self):
+        return len(self.priority) + len(self.ring)
+
+    def post(self, event, priority=False):
+        if priority:
+            self.priority.append(event)
+        else:
+            self.ring.put(event)
+
+    def drain(self):
+        """
+        events to handle in this frame: all the priority events, then the others until the frame budget is spent
+        (at least one is handled per frame)
+        """
+        deadline = perf_counter() + EventBus.FRAME_BUDGET
+        while True:
+            if self.priority:
+                yield self.priority.popleft()
+            elif perf_counter() > deadline:
+                return
+            else:
+                event = self.ring.get()
+                if event is None:
+                    return
+                yield event
@@ -1,5 +1,9 @@
-from .board import *
-from .board_object import *
-from .game import *
-from .gameTex import *
-from .overlay import *
+from ahriman import constants
+
+# the graphic modules need a display, ahriman.game.logic can be used without them
+if not constants.HEADLESS:
+    from .board import *
+    from .board_object import *
+    from .game import *
+    from .gameTex import *
+    from .overlay import *
@@ -1,10 +1,46 @@
 from math import floor
-from time import time
 
 import numpy
 
+from .clock import AnimationClock
+
 
 class Animator:
+    """
+    value moving along a trajectory, one point per frame of the animation clock
+    a trajectory is a normalised curve scaled between a start and a target: the point of the current frame is
+    computed from the elapsed frames, the curves of the parabolic paths are shared by every animator
+    """
+
+    # normalised parabolic curves by (total duration, transition duration, frequency)
+    curves = {}
+
+    @staticmethod
+    def parabolic_curve(total_duration, transition_duration, frequency):
+        """
+        progress from 0 to 1 of each frame of a parabolic path: constant acceleration during the transitions,
+        constant speed in between
+        """
+        key = (total_duration, transition_duration, frequency)
+        if key not in Animator.curves:
+            duration = total_duration - 2 * transition_duration
+            if duration < 0:
+                duration = 0
+
+            acceleration = 1 / (duration * transition_duration + transition_duration ** 2)
+
+            time_vector = numpy.arange(0, transition_duration, 1 / frequency)
+            transition = acceleration * (numpy.power(time_vector, 2)) / 2
+
+            linear_steps = int(floor(duration * frequency))
+            linear = numpy.linspace(transition[-1], 1 - transition[-1], linear_steps)
+
+            curve = numpy.concatenate((transition, linear, 1 - transition[::-1]))[:, None]
+            curve.flags.writeable = False
+            Animator.curves[key] = curve
+
+        return Animator.curves[key]
+
     def __init__(self, value, setter, frequency=60):
         self.setter = setter
         self.type = type(value)
@@ -12,9 +48,14 @@ class Animator:
         self.active = False
         self.on_end = None
 
-        self.trajectory = []
+        # point of frame i: start + delta * curve[i], the last point is exactly the target
+        self.curve = None
+        self.start = None
+        self.delta = None
+        self.target = None
+        self.step = 0
+
         self.freq = frequency
-        self.current_time = None
 
     @property
     def value(self):
@@ -22,69 +63,56 @@ class Animator:
 
     @value.setter
     def value(self, value):
-        self.active = False
+        self.stop()
         self._value = numpy.array(value)
         self.type = type(value)
         self.setter(value)
 
-    def update(self):
+    def on_frame(self, frames):
+        """called by the animation clock, frames missed between two ticks are skipped"""
+        if not self.active:
+            return
+
+        self.step = min(self.step + frames, len(self.curve))
+        end = self.step == len(self.curve)
+        if end:
+            self._value = self.target
+        else:
+            self._value = self.start + self.delta * self.curve[self.step - 1]
+        self.setter(self.type(self._value))
+        if end:
+            self.stop()
+            if self.on_end is not None:
+                self.on_end()
+
+    def stop(self):
         if self.active:
-            temp = floor(time() * self.freq)
-            if temp != self.current_time:
-                delta = int(temp - self.current_time)
-                self.current_time = temp
-
-                for _ in range(delta):
-                    next_value = self.trajectory.pop(0)
-                    self._value = next_value
-                    out_value = self.type(next_value)
-                    self.setter(out_value)
-                    if len(self.trajectory) == 0:
-                        self.active = False
-                        if self.on_end is not None:
-                            self.on_end()
-                        break
-
-        return self.active
+            self.active = False
+            AnimationClock.unsubscribe(self, self.freq)
+
+    def follow(self, curve, start, delta, target):
+        AnimationClock.subscribe(self, self.freq)
+        self.curve = curve
+        self.start = start
+        self.delta = delta
+        self.target = target
+        self.step = 0
+        self.active = True
 
     def set_path(self, trajectory):
-        self.current_time = floor(time() * self.freq)
-        self.trajectory = list(trajectory)
-        self.active = True
+        trajectory = numpy.array(trajectory)
+        self.follow(trajectory, numpy.zeros(trajectory.shape[1:]), 1, trajectory[-1])
 
     def parabolic(self, total_duration, transition_duration, target, relative=False, start=None, on_end=None):
         if start is None:
             start = self._value
-        target = numpy.array(target)
+        target = numpy.array(target, dtype=float)
         if relative:
-            if len(self.trajectory) > 0:
-                target = self.trajectory[-1] + target
+            if self.active:
+                target = self.target + target
             else:
                 target = start + target
 
-        delta = target - start
-
-        duration = total_duration - 2 * transition_duration
-        if duration < 0:
-            duration = 0
-
-        acceleration = delta / (duration * transition_duration + transition_duration ** 2)
-
-        time_vector = numpy.arange(0, transition_duration, 1 / self.freq)[:, None]
-
-        transition = acceleration * (numpy.power(time_vector, 2)) / 2
-
-        linear_start = start + transition[-1]
-        linear_stop = target - transition[-1]
-        linear_steps = int(floor(duration * self.freq))
-
-        linear_path = [numpy.linspace(linear_start[dim], linear_stop[dim], linear_steps)[:, None] for dim in
-                       range(len(start))]
-        linear_trajectory = numpy.concatenate(linear_path, axis=-1)
-
-        start_transition = start + transition
-        end_transition = target - transition[::-1]
-
-        trajectory = numpy.concatenate((start_transition, linear_trajectory, end_transition), axis=0)
-        self.set_path(trajectory)
+        curve = Animator.parabolic_curve(total_duration, transition_duration, self.freq)
+        self.follow(curve, start, target - start, target)
         self.on_end = on_end
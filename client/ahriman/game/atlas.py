@@ -0,0 +1,118 @@
+import pyglet
+from pyglet.gl import *
+
+
+class Atlas:
+    """
+    sprite frames packed in a few large textures, with a lookup table of their regions
+    quads of different sprites share the same texture, so a batch only switches texture between pages
+    the space of a removed image is reused by the next images that fit in it, the rest of the space is split
+    (guillotine) and kept free, a page is released once all of its images are removed
+    """
+
+    PAGE_SIZE = 1024
+    BORDER = 1
+
+    def __init__(self, page_size=PAGE_SIZE):
+        self.page_size = min(page_size, pyglet.image.get_max_texture_size())
+        self.pages = []
+        self.regions = {}
+        self.page_keys = {}
+        # by page: free rectangles (x, y, width, height) left by the removed images, borders included
+        self.free = {}
+        # bytes of the packed images, borders included
+        self.used = 0
+
+    def __getitem__(self, key):
+        return self.regions[key]
+
+    def __len__(self):
+        return len(self.regions)
+
+    @property
+    def textures(self):
+        return [page.texture for page in self.pages]
+
+    @property
+    def memory(self):
+        """bytes of texture memory used by the pages"""
+        return sum(4 * page.texture.width * page.texture.height for page in self.pages)
+
+    @staticmethod
+    def size(region):
+        """bytes of texture memory taken by a packed image, borders included"""
+        return 4 * (region.width + 2 * Atlas.BORDER) * (region.height + 2 * Atlas.BORDER)
+
+    def uv(self, key):
+        """texture coordinates (t3f) of a packed image"""
+        return self.regions[key].tex_coords
+
+    def reuse(self, image):
+        """:return: (page, region) of the image blitted in the smallest free rectangle it fits in, None if none"""
+        width, height = image.width + 2 * Atlas.BORDER, image.height + 2 * Atlas.BORDER
+        fits = [(rect[2] * rect[3], page, rect) for page, rects in self.free.items() for rect in rects
+                if rect[2] >= width and rect[3] >= height]
+        if not fits:
+            return None
+
+        _, page, rect = min(fits, key=lambda fit: fit[0])
+        x, y, w, h = rect
+        rects = self.free[page]
+        rects.remove(rect)
+        # split the remaining space along the longest side of the rectangle
+        if w - width > h - height:
+            remains = ((x + width, y, w - width, h), (x, y + height, width, h - height))
+        else:
+            remains = ((x + width, y, w - width, height), (x, y + height, w, h - height))
+        rects.extend(remain for remain in remains if remain[2] > 2 * Atlas.BORDER and remain[3] > 2 * Atlas.BORDER)
+
+        page.texture.blit_into(image, x + Atlas.BORDER, y + Atlas.BORDER, 0)
+        return page, page.texture.get_region(x + Atlas.BORDER, y + Atlas.BORDER, image.width, image.height)
+
+    def add(self, key, image):
+        """
+        pack one image in free space left by removed images, else in the first page with enough room,
+        a new page is created when all are full
+        """
+        reused = self.reuse(image)
+        if reused is not None:
+            page, region = reused
+        else:
+            for page in self.pages:
+                try:
+                    region = page.add(image, Atlas.BORDER)
+                    break
+                except pyglet.image.atlas.AllocatorException:
+                    pass
+            else:
+                page = pyglet.image.atlas.TextureAtlas(self.page_size, self.page_size)
+                self.pages.append(page)
+                self.page_keys[page] = set()
+                self.free[page] = []
+                region = page.add(image, Atlas.BORDER)
+
+                # no blur filter on resize (pixel art)
+                glBindTexture(page.texture.target, page.texture.id)
+                glTexParameterf(page.texture.target, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+                glTexParameterf(page.texture.target, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+
+        self.regions[key] = region
+        self.page_keys[page].add(key)
+        self.used += Atlas.size(region)
+        return region
+
+    def remove(self, key):
+        """forget an image, its space is kept for the next images and its page is freed with the last image"""
+        region = self.regions.pop(key)
+        self.used -= Atlas.size(region)
+        for page, keys in self.page_keys.items():
+            if page.texture is region.owner:
+                keys.discard(key)
+                if not keys:
+                    self.pages.remove(page)
+                    del self.page_keys[page]
+                    del self.free[page]
+                else:
+                    self.free[page].append((region.x - Atlas.BORDER, region.y - Atlas.BORDER,
+                                            region.width + 2 * Atlas.BORDER, region.height + 2 * Atlas.BORDER))
+                break
@@ -1,11 +1,57 @@
-from math import sin, cos, radians, tan, atan, degrees, floor, sqrt, acos
+from math import sin, cos, radians, tan, degrees, floor, ceil, sqrt
 
+import numpy
 import pyglet
 from pyglet.gl import *
 from pyglet.window import key
 
 from ahriman import constants
+from ahriman import logger
+from ahriman.constants import RenderMode
+from ahriman.profiler import Profiler
 from .board_object import Tile, Node
+from .gameTex import TextureScheduler
+from .instanced import InstancedBatch
+from .logic import Logic
+
+
+class BoardChunk:
+    """
+    part of a row of the board with its own batches: changing an object only rebuilds the draw order of its chunk,
+    and chunks out of the camera view are skipped
+    the ground layers have their own batch: the ground of every chunk is drawn before the sprites of any chunk
+    """
+
+    # margin around the tile positions covering the quads of tiles and nodes
+    MARGIN = 1.5
+
+    def __init__(self, render_mode):
+        if render_mode == RenderMode.INSTANCED:
+            self.ground = InstancedBatch()
+            self.batch = InstancedBatch()
+        else:
+            self.ground = pyglet.graphics.Batch()
+            self.batch = pyglet.graphics.Batch()
+
+        self.visible = True
+        self.min_x = self.min_z = float('inf')
+        self.max_x = self.max_z = float('-inf')
+
+    def extend(self, x, z):
+        self.min_x = min(self.min_x, x - BoardChunk.MARGIN)
+        self.max_x = max(self.max_x, x + BoardChunk.MARGIN)
+        self.min_z = min(self.min_z, z - BoardChunk.MARGIN)
+        self.max_z = max(self.max_z, z + BoardChunk.MARGIN)
+
+    def intersects(self, region):
+        min_x, max_x, min_z, max_z = region
+        return self.min_x <= max_x and min_x <= self.max_x and self.min_z <= max_z and min_z <= self.max_z
+
+    def delete(self):
+        """free the GL objects of instanced batches, pyglet batches release their buffers when collected"""
+        for batch in (self.ground, self.batch):
+            if isinstance(batch, InstancedBatch):
+                batch.delete()
 
 
 class Board:
@@ -13,14 +59,50 @@ class Board:
     NODE_SELECT_MIN_DIST = 0.25
     NODE_SELECT_ANGLE_MARGIN = 7.5
 
+    SQRT3_2 = sqrt(3) / 2
+    SQRT3_3 = sqrt(3) / 3
+    SQRT3_4 = sqrt(3) / 4
+
+    # with the direction from the center of a cell folded in the first quadrant, the node sectors are bounded by
+    # these angles from the horizontal: above the first bound is the middle sector, between the second and the third
+    # are the side sectors
+    NODE_SECTOR_COTANGENTS = tuple(1 / tan(radians(angle)) for angle in (
+        60 + NODE_SELECT_ANGLE_MARGIN, 60 - NODE_SELECT_ANGLE_MARGIN, NODE_SELECT_ANGLE_MARGIN))
+    # node picked in each sector (dx, dy, upper) below and above the center
+    NODE_SECTOR_OFFSETS = (((1, 0, 0), (1, 1, 1)),
+                           ((0, 0, 1), (1, 1, 0)),
+                           ((0, 0, 0), (0, 1, 1)))
+
+    # the lower corners of a cell belong to the tiles of the previous row: below height = width / 2, from the middle
+    # of the bottom of the cell, distance to these borders per unit of height - width / 2
+    TILE_DIAGONAL_DISTANCE = 2 / sqrt(5)
+    # the coordinates around the cell centers are the ground coordinates stretched by this factor along x
+    CELL_STRETCH = SQRT3_2 / constants.BOARD_X_STRIDE
+
+    # chunks are cut in rows every CHUNK_WIDTH ground units along x: sprites of different rows overlap,
+    # so one chunk never mixes rows and the rows are drawn back to front
+    CHUNK_WIDTH = 16
+    # highest point of the sprites above the ground, for culling
+    MAX_OBJECT_HEIGHT = 1
+
     FIELD_OF_VIEW = 30
 
-    def __init__(self, window, rows=5, cols=5, mouse_move_hover=False):
+    # height in pixels of the bands of the window sharing the same bounds of the ground covered by a pixel
+    PICK_BAND = 16
+
+    def __init__(self, window, rows=5, cols=5, mouse_move_hover=False, render_mode=None):
         """create hexagonal grid of tiles"""
         glClearColor(*constants.BOARD_BACKGROUND_COLOR)
 
         self.win = window
-        self.batch = pyglet.graphics.Batch()
+        self.render_mode = RenderMode(render_mode or constants.BOARD_RENDER_MODE)
+        if self.render_mode == RenderMode.INSTANCED and not InstancedBatch.supported():
+            logger.warning('instanced rendering needs OpenGL 3.3, falling back to batch rendering')
+            self.render_mode = RenderMode.BATCH
+
+        # chunks by (row, block of columns), drawn back to front
+        self.chunks = {}
+        self.draw_order = []
         self.minx = (-constants.BOARD_X_Y_SLOPE * rows + 1) * constants.BOARD_X_STRIDE
         self.max_x = (cols + constants.BOARD_X_Y_SLOPE * rows - 1) * constants.BOARD_X_STRIDE
         self.min_z = 0.5
@@ -31,15 +113,19 @@ class Board:
         self.highlighted = None
         self.selected = None
 
+        # last tile pick for the camera version: position, ground margin and picked tile
+        self.pick_version = None
+        self.pick_scales = []
+        self.last_pick = None
+        # lookup grids of the tile and node coordinates, for the picking of arrays of positions
+        self.coord_grids = {}
+        self.cull_version = None
+
         self.tiles = {}
         self.nodes = {}
 
-        for hy in range(rows):
-            for hx in range(cols + hy):
-                self.create_tile(hx, hy)
-        for hy in range(rows, 2 * rows - 1):
-            for hx in range(hy - rows + 1, cols + rows - 1):
-                self.create_tile(hx, hy)
+        for hx, hy in Logic.tile_layout(rows, cols):
+            self.create_tile(hx, hy)
 
         self.project = Projector(self.win.width, self.win.height,
                                  ((self.max_x + self.minx) / 2, 0, (self.max_z + self.min_z) / 2),
@@ -49,7 +135,11 @@ class Board:
         self.rows = rows
         self.cols = cols
 
+        self.draw_order = [self.chunks[key] for key in sorted(self.chunks)]
+
     def __setitem__(self, coord, value):
+        self.last_pick = None
+        self.coord_grids = {}
         if len(coord) == 2:
             self.tiles[coord] = value
         elif len(coord) == 3:
@@ -65,24 +155,45 @@ class Board:
         else:
             raise (ValueError('invalid key length: {}'.format(len(coord))))
 
-    def create_tile(self, hx, hy):
-        self.tiles[(hx, hy)] = Tile(self.batch, hx, hy)
-        self.nodes[(hx, hy, 0)] = Node(self.batch, hx, hy, 0)
-        self.nodes[(hx, hy, 1)] = Node(self.batch, hx, hy, 1)
-
-        self.nodes[(hx + 1, hy + 1, 0)] = Node(self.batch, hx + 1, hy + 1, 0)
-        self.nodes[(hx + 1, hy + 1, 1)] = Node(self.batch, hx + 1, hy + 1, 1)
+    def chunk(self, hx, hy):
+        """chunk containing the objects of the given coordinates, created on first use"""
+        x = (hx - constants.BOARD_X_Y_SLOPE * hy) * constants.BOARD_X_STRIDE
+        key = (hy, floor(x / Board.CHUNK_WIDTH))
+        if key not in self.chunks:
+            self.chunks[key] = BoardChunk(self.render_mode)
+        chunk = self.chunks[key]
+        chunk.extend(x, constants.BOARD_Y_STRIDE * hy)
+        return chunk
 
-        self.nodes[(hx + 1, hy, 0)] = Node(self.batch, hx + 1, hy, 0)
-        self.nodes[(hx, hy + 1, 1)] = Node(self.batch, hx, hy + 1, 1)
+    def create_tile(self, hx, hy):
+        chunk = self.chunk(hx, hy)
+        self.tiles[(hx, hy)] = Tile(chunk.batch, chunk.ground, hx, hy)
+        for coord in Logic.tile_nodes(hx, hy):
+            chunk = self.chunk(coord[0], coord[1])
+            self.nodes[coord] = Node(chunk.batch, chunk.ground, *coord)
 
     def update(self, dt, move=True):
-        if move:
-            self.move_cam(dt)
-        for tile in self.tiles.values():
-            tile.update()
-        for node in self.nodes.values():
-            node.update()
+        with Profiler.scope('Board.update'):
+            if move:
+                self.move_cam(dt)
+            self.cull()
+
+    def cull(self):
+        """hide the chunks outside of the camera view, their texture updates are deferred until visible"""
+        if self.cull_version == self.project.cam.version:
+            return
+        self.cull_version = self.project.cam.version
+
+        region = self.project.visible_region(Board.MAX_OBJECT_HEIGHT)
+        for chunk in self.draw_order:
+            visible = region is None or chunk.intersects(region)
+            if visible != chunk.visible:
+                chunk.visible = visible
+                for batch in (chunk.ground, chunk.batch):
+                    if visible:
+                        TextureScheduler.show(batch)
+                    else:
+                        TextureScheduler.hide(batch)
 
     def toggle_symbols(self, enable):
         for tile in self.tiles.values():
@@ -93,12 +204,21 @@ class Board:
             tile.delete()
         for node in self.nodes.values():
             node.delete()
+        for chunk in self.draw_order:
+            TextureScheduler.show(chunk.ground)
+            TextureScheduler.show(chunk.batch)
+            chunk.delete()
 
     def draw(self):
-        glPushMatrix()
-        self.project.perspective()
-        self.batch.draw()
-        glPopMatrix()
+        with Profiler.scope('Board.draw'):
+            glPushMatrix()
+            self.project.perspective()
+            visible = [chunk for chunk in self.draw_order if chunk.visible]
+            for chunk in visible:
+                chunk.ground.draw()
+            for chunk in visible:
+                chunk.batch.draw()
+            glPopMatrix()
 
     def mouse_to_board_coord(self, x, y):
         (vx, vy) = self.project.get_virtual(x, y)
@@ -108,11 +228,120 @@ class Board:
 
         return hxf, hyf
 
+    def mouse_to_board_coords(self, x, y):
+        """mouse_to_board_coord on arrays of positions"""
+        (vx, vy) = self.project.get_virtual(numpy.asarray(x, dtype=float), numpy.asarray(y, dtype=float))
+        hyf = vy / constants.BOARD_Y_STRIDE
+        hxf = (vx / constants.BOARD_X_STRIDE) + constants.BOARD_X_Y_SLOPE * numpy.floor(hyf) - (
+                1 - constants.BOARD_X_STRIDE) / 2
+
+        return hxf, hyf
+
+    def coord_grid(self, coords):
+        """:return: (lowest coordinates, boolean grid of the coordinates present in coords)"""
+        if id(coords) not in self.coord_grids:
+            keys = numpy.array(list(coords), dtype=numpy.int64)
+            low = keys.min(axis=0)
+            grid = numpy.zeros(keys.max(axis=0) - low + 1, dtype=bool)
+            grid[tuple((keys - low).T)] = True
+            self.coord_grids[id(coords)] = (low, grid)
+        return self.coord_grids[id(coords)]
+
+    def contains(self, coords, *columns):
+        """vectorised membership test of the coordinates given by columns in the dict coords"""
+        low, grid = self.coord_grid(coords)
+        index = numpy.stack([numpy.ravel(column) for column in columns]) - low[:, None]
+        inside = numpy.all((index >= 0) & (index < numpy.array(grid.shape)[:, None]), axis=0)
+        found = numpy.zeros(inside.shape, dtype=bool)
+        found[inside] = grid[tuple(index[:, inside])]
+        return found.reshape(numpy.shape(columns[0]))
+
+    def mouse_to_tile_coords(self, x, y):
+        """
+        mouse_to_tile_coord on arrays of positions
+        :return: (hx, hy, found) integer arrays and a boolean array, the coordinates are meaningless where not found
+        """
+        hxf, hyf = self.mouse_to_board_coords(x, y)
+
+        hyf2 = hyf - numpy.abs(hxf % 1 - 0.5) * Board.SQRT3_3
+        lower = (hyf % 1 < 0.5) & (numpy.floor(hyf2) != numpy.floor(hyf))
+        hxf = numpy.where(lower, hxf - constants.BOARD_X_Y_SLOPE, hxf)
+        hyf = numpy.where(lower, hyf2, hyf)
+
+        hx = numpy.floor(hxf).astype(numpy.int64)
+        hy = numpy.floor(hyf).astype(numpy.int64)
+
+        return hx, hy, self.contains(self.tiles, hx, hy)
+
+    def mouse_to_node_coords(self, x, y):
+        """
+        mouse_to_node_coord on arrays of positions
+        :return: (hx, hy, upper, found) integer arrays and a boolean array, the coordinates are meaningless where
+        not found
+        """
+        hxf, hyf = self.mouse_to_board_coords(x, y)
+        fx, fy = numpy.floor(hxf).astype(numpy.int64), numpy.floor(hyf).astype(numpy.int64)
+
+        trigo_x = (hxf % 1) * Board.SQRT3_2 - Board.SQRT3_4
+        trigo_y = (hyf % 1) * 0.75 - 0.5
+        square_norm = trigo_x ** 2 + trigo_y ** 2
+        width, height = numpy.abs(trigo_x), numpy.abs(trigo_y)
+
+        zone = sum((width >= height * cotangent).astype(int) for cotangent in Board.NODE_SECTOR_COTANGENTS)
+        sector = numpy.where(zone == 0, 1, numpy.where(trigo_x > 0, 0, 2))
+
+        offsets = numpy.array(Board.NODE_SECTOR_OFFSETS)[sector, (trigo_y > 0).astype(int)]
+        hx = fx + offsets[..., 0]
+        hy = fy + offsets[..., 1]
+        upper = offsets[..., 2]
+
+        found = (square_norm >= Board.NODE_SELECT_MIN_DIST ** 2) & (zone % 2 == 0)
+        return hx, hy, upper, found & self.contains(self.nodes, hx, hy, upper)
+
     def mouse_to_tile_coord(self, x, y):
+        """
+        tile under the mouse, the last picked tile is kept while the mouse stays close enough to its picked position:
+        pick_tile also returns the ground distance to the border of the area where the same tile is picked,
+        and the ground covered by the mouse move is bounded with the pixel scales of the camera
+        """
+        if self.pick_version != self.project.cam.version:
+            self.pick_version = self.project.cam.version
+            height = 2 * self.project.height
+            self.pick_scales = [self.project.pixel_scale(min(band + Board.PICK_BAND, height))
+                                for band in range(0, ceil(height) + 1, Board.PICK_BAND)]
+            self.last_pick = None
+
+        if self.last_pick is not None:
+            last_x, last_y, margin, tile = self.last_pick
+            # a pixel covers more ground higher in the window, the scales of the band of the highest position hold
+            band = int(max(y, last_y)) // Board.PICK_BAND
+            if band < len(self.pick_scales):
+                scale_x, scale_xy, scale_y = self.pick_scales[band]
+                dx = scale_x * abs(x - last_x) + scale_xy * abs(y - last_y)
+                dy = scale_y * (y - last_y)
+                if dx * dx + dy * dy < margin * margin:
+                    return tile
+
+        tile, margin = self.pick_tile(x, y)
+        if 0 <= x <= 2 * self.project.width and 0 <= y <= 2 * self.project.height:
+            self.last_pick = (x, y, margin, tile)
+        return tile
+
+    def pick_tile(self, x, y):
+        """
+        :return: (coordinates of the tile under the mouse or None,
+        ground distance from the mouse position to the border of the area where this result is picked)
+        """
         hxf, hyf = self.mouse_to_board_coord(x, y)
 
+        # distance to the sides of the cell and to the borders of the tiles of the previous row
+        width = abs(hxf % 1 - 0.5) * Board.SQRT3_2
+        height = (hyf % 1) * 0.75
+        margin = min(Board.SQRT3_4 - width, height, 0.75 - height,
+                     abs(height - width / 2) * Board.TILE_DIAGONAL_DISTANCE) / Board.CELL_STRETCH
+
         if hyf % 1 < 0.5:
-            hyf2 = hyf - abs(hxf % 1 - 0.5) * sqrt(3) / 3
+            hyf2 = hyf - abs(hxf % 1 - 0.5) * Board.SQRT3_3
             if floor(hyf2) != floor(hyf):
                 hxf -= constants.BOARD_X_Y_SLOPE
                 hyf = hyf2
@@ -121,41 +350,31 @@ class Board:
         hx = floor(hxf)
 
         if (hx, hy) in self.tiles:
-            return hx, hy
+            return (hx, hy), margin
 
-        return None
+        return None, margin
 
     def mouse_to_node_coord(self, x, y):
         hxf, hyf = self.mouse_to_board_coord(x, y)
         fx, fy = floor(hxf), floor(hyf)
 
-        trigo_x = (hxf % 1) * sqrt(3) / 2 - sqrt(3) / 4
+        trigo_x = (hxf % 1) * Board.SQRT3_2 - Board.SQRT3_4
         trigo_y = (hyf % 1) * 0.75 - 0.5
-        vector_norm = sqrt(trigo_x ** 2 + trigo_y ** 2)
-        if vector_norm < Board.NODE_SELECT_MIN_DIST:
+        if trigo_x * trigo_x + trigo_y * trigo_y < Board.NODE_SELECT_MIN_DIST ** 2:
             return None
 
-        cosine = trigo_x / vector_norm
-        angle = degrees(acos(cosine))
-
-        if Board.NODE_SELECT_ANGLE_MARGIN < angle < 60 - Board.NODE_SELECT_ANGLE_MARGIN:
-            if trigo_y > 0:
-                node = (fx + 1, fy + 1, 1)
-            else:
-                node = (fx + 1, fy, 0)
-        elif 60 + Board.NODE_SELECT_ANGLE_MARGIN < angle < 120 - Board.NODE_SELECT_ANGLE_MARGIN:
-            if trigo_y > 0:
-                node = (fx + 1, fy + 1, 0)
-            else:
-                node = (fx, fy, 1)
-        elif 120 + Board.NODE_SELECT_ANGLE_MARGIN < angle < 180 - Board.NODE_SELECT_ANGLE_MARGIN:
-            if trigo_y > 0:
-                node = (fx, fy + 1, 1)
-            else:
-                node = (fx, fy, 0)
+        # the sector is found by comparing the folded direction to the sector bounds, without its angle or norm
+        width, height = abs(trigo_x), abs(trigo_y)
+        middle, side, outer = Board.NODE_SECTOR_COTANGENTS
+        if width < height * middle:
+            sector = 1
+        elif height * side <= width < height * outer:
+            sector = 0 if trigo_x > 0 else 2
         else:
             return None
 
+        dx, dy, upper = Board.NODE_SECTOR_OFFSETS[sector][trigo_y > 0]
+        node = (fx + dx, fy + dy, upper)
         if node in self.nodes:
             return node
         return None
@@ -228,15 +447,20 @@ class Projector:
         self.cam = SimpleCam(focus, angle, boundaries, distance)
 
         self.tanthet = tan(self.fov / 2)
-        self.cotgam = 1 / tan(self.cam.angle)
+        self.tangam = tan(self.cam.angle)
+        self.cotgam = 1 / self.tangam
         self.cosgam = cos(self.cam.angle)
 
         self.R = self.height * sin(self.fov / 2 + self.cam.angle) / sin(self.fov / 2)
 
+        self.inverse_version = None
+        self.inverse_coefficients = None
+
     def on_resize(self, width, height):
         self.ratio = width / height
         self.width = width / 2
         self.height = height / 2
+        self.cam.version += 1
 
         self.R = self.height * sin(self.fov / 2 + self.cam.angle) / sin(self.fov / 2)
 
@@ -251,16 +475,65 @@ class Projector:
 
         self.cam.perspective()
 
+    def visible_region(self, max_height=0):
+        """
+        bounding box on the ground of the part of the scene between the ground and max_height seen by the camera
+        :return: (min_x, max_x, min_z, max_z), None when the view reaches the horizon
+        """
+        if self.cam.angle - self.fov / 2 <= 0:
+            return None
+
+        cam = self.cam
+        xs = []
+        zs = []
+        for x, y in ((0, 0), (2 * self.width, 0), (0, 2 * self.height), (2 * self.width, 2 * self.height)):
+            xv, zv = self.get_virtual(x, y)
+            for height in (0, max_height):
+                # point of the ray from the camera through (x, y) at this height
+                ratio = (cam.y - height) / cam.y
+                xs.append(cam.x + ratio * (xv - cam.x))
+                zs.append(cam.z + ratio * (zv - cam.z))
+
+        return min(xs), max(xs), min(zs), max(zs)
+
+    def inverse(self):
+        """coefficients of the inverse projection, computed once per camera version"""
+        if self.inverse_version != self.cam.version:
+            self.inverse_version = self.cam.version
+            self.inverse_coefficients = (self.tanthet / self.height, self.tanthet, self.tangam,
+                                         self.cam.lz + self.cam.y * self.cotgam, self.cam.y,
+                                         self.cam.lx, self.width, self.R, self.cosgam)
+        return self.inverse_coefficients
+
     def get_virtual(self, x, y):
         """get the coordinates of the mouse in the projected ground plane"""
-        alpha = - atan(((y / self.height) - 1) * self.tanthet)
-        yv = (self.cam.lz - self.cam.y * ((1 / tan(alpha + self.cam.angle)) - self.cotgam))
+        y_scale, tanthet, tangam, z0, cam_y, lx, width, r, cosgam = self.inverse()
 
-        yp = y * self.cosgam
-        xv = (self.cam.lx + self.cam.y * (x - self.width) / (self.R - yp))
+        # tangent of the ray below the view axis, the cotangent of its angle with the ground
+        # is 1 / tan(angle - atan(t)), expanded to avoid the trigonometric functions
+        t = y * y_scale - tanthet
+        yv = z0 - cam_y * (1 + t * tangam) / (tangam - t)
+        xv = lx + cam_y * (x - width) / (r - y * cosgam)
 
         return xv, yv
 
+    def pixel_scale(self, y):
+        """
+        bounds (kx, kxy, ky) of the ground covered by a move (dx, dy) of the mouse below the height y of the window:
+        the points of the ground under the two positions are at most kx |dx| + kxy |dy| apart along x,
+        and ky |dy| apart along y
+        a pixel covers more ground higher in the window, the bounds are the derivatives of get_virtual at y
+        """
+        y_scale, tanthet, tangam, z0, cam_y, lx, width, r, cosgam = self.inverse()
+
+        x_denominator = r - y * cosgam
+        y_denominator = tangam - (y * y_scale - tanthet)
+        if x_denominator <= 0 or y_denominator <= 0:
+            return float('inf'), float('inf'), float('inf')
+
+        return (cam_y / x_denominator, cam_y * width * cosgam / x_denominator ** 2,
+                cam_y * y_scale * (1 + tangam ** 2) / y_denominator ** 2)
+
 
 class SimpleCam:
     """camera with fixed orientation and limited moving area"""
@@ -277,6 +550,9 @@ class SimpleCam:
         self.y_lim = boundaries[1]
         self.z_lim = boundaries[2]
 
+        # incremented whenever the view changes, for the results computed from it
+        self.version = 0
+
     def perspective(self):
         """place camera in space"""
         gluLookAt(self.x, self.y, self.z, self.lx, self.ly, self.lz, 0, 1, 0)
@@ -296,10 +572,15 @@ class SimpleCam:
                 dx += (self.x - zoom_point[0]) * dy / (self.y - dy)
                 dz += (self.lz - zoom_point[1]) * dy / (self.y - dy)
 
-        if self.z_lim[0] < (self.lz + dz) < self.z_lim[1]:
+            if dy:
+                self.version += 1
+
+        if self.z_lim[0] < (self.lz + dz) < self.z_lim[1] and dz:
             self.lz += dz
             self.z += dz
+            self.version += 1
 
-        if self.x_lim[0] < (self.lx + dx) < self.x_lim[1]:
+        if self.x_lim[0] < (self.lx + dx) < self.x_lim[1] and dx:
             self.lx += dx
             self.x += dx
+            self.version += 1
@@ -4,13 +4,19 @@ from .gameTex import *
 
 
 class BoardObject:
+    """
+    objects are drawn in two batches: the ground layers, drawn before everything else,
+    and the standing layers, with orders local to the row of the object
+    a batch never mixes rows, the board draws the batches of the rows back to front
+    """
+
     # layers drawn on the 'ground'
     GROUND_LAYERS = 4
 
     # layers per texture
     TEXTURE_LAYERS = 3
 
-    # layers drawn before the first tile (ground + 1 row of totems)
+    # layers drawn before the tiles of a row (ground + the upper totems of the row)
     BOTTOM_LAYERS = GROUND_LAYERS + TEXTURE_LAYERS
 
     @staticmethod
@@ -24,19 +30,16 @@ class BoardObject:
 
         return '_'.join((texture, string_owner)) if texture != 'none' else 'none'
 
-    def __init__(self, batch):
+    def __init__(self, batch, ground_batch):
 
         self.tex_dict = None
 
         self.batch = batch
+        self.ground_batch = ground_batch
         self.color = constants.TILE_BASE_COLOR
 
         self.texture_managers = {}
 
-    def update(self):
-        for manager in self.texture_managers.values():
-            manager.update()
-
     def delete(self):
         for manager in self.texture_managers.values():
             manager.delete()
@@ -78,8 +81,8 @@ class Tile(BoardObject):
 
     SYMBOL_HEIGHT = 0
 
-    def __init__(self, batch, hx, hy):
-        super().__init__(batch)
+    def __init__(self, batch, ground_batch, hx, hy):
+        super().__init__(batch, ground_batch)
 
         x = (hx - constants.BOARD_X_Y_SLOPE * hy) * constants.BOARD_X_STRIDE
         z = constants.BOARD_Y_STRIDE * hy
@@ -89,14 +92,14 @@ class Tile(BoardObject):
             x + 1, 0, z + 1,
             x + 1, 0, z,
             x, 0, z))
-        self.texture_managers['select'] = TextureManager('none', select_coords, self.batch,
+        self.texture_managers['select'] = TextureManager('none', select_coords, self.ground_batch,
                                                          order=1, color4f=self.color)
 
         bottom_coords = ('v3f', (x, 0, z + 1,
                                  x + 1, 0, z + 1,
                                  x + 1, 0, z,
                                  x, 0, z))
-        self.texture_managers['bottom'] = TextureManager('none', bottom_coords, self.batch,
+        self.texture_managers['bottom'] = TextureManager('none', bottom_coords, self.ground_batch,
                                                          order=0, color4f=self.color)
 
         back_coords = ('v3f', (
@@ -105,8 +108,7 @@ class Tile(BoardObject):
             x + 1, 1, z + Tile.BACK_COORDS,
             x, 1, z + Tile.BACK_COORDS))
         self.texture_managers['back'] = TextureManager('none', back_coords, self.batch,
-                                                       Tile.TILE_LAYERS * hy
-                                                       + BoardObject.BOTTOM_LAYERS,
+                                                       BoardObject.BOTTOM_LAYERS,
                                                        self.color)
 
         mid_coords = ('v3f', (
@@ -115,8 +117,7 @@ class Tile(BoardObject):
             x + 1, 1, z + Tile.MID_COORDS,
             x, 1, z + Tile.MID_COORDS))
         self.texture_managers['mid'] = TextureManager('none', mid_coords, self.batch,
-                                                      Tile.TILE_LAYERS * hy
-                                                      + BoardObject.TEXTURE_LAYERS
+                                                      BoardObject.TEXTURE_LAYERS
                                                       + BoardObject.BOTTOM_LAYERS,
                                                       self.color)
 
@@ -126,8 +127,7 @@ class Tile(BoardObject):
             x + 1, 1, z + Tile.FRONT_COORDS,
             x, 1, z + Tile.FRONT_COORDS))
         self.texture_managers['front'] = TextureManager('none', front_coords, self.batch,
-                                                        Tile.TILE_LAYERS * hy
-                                                        + 2 * BoardObject.TEXTURE_LAYERS
+                                                        2 * BoardObject.TEXTURE_LAYERS
                                                         + BoardObject.BOTTOM_LAYERS,
                                                         self.color)
 
@@ -144,8 +144,7 @@ class Tile(BoardObject):
             x, h + dy, z + Tile.FRONT_COORDS - dz,))
 
         self.texture_managers['symbol'] = TextureManager('none', symbol_coords, self.batch,
-                                                         Tile.TILE_LAYERS * hy
-                                                         + 3 * BoardObject.TEXTURE_LAYERS
+                                                         3 * BoardObject.TEXTURE_LAYERS
                                                          + BoardObject.BOTTOM_LAYERS,
                                                          (1, 1, 1, 0))
 
@@ -159,15 +158,13 @@ class Tile(BoardObject):
 
 
 class Node(BoardObject):
-    def __init__(self, batch, hx, hy, upper):
-        super().__init__(batch)
+    def __init__(self, batch, ground_batch, hx, hy, upper):
+        super().__init__(batch, ground_batch)
 
         x = (hx - constants.BOARD_X_Y_SLOPE * hy) * constants.BOARD_X_STRIDE
         z = constants.BOARD_Y_STRIDE * hy
 
-        batch_order = (BoardObject.BOTTOM_LAYERS
-                       + Tile.TILE_LAYERS * hy
-                       - BoardObject.TEXTURE_LAYERS)
+        batch_order = BoardObject.BOTTOM_LAYERS - BoardObject.TEXTURE_LAYERS
 
         if not upper:
             x -= math.sqrt(3) / 4
@@ -179,14 +176,14 @@ class Node(BoardObject):
             x + 1, 0, z + 0.5,
             x + 1, 0, z - 0.5,
             x, 0, z - 0.5))
-        self.texture_managers['select'] = TextureManager('none', select_coords, self.batch,
+        self.texture_managers['select'] = TextureManager('none', select_coords, self.ground_batch,
                                                          order=2, color4f=self.color)
 
         bottom_coords = ('v3f', (x, 0, z + 0.5,
                                  x + 1, 0, z + 0.5,
                                  x + 1, 0, z - 0.5,
                                  x, 0, z - 0.5))
-        self.texture_managers['bottom'] = TextureManager('none', bottom_coords, self.batch,
+        self.texture_managers['bottom'] = TextureManager('none', bottom_coords, self.ground_batch,
                                                          order=3, color4f=self.color)
 
         mid_coords = ('v3f', (x, 0, z,
@@ -0,0 +1,268 @@
+import struct
+
+import numpy
+
+from .logic import Logic
+
+
+class BoardState:
+    """
+    versioned binary formats of a Logic board, replacing pickled objects on the network
+
+    snapshot layout (little-endian):
+        header      magic, version, players, rows, cols, length of the tile type names, turn
+        types       tile type names, utf-8, separated by null bytes
+        tile_type   int8[tiles]
+        tile_owner  int8[tiles]
+        node_owner  int8[nodes]
+        owned_tiles int32[players]
+        captures    int32[players]
+        validated   uint8[players]
+
+    delta layout, the changes between two turns:
+        header      magic, version, players, base turn, turn, changed tiles, changed nodes
+        tiles       uint32[changed tiles] indices, then int8[changed tiles] owners
+        nodes       uint32[changed nodes] indices, then int8[changed nodes] owners
+        owned_tiles int32[players]
+        captures    int32[players]
+        validated   uint8[players]
+
+    request layout, sent by a reconnecting client:
+        header      magic, version, last known turn (NO_TURN without any state)
+
+    tile node counts and victory points are not sent, they are recomputed from the node owners
+    """
+
+    SNAPSHOT = b'AHRB'
+    DELTA = b'AHRD'
+    REQUEST = b'AHRQ'
+
+    VERSION = 2
+    NO_TURN = 0xFFFFFFFF
+
+    HEADER = struct.Struct('<4sBBHHHI')
+    DELTA_HEADER = struct.Struct('<4sBBIIII')
+    REQUEST_HEADER = struct.Struct('<4sBI')
+
+    @staticmethod
+    def kind(data):
+        """magic of a serialised message: SNAPSHOT, DELTA or REQUEST"""
+        return bytes(data[:4])
+
+    @staticmethod
+    def check_header(magic, version, expected_magic):
+        if magic != expected_magic:
+            raise ValueError('not a board state message')
+        if version != BoardState.VERSION:
+            raise ValueError('unsupported board state version: {}'.format(version))
+
+    @staticmethod
+    def scores(logic):
+        return (
+            memoryview(numpy.ascontiguousarray(logic.owned_tiles, dtype='<i4')),
+            memoryview(numpy.ascontiguousarray(logic.captures, dtype='<i4')),
+            bytes(bool(validated) for validated in logic.turn_validated),
+        )
+
+    @staticmethod
+    def encode(logic):
+        """serialise a Logic, the arrays are joined directly from their buffers"""
+        types = '\0'.join(logic.tile_types).encode('utf-8')
+        header = BoardState.HEADER.pack(BoardState.SNAPSHOT, BoardState.VERSION, logic.total_players, logic.rows,
+                                        logic.cols, len(types), logic.turn)
+
+        return b''.join((
+            header,
+            types,
+            memoryview(logic.tile_type),
+            memoryview(logic.tile_owner),
+            memoryview(logic.node_owner),
+        ) + BoardState.scores(logic))
+
+    @staticmethod
+    def decode(data, tile_names=None, players=None):
+        """
+        rebuild a Logic from bytes, checking the consistency of the state
+        arrays are used without copy when data is writable (bytearray)
+        :param tile_names: known tile type names, the state must only use them (None: not checked)
+        :param players: players of the running game, the state must have as many (None: not checked)
+        raises ValueError on malformed or inconsistent data
+        """
+        buffer = memoryview(data)
+        if len(buffer) < BoardState.HEADER.size:
+            raise ValueError('truncated board state header')
+
+        magic, version, header_players, rows, cols, types_length, turn = BoardState.HEADER.unpack_from(buffer)
+        BoardState.check_header(magic, version, BoardState.SNAPSHOT)
+        if header_players == 0 or rows == 0 or cols == 0:
+            raise ValueError('empty board state')
+        if players is not None and header_players != players:
+            raise ValueError('board state for {} players - expected {}'.format(header_players, players))
+        players = header_players
+
+        # same dimensions as the Logic arrays, checked before allocating anything
+        tiles_total = (cols + rows - 1) * (2 * rows - 1)
+        nodes_total = 2 * (cols + rows) * 2 * rows
+        expected = BoardState.HEADER.size + types_length + 2 * tiles_total + nodes_total + 9 * players
+        if len(buffer) != expected:
+            raise ValueError('invalid board state length: {} - expected {}'.format(len(buffer), expected))
+
+        logic = Logic(players, rows=rows, cols=cols)
+        logic.turn = turn
+
+        offset = BoardState.HEADER.size
+        types = bytes(buffer[offset:offset + types_length]).decode('utf-8')
+        logic.tile_types = types.split('\0') if types else []
+        offset += types_length
+        if tile_names is not None and any(name not in tile_names for name in logic.tile_types):
+            raise ValueError('unknown tile type name')
+
+        def read(dtype, count):
+            nonlocal offset
+            array = numpy.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+            offset += array.nbytes
+            return array if array.flags.writeable else array.copy()
+
+        logic.tile_type = read(numpy.int8, tiles_total)
+        logic.tile_owner = read(numpy.int8, tiles_total)
+        logic.node_owner = read(numpy.int8, nodes_total)
+        logic.owned_tiles = read('<i4', players).astype(numpy.int32, copy=False)
+        logic.captures = read('<i4', players).astype(numpy.int32, copy=False)
+        logic.turn_validated = [bool(validated) for validated in read(numpy.uint8, players)]
+
+        if numpy.any(logic.tile_type >= len(logic.tile_types)) or numpy.any(logic.tile_type < Logic.NO_TILE):
+            raise ValueError('unknown tile type')
+        if numpy.any(logic.node_owner >= players) or numpy.any(logic.node_owner < Logic.NO_NODE):
+            raise ValueError('invalid node owner')
+
+        BoardState.check_counts(logic)
+        return logic
+
+    @staticmethod
+    def encode_delta(logic, since):
+        """
+        serialise the changes made to a Logic after turn since
+        :return: the delta, None if the history does not go back to since (a snapshot is needed)
+        """
+        changes = logic.changes_since(since)
+        if changes is None:
+            return None
+
+        tiles, nodes = changes
+        header = BoardState.DELTA_HEADER.pack(BoardState.DELTA, BoardState.VERSION, logic.total_players, since,
+                                              logic.turn, len(tiles), len(nodes))
+        return b''.join((
+            header,
+            memoryview(tiles.astype('<u4')),
+            memoryview(logic.tile_owner[tiles]),
+            memoryview(nodes.astype('<u4')),
+            memoryview(logic.node_owner[nodes]),
+        ) + BoardState.scores(logic))
+
+    @staticmethod
+    def apply_delta(logic, data):
+        """
+        bring a Logic to the state described by a delta, the logic is left untouched on error
+        :return: set of the tile and node coordinates that changed
+        raises ValueError on malformed or inconsistent data, or if the delta does not start at the logic turn
+        """
+        buffer = memoryview(data)
+        if len(buffer) < BoardState.DELTA_HEADER.size:
+            raise ValueError('truncated board delta header')
+
+        magic, version, players, base, turn, tiles_count, nodes_count = BoardState.DELTA_HEADER.unpack_from(buffer)
+        BoardState.check_header(magic, version, BoardState.DELTA)
+        if players != logic.total_players:
+            raise ValueError('board delta for {} players - expected {}'.format(players, logic.total_players))
+        if base != logic.turn or turn < base:
+            raise ValueError('board delta from turn {} to {} - board is at turn {}'.format(base, turn, logic.turn))
+
+        expected = BoardState.DELTA_HEADER.size + 5 * (tiles_count + nodes_count) + 9 * players
+        if len(buffer) != expected:
+            raise ValueError('invalid board delta length: {} - expected {}'.format(len(buffer), expected))
+
+        offset = BoardState.DELTA_HEADER.size
+
+        def read(dtype, count):
+            nonlocal offset
+            array = numpy.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+            offset += array.nbytes
+            return array
+
+        tiles = read('<u4', tiles_count).astype(numpy.int64)
+        tile_owners = read(numpy.int8, tiles_count)
+        nodes = read('<u4', nodes_count).astype(numpy.int64)
+        node_owners = read(numpy.int8, nodes_count)
+        owned_tiles = read('<i4', players).astype(numpy.int32)
+        captures = read('<i4', players).astype(numpy.int32)
+        validated = [bool(value) for value in read(numpy.uint8, players)]
+
+        if numpy.any(tiles >= len(logic.tile_type)) or numpy.any(logic.tile_type[tiles % len(logic.tile_type)] ==
+                                                                 Logic.NO_TILE):
+            raise ValueError('unknown tile in board delta')
+        if numpy.any(nodes >= len(logic.node_owner)) or numpy.any(logic.node_owner[nodes % len(logic.node_owner)] ==
+                                                                  Logic.NO_NODE):
+            raise ValueError('unknown node in board delta')
+        if numpy.any(tile_owners < -1) or numpy.any(tile_owners >= players):
+            raise ValueError('invalid tile owner')
+        if numpy.any(node_owners < -2) or numpy.any(node_owners >= players):
+            raise ValueError('invalid node owner')
+
+        saved = (logic.tile_owner.copy(), logic.node_owner.copy(), logic.tile_nodes, logic.owned_tiles,
+                 logic.captures)
+        logic.tile_owner[tiles] = tile_owners
+        logic.node_owner[nodes] = node_owners
+        logic.owned_tiles = owned_tiles
+        logic.captures = captures
+
+        try:
+            BoardState.check_counts(logic)
+        except ValueError:
+            logic.tile_owner, logic.node_owner, logic.tile_nodes, logic.owned_tiles, logic.captures = saved
+            logic.victory_points = logic.captures + logic.owned_tiles
+            raise
+
+        logic.turn = turn
+        logic.turn_validated = validated
+        logic.history.clear()
+        return {logic.tile_coord(tile) for tile in tiles} | {logic.node_coord(node) for node in nodes}
+
+    @staticmethod
+    def encode_request(turn):
+        """ask the other players for the changes after turn, None to ask for a snapshot"""
+        return BoardState.REQUEST_HEADER.pack(BoardState.REQUEST, BoardState.VERSION,
+                                              BoardState.NO_TURN if turn is None else turn)
+
+    @staticmethod
+    def decode_request(data):
+        """:return: the last turn known by the requesting client, None if it has no state"""
+        if len(data) != BoardState.REQUEST_HEADER.size:
+            raise ValueError('invalid board request length: {}'.format(len(data)))
+
+        magic, version, turn = BoardState.REQUEST_HEADER.unpack_from(data)
+        BoardState.check_header(magic, version, BoardState.REQUEST)
+        return None if turn == BoardState.NO_TURN else turn
+
+    @staticmethod
+    def check_counts(logic):
+        """recompute the node counts and check the tile owners and scores against them"""
+        BoardState.count_nodes(logic)
+
+        majority = numpy.where(logic.tile_type != Logic.NO_TILE, Logic.majorities(logic.tile_nodes), -1)
+        if numpy.any(majority != logic.tile_owner):
+            raise ValueError('inconsistent tile owners')
+        if numpy.any(numpy.bincount(majority[majority >= 0], minlength=logic.total_players) != logic.owned_tiles):
+            raise ValueError('inconsistent owned tiles count')
+
+        logic.victory_points = logic.captures + logic.owned_tiles
+
+    @staticmethod
+    def count_nodes(logic):
+        """recompute the node count of each player on every tile from the node owners"""
+        logic.tile_nodes = numpy.zeros((len(logic.tile_type), logic.total_players), dtype=numpy.int16)
+        adjacent = logic.padded_neighbours('node_to_tiles')
+        nodes = numpy.flatnonzero(logic.node_owner >= 0)
+        tiles = adjacent[nodes]
+        valid = tiles >= 0
+        owners = numpy.broadcast_to(logic.node_owner[nodes, None], tiles.shape)
+        numpy.add.at(logic.tile_nodes, (tiles[valid], owners[valid]), 1)
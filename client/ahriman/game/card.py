@@ -21,10 +21,6 @@ class Card:
 
         self.position = Animator((x, y), self._set_position)
 
-    def update(self):
-        self.texture_manager.update()
-        self.position.update()
-
     def delete(self):
         self.texture_manager.delete()
 
@@ -2,6 +2,7 @@ import pyglet
 
 from ahriman import constants
 from ahriman.game.card import Card
+from ahriman.profiler import Profiler
 
 
 class CardHolder:
@@ -21,10 +22,6 @@ class CardHolder:
     def card_coord(self, idx, cy):
         return idx * CardHolder.CARD_WIDTH + self.width_offset, self.height_offset + cy
 
-    def update(self):
-        for card in self.cards:
-            card.update()
-
     def delete(self):
         for card in self.cards:
             card.delete()
@@ -59,8 +56,9 @@ class CardHolder:
                                         (0, -CardHolder.CARD_WIDTH), relative=True)
 
     def draw(self):
-        self.win.draw_2D()
-        self.batch.draw()
+        with Profiler.scope('CardHolder.draw'):
+            self.win.draw_2D()
+            self.batch.draw()
 
     def mouse_to_card(self, x, y):
 
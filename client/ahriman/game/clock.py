@@ -0,0 +1,54 @@
+class AnimationClock:
+    """
+    single time source of the animations, ticked once per frame by the window
+    subscribers are grouped by frequency: on each tick, only the subscribers of the frequencies whose frame index
+    changed are notified, with the number of frames elapsed
+    the time only moves with the ticks, so animations are deterministic when ticked manually (headless tests)
+    """
+
+    # the time is a whole number of ticks, summing float seconds would move some frames by one
+    # a multiple of the usual frame rates (24 to 240 fps): their frame durations are exact
+    TICKS_PER_SECOND = 3600000
+
+    ticks = 0
+    # subscribers and last notified frame index, by frequency
+    subscribers = {}
+    frames = {}
+
+    @staticmethod
+    def frame(freq):
+        """current frame index at the given frequency"""
+        return int(AnimationClock.ticks * freq // AnimationClock.TICKS_PER_SECOND)
+
+    @staticmethod
+    def subscribe(subscriber, freq):
+        """notify subscriber.on_frame(elapsed_frames) on the ticks changing the frame index of freq"""
+        if freq not in AnimationClock.subscribers:
+            AnimationClock.subscribers[freq] = set()
+            AnimationClock.frames[freq] = AnimationClock.frame(freq)
+        AnimationClock.subscribers[freq].add(subscriber)
+
+    @staticmethod
+    def unsubscribe(subscriber, freq):
+        subscribers = AnimationClock.subscribers.get(freq)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del AnimationClock.subscribers[freq]
+                del AnimationClock.frames[freq]
+
+    @staticmethod
+    def tick(dt):
+        """advance the time by dt seconds and notify the subscribers whose frame changed"""
+        AnimationClock.ticks += round(dt * AnimationClock.TICKS_PER_SECOND)
+
+        changed = []
+        for freq, subscribers in AnimationClock.subscribers.items():
+            frame = AnimationClock.frame(freq)
+            if frame != AnimationClock.frames[freq]:
+                changed.extend((subscriber, frame - AnimationClock.frames[freq]) for subscriber in subscribers)
+                AnimationClock.frames[freq] = frame
+
+        # notified after the iteration, subscribers may unsubscribe when their animation ends
+        for subscriber, elapsed in changed:
+            subscriber.on_frame(elapsed)
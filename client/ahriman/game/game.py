@@ -1,11 +1,12 @@
 import json
-import random
 
 from ahriman import constants
 from ahriman import logger
 from ahriman.constants import GameAction
 from ahriman.game import Board
 from ahriman.game.cardholder import CardHolder
+from ahriman.profiler import Profiler
+from .gameTex import TextureScheduler
 from .logic import Logic
 
 
@@ -70,7 +71,8 @@ class Game:
             raise e
 
     def __init__(self, window, player_num, total_players=2):
-        self.logic = Logic(total_players)
+        self.logic = Logic(total_players, rows=Game.RULES_DICT['board']['rows'],
+                           cols=Game.RULES_DICT['board']['cols'])
 
         self.player_num = player_num
 
@@ -129,72 +131,32 @@ class Game:
 
         if not any([action is None for action in self.selected_actions]):
             to_update = self.logic.resolve(self.selected_actions)
-            for coord in to_update:
-                self.graphic_board[coord].change_owner(self.logic[coord].owner)
-                # TODO animate the turn resolution
+            self.refresh(to_update)
 
             self.selected_actions = [None] * self.logic.total_players
             self.select_node(None)
 
         return True
 
+    def refresh(self, to_update):
+        """update the graphic board after a change of the logic"""
+        for coord in to_update:
+            self.graphic_board[coord].change_owner(self.logic[coord].owner)
+            # TODO animate the turn resolution
+
     def disconnect(self, player):
         self.logic.turn_validated[player] = False
 
-    def add_node(self, coord, owner=-2):
-        self.graphic_board.nodes[coord].set_object(
-            Game.OBJECTS_DICT['nodes'][Game.RULES_DICT['board']['node_object']], -2)
-        self.logic.add_node(coord, owner)
-
-    def add_tile(self, tile_coord, tile_name, owner=-1):
-        self.graphic_board.tiles[tile_coord].set_object(Game.OBJECTS_DICT['tiles'][tile_name], owner)
-        self.logic.add_tile(tile_coord, tile_name, owner)
-
     def init_board(self):
-        # TODO is this half splitting necessary? NO
-        total_half = (len(self.graphic_board.tiles)) // 2
-        total_weight = sum(Game.RULES_DICT['board']['init'].values())
-
-        left_half = []
-        for tile, weight in Game.RULES_DICT['board']['init'].items():
-            stack = [tile] * int(round(total_half * weight / total_weight))
-            left_half.extend(stack)
-
-        if len(left_half) < total_half:
-            left_half.extend(
-                [list(Game.RULES_DICT['board']['init'])[0]] * (total_half - len(left_half)))
-        elif len(left_half) > total_half:
-            left_half.pop()
-
-        right_half = list(left_half)
-        random.shuffle(right_half)
-        random.shuffle(left_half)
-
-        def put_left(tile_coord):
-            put_tile = left_half.pop()
-            self.add_tile(tile_coord, put_tile)
-
-        def put_right(tile_coord):
-            put_tile = right_half.pop()
-            self.add_tile(tile_coord, put_tile)
+        self.logic.init_board(self.graphic_board.tiles.keys(), self.graphic_board.nodes.keys(),
+                              Game.RULES_DICT['board'])
 
         for coord in self.graphic_board.tiles.keys():
-            if coord[1] == 2 * coord[0] + 1 - self.graphic_board.cols:
-                if coord[1] < self.graphic_board.rows - 1:
-                    put_right(coord)
-                elif coord[1] > self.graphic_board.rows - 1:
-                    put_left(coord)
-                else:
-                    self.add_tile(coord, Game.RULES_DICT['board']['fill'])
-            elif coord[1] < 2 * coord[0] + 1 - self.graphic_board.cols:
-                put_right(coord)
-            elif coord[1] > 2 * coord[0] + 1 - self.graphic_board.cols or coord[1] > self.graphic_board.rows:
-                put_left(coord)
+            self.graphic_board.tiles[coord].set_object(Game.OBJECTS_DICT['tiles'][self.logic[coord].type], -1)
 
         for coord in self.graphic_board.nodes.keys():
             self.graphic_board.nodes[coord].set_object(
                 Game.OBJECTS_DICT['nodes'][Game.RULES_DICT['board']['node_object']], -2)
-            self.add_node(coord)
 
         self.initialized = True
 
@@ -312,7 +274,9 @@ class Game:
 
     def update(self, dt, move):
         self.graphic_board.update(dt, move)
-        self.card_holder.update()
+        # texture managers are refreshed once per frame, only the animated or changed ones are visited
+        with Profiler.scope('TextureScheduler.update'):
+            TextureScheduler.update()
 
     def draw(self):
         self.graphic_board.draw()
@@ -320,12 +284,13 @@ class Game:
 
     def load_state(self, state):
         self.logic = state
-        for coord, tile in state.logic_tiles_board.items():
+        for coord in state.tile_coords():
+            tile = state[coord]
             self.graphic_board.tiles[coord].set_object(Game.OBJECTS_DICT['tiles'][tile.type],
                                                        owner=tile.owner)
-        for coord, node in state.logic_nodes_board.items():
+        for coord in state.node_coords():
             self.graphic_board.nodes[coord].set_object(
-                Game.OBJECTS_DICT['nodes'][Game.RULES_DICT['board']['node_object']], node.owner)
+                Game.OBJECTS_DICT['nodes'][Game.RULES_DICT['board']['node_object']], state[coord].owner)
 
         self.initialized = True
 
@@ -1,8 +1,6 @@
 from builtins import FileNotFoundError
+from collections import OrderedDict
 from itertools import compress
-from math import floor
-from time import time
-
 import json
 import pyglet
 import re
@@ -11,9 +9,13 @@ from os import path
 from pyglet.gl import *
 from random import randint
 from threading import Condition
+from weakref import WeakValueDictionary
 
 from ahriman import constants
 from ahriman import logger
+from .atlas import Atlas
+from .clock import AnimationClock
+from .texture_loader import TextureLoader
 
 DEFAULT_FRAMERATE = 6
 
@@ -22,21 +24,12 @@ class GameTex:
     """animated texture with multiple frames played at regular interval"""
 
     @staticmethod
-    def get_tex(file):
-        """load a texture with no blur filter on resize (pixel art)"""
-        tex = pyglet.image.load(file).texture
-        glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
-        glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
-        return tex
-
-    def __init__(self, texture_name, frames_list, framerate=DEFAULT_FRAMERATE):
-        self.frames_list = frames_list
-        self.frame_rate = framerate
-
+    def list_layers(texture_name):
+        """:return: the files of the frames of a texture directory, by layer"""
         texture_dirs = listdir(path.join(constants.RESOURCE_PATH, 'textures', texture_name))
         if len(texture_dirs) == 0:
             logger.warning('empty resource directory :', texture_name)
-            return
+            return []
 
         def natural_key(string):
             return [int(s) if s.isdigit() else s for s in re.split(r'(\d+)', string)]
@@ -47,26 +40,33 @@ class GameTex:
         max_layer = int(texture_dirs[-1][1:].split('_sprite_')[0])
 
         # create as many layers as detected
-        self.layers = []
+        layers = []
         for index in range(max_layer + 1):
-            self.layers.append([])
+            layers.append([])
 
         for tex in texture_dirs:
             if tex != 'info':
                 layer = int(tex[1:].split('_sprite_')[0])
-                file_name = path.join(constants.RESOURCE_PATH, 'textures', texture_name, tex)
-                self.layers[layer].append(GameTex.get_tex(file_name))
+                layers[layer].append(path.join(constants.RESOURCE_PATH, 'textures', texture_name, tex))
 
-        check_length = len(self.layers[0])
-        for layer in self.layers[1:]:
+        check_length = len(layers[0])
+        for layer in layers[1:]:
             if len(layer) != check_length:
                 logger.error('layers must have equal amount of frames - {}'.format(texture_name),
                              title='in loading GameTex')
                 raise ValueError('inconsistent layer amount')
 
+        return layers
+
+    def __init__(self, layers, frames_list, framerate=DEFAULT_FRAMERATE):
+        # atlas regions of the frames, by layer
+        self.layers = layers
+        self.frames_list = frames_list
+        self.frame_rate = framerate
+
         # check if frame list is empty
-        if not self.frames_list:
-            self.frames_list = list(range(check_length))
+        if not self.frames_list and self.layers:
+            self.frames_list = list(range(len(self.layers[0])))
 
 
 class AnimTexCounter:
@@ -76,53 +76,225 @@ class AnimTexCounter:
         self.frames = texture.frames_list
         self.freq = texture.frame_rate
         self.index_counter = randint(0, len(self.frames) - 1)
-        self.current_time = -1
 
     @property
     def counter(self):
         return self.frames[self.index_counter]
 
-    def update(self):
-        if self.current_time == -1:
-            self.current_time = floor(time() * self.freq)
-            return True
-        elif len(self.frames) > 1:
-            temp = floor(time() * self.freq)
-            if temp != self.current_time:
-                self.current_time = temp
-                self.index_counter = (self.index_counter + 1) % len(self.frames)
-                return True
+    @property
+    def animated(self):
+        return len(self.frames) > 1
+
+    def advance(self):
+        self.index_counter = (self.index_counter + 1) % len(self.frames)
+
+
+class TextureScheduler:
+    """
+    global frame scheduler for the texture managers
+    animated managers are grouped by frame rate and only visited when their group changes frame,
+    other managers are only visited when marked dirty (color, texture or position change)
+    managers are tracked per batch: the batches of culled board chunks are hidden, their animations are frozen
+    and their changes deferred until they are shown again
+    """
+
+    animated = {}
+    frames = {}
+    dirty = {}
+    hidden = set()
+
+    @staticmethod
+    def register(manager):
+        """start animating a manager and refresh it on the next update"""
+        if manager.anim.animated:
+            TextureScheduler.animated.setdefault(manager.anim.freq, {}).setdefault(manager.batch, set()).add(manager)
+        TextureScheduler.mark(manager)
+
+    @staticmethod
+    def unregister(manager):
+        if manager.anim is not None:
+            TextureScheduler.discard(TextureScheduler.animated.get(manager.anim.freq, {}), manager)
+        TextureScheduler.discard(TextureScheduler.dirty, manager)
+
+    @staticmethod
+    def discard(batches, manager):
+        """remove a manager from a dict of batch -> managers, without keeping empty entries of deleted batches"""
+        managers = batches.get(manager.batch)
+        if managers is not None:
+            managers.discard(manager)
+            if not managers:
+                del batches[manager.batch]
+
+    @staticmethod
+    def mark(manager):
+        TextureScheduler.dirty.setdefault(manager.batch, set()).add(manager)
+
+    @staticmethod
+    def hide(batch):
+        TextureScheduler.hidden.add(batch)
+
+    @staticmethod
+    def show(batch):
+        TextureScheduler.hidden.discard(batch)
+
+    @staticmethod
+    def update():
+        """advance the animation groups whose frame changed, then refresh every dirty manager of visible batches"""
+        for freq, batches in TextureScheduler.animated.items():
+            frame = AnimationClock.frame(freq)
+            if frame != TextureScheduler.frames.get(freq):
+                TextureScheduler.frames[freq] = frame
+                for batch, managers in batches.items():
+                    if batch not in TextureScheduler.hidden:
+                        for manager in managers:
+                            manager.next_frame()
+                        TextureScheduler.dirty.setdefault(batch, set()).update(managers)
+
+        for batch in [batch for batch in TextureScheduler.dirty if batch not in TextureScheduler.hidden]:
+            for manager in TextureScheduler.dirty.pop(batch):
+                manager.update()
+
+
+class TextureHandle:
+    """
+    lazy reference to a texture: its frames are uploaded to the atlas on first use,
+    and may be evicted once no texture manager uses them anymore
+    """
+
+    def __init__(self, name, layers, frames_list):
+        self.name = name
+        self.files = layers
+        self.frames_list = frames_list
+        self.texture = None
+        self.references = 0
+
+    @property
+    def resident(self):
+        return self.texture is not None
+
+    def acquire(self):
+        """:return: the GameTex of the handle, uploaded if needed"""
+        if self.references == 0:
+            TextureResidency.unused.pop(self.name, None)
+        self.references += 1
+
+        if self.texture is None:
+            TextureManager.load_textures()
+            regions = [[TextureManager.atlas.add(file, TextureManager.image(file)) for file in layer] for layer in
+                       self.files]
+            self.texture = GameTex(regions, self.frames_list)
+            TextureResidency.trim()
+
+        return self.texture
+
+    def release(self):
+        self.references -= 1
+        if self.references == 0:
+            TextureResidency.unused[self.name] = self
+            TextureResidency.trim()
+
+    def evict(self):
+        for layer in self.files:
+            for file in layer:
+                TextureManager.atlas.remove(file)
+        self.texture = None
+
+
+class TextureResidency:
+    """
+    least recently used of the resident textures that no manager uses,
+    evicted while the images packed in the atlas take more texture memory than the budget
+    the budget counts the packed images, not the pages: a page is only released once empty, the space of an evicted
+    texture is reused by the next uploads instead, so the pages stop growing
+    """
+
+    budget = constants.TEXTURE_MEMORY_BUDGET
+    unused = OrderedDict()
+
+    @staticmethod
+    def trim():
+        while TextureManager.atlas.used > TextureResidency.budget and TextureResidency.unused:
+            _, handle = TextureResidency.unused.popitem(last=False)
+            handle.evict()
+
+    @staticmethod
+    def resident():
+        return [name for name, handle in TextureManager.textures.items() if handle is not None and handle.resident]
 
 
 class TextureManager:
     """global texture manager handling texture, animation and rendering"""
 
     textures = {'none': None}
+    images = {}
+    atlas = None
+    loader = None
     textures_loaded = False
     loading_condition = Condition()
 
     @staticmethod
-    def load_textures():
+    def start_loading():
+        """list every texture and start decoding their frames in background threads"""
+        with TextureManager.loading_condition:
+            if TextureManager.textures_loaded or TextureManager.loader is not None:
+                return
+
+            logger.info('loading textures...')
+            texture_dirs = listdir(path.join(constants.RESOURCE_PATH, 'textures'))
+            for tex in texture_dirs:
+                if path.isdir(path.join(constants.RESOURCE_PATH, 'textures', tex)):
+                    TextureManager.parse_tex(tex)
+
+            files = [file for handle in TextureManager.textures.values() if handle is not None for layer in
+                     handle.files for file in layer]
+            TextureManager.atlas = Atlas()
+            TextureManager.loader = TextureLoader(files)
+
+    @staticmethod
+    def collect_textures(budget=None):
+        """
+        gather the decoded frames, they are uploaded to the atlas when a manager first uses their texture
+        :param budget: maximum amount of frames gathered by this call, None to wait for all of them
+        :return: True once every texture is loaded
+        """
         with TextureManager.loading_condition:
             if TextureManager.textures_loaded:
                 return True
-            else:
-                # automatically load all textures
-
-                logger.info('loading textures...')
-                texture_dirs = listdir(path.join(constants.RESOURCE_PATH, 'textures'))
-                for tex in texture_dirs:
-                    if path.isdir(path.join(constants.RESOURCE_PATH, 'textures', tex)):
-                        TextureManager.parse_tex(tex)
-                logger.confirm('textures successfully loaded !')
-
-                TextureManager.textures_loaded = True
-                TextureManager.loading_condition.notify_all()
-                return True
+            if TextureManager.loader is None:
+                TextureManager.start_loading()
+
+            for file, image in TextureManager.loader.collect(budget):
+                TextureManager.images[file] = image
+            if not TextureManager.loader.done:
+                return False
+
+            TextureManager.loader = None
+            logger.confirm('textures successfully loaded ! ({} frames)'.format(len(TextureManager.images)))
+
+            TextureManager.textures_loaded = True
+            TextureManager.loading_condition.notify_all()
+            return True
+
+    @staticmethod
+    def image(file):
+        """
+        decoded frame of a file, to upload in the atlas
+        frames are dropped once uploaded, the frames of an evicted texture are decoded again from their files
+        """
+        image = TextureManager.images.pop(file, None)
+        if image is None:
+            image = TextureLoader.decode_file(file)
+        return image
+
+    @staticmethod
+    def load_textures():
+        """decode every texture at once"""
+        TextureManager.start_loading()
+        return TextureManager.collect_textures()
 
     @staticmethod
     def parse_tex(texture_dir):
-        """open a texture directory and load it in memory"""
+        """open a texture directory and list the frames to load"""
         contents = listdir(path.join(constants.RESOURCE_PATH, 'textures', texture_dir))
         bool_sub = [path.isdir(path.join(constants.RESOURCE_PATH, 'textures', texture_dir, sub)) for
                     sub in contents]
@@ -167,8 +339,8 @@ class TextureManager:
             split_path.reverse()
             texture_name = '_'.join(split_path)
 
-            # noinspection PyTypeChecker
-            TextureManager.textures[texture_name] = GameTex(texture_dir, frames)
+            TextureManager.textures[texture_name] = TextureHandle(texture_name, GameTex.list_layers(texture_dir),
+                                                                  frames)
 
     def __init__(self, texture_name, coords, batch, order=0, color4f=(1, 1, 1, 1), layer_spacing=0.1):
         with TextureManager.loading_condition:
@@ -177,8 +349,12 @@ class TextureManager:
             logger.warning('sub-optimized textures loading')
             TextureManager.load_textures()
 
-        self.texture = TextureManager.textures[texture_name]
+        self.handle = None
+        self.texture = None
+        self.anim = None
         self.vlist = None
+        # atlas page bound by the group of each vertex list, the frames of a layer may be on different pages
+        self.owners = None
         self.coords_type = coords[0]
         self.coords = tuple(coords[1])
         self.move_coords = None
@@ -187,76 +363,129 @@ class TextureManager:
         self.color = color4f
         self.spacing = layer_spacing
         self.update_next = False
+        self.update_frame = False
+        self.update_color = False
+
+        self.change_texture(texture_name)
+
+    def layer_coords(self, num):
+        centering = (len(self.texture.layers) - 1) / 2
+        return tuple(elmt if (ind + 1) % 3 != 0 else elmt + (num - centering) * self.spacing for ind, elmt in
+                     enumerate(self.coords))
+
+    def build(self):
+        """create one vertex list per layer of the texture"""
+        self.delete_vlist()
+        self.vlist = []
+        self.owners = []
+
+        for num, layer in enumerate(self.texture.layers):
+            frame = layer[self.anim.counter]
+            self.owners.append(frame.owner)
+            self.vlist.append(self.batch.add(4, GL_QUADS, OCATextureGroup.get(frame.owner, self.order + num),
+                                             (self.coords_type, self.layer_coords(num)),
+                                             ('t3f', frame.tex_coords),
+                                             ('c4f', tuple(self.color) * 4)))
+
+    def delete_vlist(self):
+        if self.vlist is not None:
+            for vertex in self.vlist:
+                vertex.delete()
+            self.vlist = None
+            self.owners = None
+
+    def bind_frames(self):
+        """move the vertex lists whose current frame is on another atlas page to the group of that page"""
+        for num, (vertex, layer) in enumerate(zip(self.vlist, self.texture.layers)):
+            owner = layer[self.anim.counter].owner
+            if owner is not self.owners[num]:
+                self.batch.migrate(vertex, GL_QUADS, OCATextureGroup.get(owner, self.order + num), self.batch)
+                self.owners[num] = owner
+
+    def next_frame(self):
+        """called by the TextureScheduler when the animation of the texture advances"""
+        self.anim.advance()
+        self.update_frame = True
+
+    def update(self):
+        """
+        apply the pending changes, called by the TextureScheduler when the manager is dirty
+        existing vertex lists are rewritten in place, they are only recreated when the layers change
+        """
+        moved = False
+        if self.move_coords is not None:
+            moved = self.move_coords != self.coords
+            self.coords = self.move_coords
+            self.move_coords = None
+
+        if self.texture is None:
+            return
 
-        if self.texture is not None:
-            self.anim = AnimTexCounter(self.texture)
+        if self.vlist is None or self.update_next:
+            self.build()
         else:
-            self.anim = None
+            if self.update_frame:
+                self.bind_frames()
+            for num, (vertex, layer) in enumerate(zip(self.vlist, self.texture.layers)):
+                if moved:
+                    vertex.vertices[:] = self.layer_coords(num)
+                if self.update_frame:
+                    vertex.tex_coords[:] = layer[self.anim.counter].tex_coords
+                if self.update_color:
+                    vertex.colors[:] = tuple(self.color) * 4
 
-    def update(self):
-        if self.texture is not None and (self.anim.update() or self.update_next):
-            self.update_next = False
-
-            if self.vlist is not None:
-                for vertex in self.vlist:
-                    vertex.delete()
-            self.vlist = []
-
-            if self.move_coords is not None:
-                self.coords = self.move_coords
-                self.move_coords = None
-
-            centering = (len(self.texture.layers) - 1) / 2
-
-            for num, layer in enumerate(self.texture.layers):
-                coord = (self.coords_type, tuple(
-                    elmt if (ind + 1) % 3 != 0 else elmt + (num - centering) * self.spacing for
-                    ind, elmt in
-                    enumerate(self.coords)))
-
-                self.vlist.append(self.batch.add(4, GL_QUADS,
-                                                 OCATextureGroup(layer[self.anim.counter],
-                                                                 self.order + num, self.color),
-                                                 coord, ('t2f', (0, 0, 1, 0, 1, 1, 0, 1))))
-
-        elif self.move_coords is not None:
-            if self.move_coords == self.coords:
-                self.move_coords = None
-            else:
-                self.coords = self.move_coords
-                self.move_coords = None
-
-                if self.vlist is not None:
-                    centering = (len(self.vlist) - 1) / 2
-
-                    for num, vertex in enumerate(self.vlist):
-                        coord = tuple(
-                            elmt if (ind + 1) % 3 != 0 else elmt + (num - centering) * self.spacing for ind, elmt in
-                            enumerate(self.coords))
-                        vertex.vertices[:] = coord
+        self.update_next = False
+        self.update_frame = False
+        self.update_color = False
 
     def change_color(self, color):
         self.color = color
-        self.update_next = True
+        self.update_color = True
+        TextureScheduler.mark(self)
 
     def change_texture(self, texture_name):
-        self.texture = TextureManager.textures[texture_name]
-        if self.texture is not None:
-            self.anim = AnimTexCounter(self.texture)
-        else:
+        TextureScheduler.unregister(self)
+        handle = TextureManager.textures[texture_name]
+        texture = handle.acquire() if handle is not None else None
+
+        # the previous texture is released last, its vertex lists must not use it anymore
+        previous = self.handle
+        self.handle = handle
+
+        if texture is None:
+            self.texture = None
             self.anim = None
-            if self.vlist is not None:
-                for vertex in self.vlist:
-                    vertex.delete()
-                self.vlist = None
+            self.delete_vlist()
+            if previous is not None:
+                previous.release()
+            return
+
+        same_layout = self.vlist is not None and self.texture is not None and len(texture.layers) == len(
+            self.texture.layers)
+        self.texture = texture
+        self.anim = AnimTexCounter(self.texture)
+        if same_layout:
+            # the vertex lists only move to the groups of the new texture
+            self.bind_frames()
+            self.update_frame = True
+        else:
+            self.update_next = True
+
+        TextureScheduler.register(self)
+
+        if previous is not None:
+            previous.release()
 
     def delete(self):
-        if self.vlist is not None:
-            for vertex in self.vlist:
-                vertex.delete()
+        TextureScheduler.unregister(self)
+        self.delete_vlist()
+        if self.handle is not None:
+            self.handle.release()
+            self.handle = None
 
     def move(self, coords):
         self.move_coords = tuple(coords)
+        TextureScheduler.mark(self)
 
 
 class EnableAlphaGroup(pyglet.graphics.OrderedGroup):
@@ -278,21 +507,37 @@ class EnableAlphaGroup(pyglet.graphics.OrderedGroup):
         glDisable(GL_CULL_FACE)
 
 
-class ColorGroup(pyglet.graphics.Group):
-    """texture group with transparency and color"""
+class OCATextureGroup(pyglet.graphics.TextureGroup):
+    """
+    texture group with transparency and order, the color is a vertex attribute
+    groups are interned with OCATextureGroup.get: quads with the same texture and order share one group
+    """
 
-    def __init__(self, order=0, color4f=(1, 1, 1, 1)):
-        self.color = color4f
-        bt_tex_en = EnableAlphaGroup(order)
-        super().__init__(parent=bt_tex_en)
+    # live groups, a group is dropped once no batch uses it anymore
+    cache = WeakValueDictionary()
 
-    def set_state(self):
-        glColor4f(*self.color)
+    @staticmethod
+    def get(texture, order=0):
+        key = (texture.target, texture.id, order)
+        group = OCATextureGroup.cache.get(key)
+        if group is None:
+            group = OCATextureGroup(texture, order)
+            OCATextureGroup.cache[key] = group
+        return group
 
+    @staticmethod
+    def live_groups():
+        return len(OCATextureGroup.cache)
 
-class OCATextureGroup(pyglet.graphics.TextureGroup):
-    """texture group with transparency, color and order"""
+    def __init__(self, texture, order=0):
+        super().__init__(texture, parent=EnableAlphaGroup(order))
+        self.order = order
+
+    def __eq__(self, other):
+        return (self.__class__ is other.__class__ and
+                self.texture.target == other.texture.target and
+                self.texture.id == other.texture.id and
+                self.order == other.order)
 
-    def __init__(self, texture, order=0, color4f=(1, 1, 1, 1)):
-        col_gr = ColorGroup(order, color4f)
-        super().__init__(texture, parent=col_gr)
+    def __hash__(self):
+        return hash((self.texture.target, self.texture.id, self.order))
@@ -0,0 +1,344 @@
+import ctypes
+
+import numpy
+from pyglet.gl import *
+
+from ahriman import logger
+
+
+class InstanceAttribute:
+    """view on one attribute of an instance, assignments are written to the instance buffer"""
+
+    def __init__(self, batch, slot, start, size):
+        self.batch = batch
+        self.slot = slot
+        self.start = start
+        self.size = size
+
+    def __getitem__(self, index):
+        return self.batch.data[self.slot, self.start:self.start + self.size][index]
+
+    def __setitem__(self, index, value):
+        self.batch.data[self.slot, self.start:self.start + self.size][index] = value
+        self.batch.dirty_slots.add(self.slot)
+
+    def __len__(self):
+        return self.size
+
+
+class InstanceList:
+    """one textured quad of an InstancedBatch, with the interface of the pyglet vertex lists used by TextureManager"""
+
+    def __init__(self, batch, slot):
+        self.batch = batch
+        self.slot = slot
+
+    @property
+    def vertices(self):
+        return InstanceAttribute(self.batch, self.slot, *InstancedBatch.VERTICES)
+
+    @vertices.setter
+    def vertices(self, values):
+        self.vertices[:] = values
+
+    @property
+    def tex_coords(self):
+        return InstanceAttribute(self.batch, self.slot, *InstancedBatch.TEX_COORDS)
+
+    @tex_coords.setter
+    def tex_coords(self, values):
+        self.tex_coords[:] = values
+
+    @property
+    def colors(self):
+        return InstanceAttribute(self.batch, self.slot, *InstancedBatch.COLORS)
+
+    @colors.setter
+    def colors(self, values):
+        self.colors[:] = values
+
+    def delete(self):
+        self.batch.free(self.slot)
+
+
+class InstancedBatch:
+    """
+    drop-in replacement of pyglet.graphics.Batch for the quads of the board, drawn with instancing
+    each quad is one instance holding its corners, texture coordinates and color, the shader picks the corner
+    of every vertex of a unit quad: only the parts of the instance buffer holding changed quads are uploaded
+    instances are drawn sorted by group order, with one instanced draw call per run of the same texture
+    """
+
+    # (offset, size) of the attributes in an instance, the formats used by TextureManager (v3f, t3f, c4f)
+    VERTICES = (0, 12)
+    TEX_COORDS = (12, 12)
+    COLORS = (24, 16)
+    INSTANCE_SIZE = 40
+
+    # changed instances closer than this in the draw order are uploaded in one range
+    UPLOAD_GAP = 8
+
+    VERTEX_SHADER = b'''
+        #version 120
+        attribute vec4 corner;
+        attribute vec3 position0, position1, position2, position3;
+        attribute vec3 uv0, uv1, uv2, uv3;
+        attribute vec4 color;
+        varying vec2 tex;
+        varying vec4 tint;
+
+        void main() {
+            vec3 position = corner.x * position0 + corner.y * position1 + corner.z * position2 + corner.w * position3;
+            gl_Position = gl_ModelViewProjectionMatrix * vec4(position, 1.0);
+            tex = (corner.x * uv0 + corner.y * uv1 + corner.z * uv2 + corner.w * uv3).xy;
+            tint = color;
+        }
+    '''
+
+    FRAGMENT_SHADER = b'''
+        #version 120
+        uniform sampler2D atlas;
+        varying vec2 tex;
+        varying vec4 tint;
+
+        void main() {
+            gl_FragColor = texture2D(atlas, tex) * tint;
+        }
+    '''
+
+    # instance attributes: name, offset in floats, components
+    ATTRIBUTES = (('position0', 0, 3), ('position1', 3, 3), ('position2', 6, 3), ('position3', 9, 3),
+                  ('uv0', 12, 3), ('uv1', 15, 3), ('uv2', 18, 3), ('uv3', 21, 3), ('color', 24, 4))
+
+    program = None
+
+    @staticmethod
+    def supported():
+        return gl_info.have_version(3, 3) or (gl_info.have_extension('GL_ARB_instanced_arrays')
+                                              and gl_info.have_extension('GL_ARB_vertex_array_object'))
+
+    @staticmethod
+    def compile_shader(kind, source):
+        shader = glCreateShader(kind)
+        buffer = ctypes.create_string_buffer(source)
+        pointer = ctypes.cast(ctypes.pointer(ctypes.pointer(buffer)), ctypes.POINTER(ctypes.POINTER(GLchar)))
+        glShaderSource(shader, 1, pointer, None)
+        glCompileShader(shader)
+
+        status = GLint()
+        glGetShaderiv(shader, GL_COMPILE_STATUS, ctypes.byref(status))
+        if not status.value:
+            log = ctypes.create_string_buffer(4096)
+            glGetShaderInfoLog(shader, len(log), None, log)
+            logger.error(log.value.decode(), title='in compiling instanced board shader')
+            raise RuntimeError('shader compilation failed')
+        return shader
+
+    @staticmethod
+    def link_program():
+        """compile the shader program once, shared by every instanced batch"""
+        if InstancedBatch.program is None:
+            program = glCreateProgram()
+            glAttachShader(program, InstancedBatch.compile_shader(GL_VERTEX_SHADER, InstancedBatch.VERTEX_SHADER))
+            glAttachShader(program, InstancedBatch.compile_shader(GL_FRAGMENT_SHADER,
+                                                                  InstancedBatch.FRAGMENT_SHADER))
+
+            glBindAttribLocation(program, 0, b'corner')
+            for location, (name, _, _) in enumerate(InstancedBatch.ATTRIBUTES, start=1):
+                glBindAttribLocation(program, location, name.encode())
+            glLinkProgram(program)
+
+            status = GLint()
+            glGetProgramiv(program, GL_LINK_STATUS, ctypes.byref(status))
+            if not status.value:
+                raise RuntimeError('shader link failed')
+
+            glUseProgram(program)
+            glUniform1i(glGetUniformLocation(program, b'atlas'), 0)
+            glUseProgram(0)
+            InstancedBatch.program = program
+
+        return InstancedBatch.program
+
+    def __init__(self, capacity=256):
+        self.data = numpy.zeros((capacity, InstancedBatch.INSTANCE_SIZE), dtype=numpy.float32)
+        self.alive = numpy.zeros(capacity, dtype=bool)
+        self.orders = numpy.zeros(capacity, dtype=numpy.int64)
+        self.textures = [None] * capacity
+        self.free_slots = list(range(capacity - 1, -1, -1))
+
+        self.draw_slots = numpy.zeros(0, dtype=numpy.int64)
+        # position of each slot in the instance buffer, -1 when not drawn
+        self.positions = numpy.full(capacity, -1, dtype=numpy.int64)
+        self.runs = []
+        self.order_dirty = False
+        self.buffer_dirty = False
+        self.dirty_slots = set()
+
+        self.program = InstancedBatch.link_program()
+
+        corners = (GLfloat * 16)(1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1)
+        self.corner_buffer = GLuint()
+        glGenBuffers(1, ctypes.byref(self.corner_buffer))
+        glBindBuffer(GL_ARRAY_BUFFER, self.corner_buffer)
+        glBufferData(GL_ARRAY_BUFFER, ctypes.sizeof(corners), corners, GL_STATIC_DRAW)
+
+        self.instance_buffer = GLuint()
+        glGenBuffers(1, ctypes.byref(self.instance_buffer))
+
+        # the vertex array keeps the attribute bindings, the instance attributes point to pointed_instance
+        self.vertex_array = GLuint()
+        glGenVertexArrays(1, ctypes.byref(self.vertex_array))
+        glBindVertexArray(self.vertex_array)
+        glEnableVertexAttribArray(0)
+        glVertexAttribPointer(0, 4, GL_FLOAT, GL_FALSE, 0, None)
+        for location in range(1, len(InstancedBatch.ATTRIBUTES) + 1):
+            glEnableVertexAttribArray(location)
+            glVertexAttribDivisor(location, 1)
+        glBindVertexArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.pointed_instance = None
+
+    def __len__(self):
+        return int(numpy.count_nonzero(self.alive))
+
+    def delete(self):
+        """free the buffers and the vertex array, the batch cannot be drawn anymore"""
+        if self.vertex_array is None:
+            return
+        glDeleteVertexArrays(1, ctypes.byref(self.vertex_array))
+        glDeleteBuffers(1, ctypes.byref(self.instance_buffer))
+        glDeleteBuffers(1, ctypes.byref(self.corner_buffer))
+        self.vertex_array = self.instance_buffer = self.corner_buffer = None
+        self.runs = []
+
+    def grow(self):
+        capacity = len(self.alive)
+        self.data = numpy.concatenate((self.data, numpy.zeros_like(self.data)))
+        self.alive = numpy.concatenate((self.alive, numpy.zeros(capacity, dtype=bool)))
+        self.orders = numpy.concatenate((self.orders, numpy.zeros(capacity, dtype=numpy.int64)))
+        self.positions = numpy.concatenate((self.positions, numpy.full(capacity, -1, dtype=numpy.int64)))
+        self.textures.extend([None] * capacity)
+        self.free_slots.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+    def add(self, count, mode, group, *data):
+        """same signature as pyglet.graphics.Batch.add, for textured quads (v3f, t3f and c4f) only"""
+        if count != 4 or mode != GL_QUADS:
+            raise ValueError('instanced batches only draw single quads')
+        if not self.free_slots:
+            self.grow()
+
+        slot = self.free_slots.pop()
+        self.alive[slot] = True
+        self.set_group(slot, group)
+
+        instance = InstanceList(self, slot)
+        attributes = {'v3f': instance.vertices, 't3f': instance.tex_coords, 'c4f': instance.colors}
+        for data_format, values in data:
+            if data_format not in attributes:
+                raise ValueError('unsupported instance attribute format: {}'.format(data_format))
+            attributes[data_format][:] = values
+        return instance
+
+    def migrate(self, vertex_list, mode, group, batch):
+        if batch is not self:
+            raise ValueError('instances cannot migrate to another batch')
+        self.set_group(vertex_list.slot, group)
+
+    def set_group(self, slot, group):
+        self.orders[slot] = group.order
+        self.textures[slot] = group.texture
+        self.order_dirty = True
+
+    def free(self, slot):
+        self.alive[slot] = False
+        self.textures[slot] = None
+        self.free_slots.append(slot)
+        self.order_dirty = True
+
+    def sort(self):
+        """draw order of the instances and the runs of instances sharing a texture"""
+        slots = numpy.flatnonzero(self.alive)
+        texture_ids = numpy.array([self.textures[slot].id for slot in slots], dtype=numpy.int64)
+        permutation = numpy.lexsort((texture_ids, self.orders[slots]))
+        self.draw_slots = slots[permutation]
+        self.positions[:] = -1
+        self.positions[self.draw_slots] = numpy.arange(len(self.draw_slots))
+
+        self.runs = []
+        sorted_ids = texture_ids[permutation]
+        starts = numpy.flatnonzero(numpy.diff(sorted_ids, prepend=-1))
+        ends = numpy.append(starts[1:], len(sorted_ids))
+        for start, end in zip(starts, ends):
+            self.runs.append((int(start), int(end - start), self.textures[self.draw_slots[start]]))
+
+        self.order_dirty = False
+        self.buffer_dirty = True
+
+    def upload(self):
+        """
+        upload the whole instance buffer after a sort, else only the ranges of the changed instances
+        changed instances close in the draw order share a range, most of the buffer changed is uploaded at once
+        """
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_buffer)
+
+        positions = numpy.sort(self.positions[list(self.dirty_slots)])
+        positions = positions[positions >= 0]
+        if self.buffer_dirty:
+            packed = numpy.ascontiguousarray(self.data[self.draw_slots])
+            glBufferData(GL_ARRAY_BUFFER, packed.nbytes, packed.ctypes.data_as(ctypes.c_void_p), GL_DYNAMIC_DRAW)
+        elif 2 * len(positions) > len(self.draw_slots):
+            packed = numpy.ascontiguousarray(self.data[self.draw_slots])
+            glBufferSubData(GL_ARRAY_BUFFER, 0, packed.nbytes, packed.ctypes.data_as(ctypes.c_void_p))
+        elif len(positions):
+            stride = 4 * InstancedBatch.INSTANCE_SIZE
+            breaks = numpy.flatnonzero(numpy.diff(positions) > InstancedBatch.UPLOAD_GAP) + 1
+            for first, last in zip(positions[numpy.append(0, breaks)], positions[numpy.append(breaks - 1, -1)]):
+                packed = numpy.ascontiguousarray(self.data[self.draw_slots[first:last + 1]])
+                glBufferSubData(GL_ARRAY_BUFFER, int(first) * stride, packed.nbytes,
+                                packed.ctypes.data_as(ctypes.c_void_p))
+
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.buffer_dirty = False
+        self.dirty_slots.clear()
+
+    def point_attributes(self, start):
+        """point the instance attributes of the bound vertex array to the instances from start"""
+        if start != self.pointed_instance:
+            stride = 4 * InstancedBatch.INSTANCE_SIZE
+            glBindBuffer(GL_ARRAY_BUFFER, self.instance_buffer)
+            for location, (_, offset, size) in enumerate(InstancedBatch.ATTRIBUTES, start=1):
+                glVertexAttribPointer(location, size, GL_FLOAT, GL_FALSE, stride,
+                                      ctypes.c_void_p(start * stride + 4 * offset))
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            self.pointed_instance = start
+
+    def draw(self):
+        if self.vertex_array is None:
+            return
+        if self.order_dirty:
+            self.sort()
+        if self.buffer_dirty or self.dirty_slots:
+            self.upload()
+        if not self.runs:
+            return
+
+        # same state as EnableAlphaGroup
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glDisable(GL_DEPTH_TEST)
+        glEnable(GL_CULL_FACE)
+        glUseProgram(self.program)
+        glActiveTexture(GL_TEXTURE0)
+        glBindVertexArray(self.vertex_array)
+
+        for start, count, texture in self.runs:
+            glBindTexture(texture.target, texture.id)
+            self.point_attributes(start)
+            glDrawArraysInstanced(GL_TRIANGLE_FAN, 0, 4, count)
+
+        glBindVertexArray(0)
+        glUseProgram(0)
+
+        glDisable(GL_BLEND)
+        glDisable(GL_CULL_FACE)
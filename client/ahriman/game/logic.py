@@ -1,14 +1,19 @@
+import collections
 import functools
+import random
 
-import collections
+import numpy
 
 from ahriman import logger
 from ahriman.constants import GameAction
 
 
 class LogicObject:
-    def __init__(self, owner):
-        self.owner = owner
+    """view on one entry of the logic arrays, kept for coordinate based access"""
+
+    def __init__(self, logic, index):
+        self.logic = logic
+        self.index = index
 
     @staticmethod
     def ownership_check(logic_object, owner):
@@ -16,135 +21,404 @@ class LogicObject:
 
 
 class LogicTile(LogicObject):
-    def __init__(self, tile_type, owner, total_players):
-        super().__init__(owner)
-        self.type = tile_type
-        self.nodes = [0] * total_players
+    @property
+    def type(self):
+        return self.logic.tile_types[self.logic.tile_type[self.index]]
 
-    def update_owner(self, owner, value):
-        # add/remove nodes for a player on this tile
-        self.nodes[owner] += value
-        new_owner = 0
-        ex_aequo = False
-
-        for index in range(1, len(self.nodes)):
-            if self.nodes[index] == self.nodes[new_owner]:
-                ex_aequo = True
-            elif self.nodes[index] > self.nodes[new_owner]:
-                ex_aequo = False
-                new_owner = index
+    @property
+    def owner(self):
+        return int(self.logic.tile_owner[self.index])
 
-        if ex_aequo:
-            new_owner = -1
+    @property
+    def nodes(self):
+        return self.logic.tile_nodes[self.index]
 
-        self.owner = new_owner
+    def update_owner(self, owner, value):
+        # add/remove nodes for a player on this tile
+        self.logic.tile_nodes[self.index, owner] += value
+        self.logic.tile_owner[self.index] = Logic.majority(self.logic.tile_nodes[self.index])
 
 
 class LogicNode(LogicObject):
     # owner: -2 for empty, -1 for black stone
-    def __init__(self, owner):
-        super().__init__(owner)
+    @property
+    def owner(self):
+        return int(self.logic.node_owner[self.index])
+
+    @owner.setter
+    def owner(self, owner):
+        self.logic.node_owner[self.index] = owner
 
 
 class Logic:
-    def __init__(self, total_players=2):
+    """
+    board state stored in dense arrays
+    tiles are indexed by hy * tiles_width + hx, nodes by (hy * nodes_width + hx) * 2 + upper
+    """
+
+    NO_TILE = -1
+    NO_NODE = -3
+
+    # resolved turns kept in the change history for incremental synchronisation
+    HISTORY_LENGTH = 256
+
+    @staticmethod
+    def majority(counts):
+        """owner of a tile given the node count of each player, -1 in case of ex aequo"""
+        new_owner = int(counts.argmax())
+        if numpy.count_nonzero(counts == counts[new_owner]) > 1:
+            return -1
+        return new_owner
+
+    @staticmethod
+    def tile_layout(rows, cols):
+        """coordinates of the tiles of a board, row by row"""
+        for hy in range(rows):
+            for hx in range(cols + hy):
+                yield hx, hy
+        for hy in range(rows, 2 * rows - 1):
+            for hx in range(hy - rows + 1, cols + rows - 1):
+                yield hx, hy
+
+    @staticmethod
+    def tile_nodes(hx, hy):
+        """coordinates of the nodes around a tile"""
+        return (hx, hy, 0), (hx, hy, 1), (hx + 1, hy + 1, 0), (hx + 1, hy + 1, 1), (hx + 1, hy, 0), (hx, hy + 1, 1)
+
+    @staticmethod
+    def layout(rows, cols):
+        """tile and node coordinates of a board, in the order the graphic board creates them"""
+        tiles = list(Logic.tile_layout(rows, cols))
+        nodes = dict.fromkeys(node for tile in tiles for node in Logic.tile_nodes(*tile))
+        return tiles, list(nodes)
+
+    @staticmethod
+    def majorities(counts):
+        """vectorised majority along the last axis of a node count array"""
+        best = counts.max(axis=-1)
+        ex_aequo = numpy.count_nonzero(counts == best[..., None], axis=-1) > 1
+        return numpy.where(ex_aequo, -1, counts.argmax(axis=-1))
+
+    def __init__(self, total_players=2, rows=5, cols=5):
         self.total_players = total_players
-        self.logic_tiles_board = {}
-        self.logic_nodes_board = {}
+        self.rows = rows
+        self.cols = cols
+
+        self.tiles_width = cols + rows - 1
+        self.tiles_height = 2 * rows - 1
+        self.nodes_width = self.tiles_width + 1
+        self.nodes_height = self.tiles_height + 1
+
+        tiles_total = self.tiles_width * self.tiles_height
+        nodes_total = 2 * self.nodes_width * self.nodes_height
+
+        # tile types are stored as indices in tile_types
+        self.tile_types = []
+        self.tile_type = numpy.full(tiles_total, Logic.NO_TILE, dtype=numpy.int8)
+        self.tile_owner = numpy.full(tiles_total, -1, dtype=numpy.int8)
+        self.tile_nodes = numpy.zeros((tiles_total, total_players), dtype=numpy.int16)
+        self.node_owner = numpy.full(nodes_total, Logic.NO_NODE, dtype=numpy.int8)
+
+        # CSR neighbour tables (pointers, indices), rebuilt when tiles or nodes are added
+        self.tile_to_tiles = None
+        self.node_to_tiles = None
+        self.node_to_nodes = None
+        self.padded_tables = {}
+        self.adjacency_dirty = True
+
         self.turn_validated = [False] * total_players
 
-        self.owned_tiles = [0] * total_players
-        self.captures = [0] * total_players
-        self.victory_points = [0] * total_players
+        # number of resolved turns, and (turn, tile indices, node indices) changed by each of the last ones
+        self.turn = 0
+        self.history = collections.deque(maxlen=Logic.HISTORY_LENGTH)
+
+        self.owned_tiles = numpy.zeros(total_players, dtype=numpy.int32)
+        self.captures = numpy.zeros(total_players, dtype=numpy.int32)
+        self.victory_points = numpy.zeros(total_players, dtype=numpy.int32)
+
+    def tile_index(self, coord):
+        """array index of a tile coordinate, -1 if outside of the board"""
+        hx, hy = coord
+        if 0 <= hx < self.tiles_width and 0 <= hy < self.tiles_height:
+            return hy * self.tiles_width + hx
+        return -1
+
+    def node_index(self, coord):
+        """array index of a node coordinate, -1 if outside of the board"""
+        hx, hy, upper = coord
+        if 0 <= hx < self.nodes_width and 0 <= hy < self.nodes_height:
+            return (hy * self.nodes_width + hx) * 2 + int(upper)
+        return -1
+
+    def tile_coord(self, index):
+        hy, hx = divmod(int(index), self.tiles_width)
+        return hx, hy
+
+    def node_coord(self, index):
+        cell, upper = divmod(int(index), 2)
+        hy, hx = divmod(cell, self.nodes_width)
+        return hx, hy, upper
+
+    def has_tile(self, coord):
+        index = self.tile_index(coord)
+        return index >= 0 and self.tile_type[index] != Logic.NO_TILE
+
+    def has_node(self, coord):
+        index = self.node_index(coord)
+        return index >= 0 and self.node_owner[index] != Logic.NO_NODE
+
+    def tile_coords(self):
+        return [self.tile_coord(index) for index in numpy.flatnonzero(self.tile_type != Logic.NO_TILE)]
+
+    def node_coords(self):
+        return [self.node_coord(index) for index in numpy.flatnonzero(self.node_owner != Logic.NO_NODE)]
 
     def __setitem__(self, coord, value):
         if len(coord) == 2:
-            self.logic_tiles_board[coord] = value
+            self.add_tile(coord, value.type, value.owner)
+            self.tile_nodes[self.tile_index(coord)] = value.nodes
         elif len(coord) == 3:
-            self.logic_nodes_board[coord] = value
+            self.add_node(coord, value.owner)
         else:
             raise (ValueError('invalid key length: {}'.format(len(coord))))
 
     def __getitem__(self, coord):
         if isinstance(coord[0], int):
             if len(coord) == 2:
-                return self.logic_tiles_board[coord]
+                if not self.has_tile(coord):
+                    raise KeyError(coord)
+                return LogicTile(self, self.tile_index(coord))
             elif len(coord) == 3:
-                return self.logic_nodes_board[coord]
+                if not self.has_node(coord):
+                    raise KeyError(coord)
+                return LogicNode(self, self.node_index(coord))
             else:
                 raise (ValueError('invalid key length: {}'.format(len(coord))))
         else:
             return [self[item] for item in coord]
 
     def add_node(self, coord, owner):
-        self.logic_nodes_board[coord] = LogicNode(owner)
+        index = self.node_index(coord)
+        if index < 0:
+            raise (ValueError('node out of the board: {}'.format(coord)))
+        self.node_owner[index] = owner
+        self.adjacency_dirty = True
 
     def add_tile(self, tile_coord, tile_name, owner):
-        self.logic_tiles_board[tile_coord] = LogicTile(tile_name, owner, self.total_players)
+        index = self.tile_index(tile_coord)
+        if index < 0:
+            raise (ValueError('tile out of the board: {}'.format(tile_coord)))
+
+        if tile_name not in self.tile_types:
+            self.tile_types.append(tile_name)
+        self.tile_type[index] = self.tile_types.index(tile_name)
+        self.tile_owner[index] = owner
+        self.tile_nodes[index] = 0
+        self.adjacency_dirty = True
+
+    def init_board(self, tile_coords, node_coords, board_rules):
+        """fill the board with tiles drawn symmetrically from the init weights of the rules"""
+        # TODO is this half splitting necessary? NO
+        tile_coords = list(tile_coords)
+        total_half = len(tile_coords) // 2
+        total_weight = sum(board_rules['init'].values())
+
+        left_half = []
+        for tile, weight in board_rules['init'].items():
+            stack = [tile] * int(round(total_half * weight / total_weight))
+            left_half.extend(stack)
+
+        if len(left_half) < total_half:
+            left_half.extend([list(board_rules['init'])[0]] * (total_half - len(left_half)))
+        elif len(left_half) > total_half:
+            left_half.pop()
+
+        right_half = list(left_half)
+        random.shuffle(right_half)
+        random.shuffle(left_half)
+
+        for coord in tile_coords:
+            if coord[1] == 2 * coord[0] + 1 - self.cols:
+                if coord[1] < self.rows - 1:
+                    self.add_tile(coord, right_half.pop(), -1)
+                elif coord[1] > self.rows - 1:
+                    self.add_tile(coord, left_half.pop(), -1)
+                else:
+                    self.add_tile(coord, board_rules['fill'], -1)
+            elif coord[1] < 2 * coord[0] + 1 - self.cols:
+                self.add_tile(coord, right_half.pop(), -1)
+            elif coord[1] > 2 * coord[0] + 1 - self.cols or coord[1] > self.rows:
+                self.add_tile(coord, left_half.pop(), -1)
+
+        for coord in node_coords:
+            self.add_node(coord, -2)
+
+        self.build_adjacency()
+
+    @staticmethod
+    def compress(candidates, valid):
+        """pack a (sources, k) candidate matrix into CSR pointers and neighbour indices"""
+        pointers = numpy.zeros(len(candidates) + 1, dtype=numpy.int32)
+        numpy.cumsum(numpy.count_nonzero(valid, axis=1), out=pointers[1:])
+        return pointers, candidates[valid].astype(numpy.int32)
+
+    def build_adjacency(self):
+        """precompute the tile->tile, node->tile and node->node neighbour index arrays"""
+        tile_present = (self.tile_type != Logic.NO_TILE).tobytes()
+        node_present = (self.node_owner != Logic.NO_NODE).tobytes()
+        tables = Logic.adjacency_tables(self.rows, self.cols, tile_present, node_present)
+        self.tile_to_tiles, self.node_to_tiles, self.node_to_nodes = tables
+
+        self.padded_tables = {}
+        self.adjacency_dirty = False
+
+    @staticmethod
+    @functools.lru_cache(maxsize=16)
+    def adjacency_tables(rows, cols, tile_present, node_present):
+        """CSR neighbour tables of a board layout, shared (read-only) by every Logic with the same layout"""
+        tiles_width = cols + rows - 1
+        tiles_height = 2 * rows - 1
+        nodes_width = tiles_width + 1
+        nodes_height = tiles_height + 1
+        tile_present = numpy.frombuffer(tile_present, dtype=bool)
+        node_present = numpy.frombuffer(node_present, dtype=bool)
+
+        tiles = numpy.arange(len(tile_present))
+        tile_x = (tiles % tiles_width)[:, None]
+        tile_y = (tiles // tiles_width)[:, None]
+
+        nodes = numpy.arange(len(node_present))
+        upper = (nodes % 2)[:, None]
+        node_x = (nodes // 2 % nodes_width)[:, None]
+        node_y = (nodes // 2 // nodes_width)[:, None]
+
+        def tile_candidates(x, y, present):
+            inside = (x >= 0) & (x < tiles_width) & (y >= 0) & (y < tiles_height)
+            candidates = numpy.where(inside, y * tiles_width + x, 0)
+            return candidates, inside & tile_present[candidates] & present
+
+        candidates, valid = tile_candidates(tile_x + [1, -1, 0, 0, 1, -1], tile_y + [0, 0, 1, -1, 1, -1],
+                                            tile_present[:, None])
+        tile_to_tiles = Logic.compress(candidates, valid)
+
+        # a node touches its own tile, the one below-left, and a third one depending on its side
+        zeros = numpy.zeros_like(upper)
+        candidates, valid = tile_candidates(node_x + numpy.hstack((zeros, zeros - 1, upper - 1)),
+                                            node_y + numpy.hstack((zeros, zeros - 1, -upper)), node_present[:, None])
+        node_to_tiles = Logic.compress(candidates, valid)
+
+        up = 1 - upper
+        sign = 1 - 2 * up
+        x = node_x + sign * [0, 1, 0]
+        y = node_y + sign * [0, 0, -1]
+        inside = (x >= 0) & (x < nodes_width) & (y >= 0) & (y < nodes_height)
+        candidates = numpy.where(inside, (y * nodes_width + x) * 2 + up, 0)
+        node_to_nodes = Logic.compress(candidates, inside & node_present[candidates] & node_present[:, None])
+
+        tables = (tile_to_tiles, node_to_tiles, node_to_nodes)
+        for table in tables:
+            for array in table:
+                array.flags.writeable = False
+        return tables
+
+    def neighbours(self, adjacency, index):
+        """neighbour indices of an array index in one of the adjacency tables"""
+        if self.adjacency_dirty:
+            self.build_adjacency()
+        pointers, indices = getattr(self, adjacency)
+        return indices[pointers[index]:pointers[index + 1]]
+
+    def padded_neighbours(self, adjacency):
+        """one of the adjacency tables as a (sources, max_degree) matrix filled with -1"""
+        if self.adjacency_dirty:
+            self.build_adjacency()
+        if adjacency not in self.padded_tables:
+            pointers, indices = getattr(self, adjacency)
+            degree = numpy.diff(pointers)
+            table = numpy.full((len(degree), max(int(degree.max()), 1)), -1, dtype=numpy.int32)
+            table[numpy.arange(table.shape[1]) < degree[:, None]] = indices
+            self.padded_tables[adjacency] = table
+        return self.padded_tables[adjacency]
 
     def adjacent_tiles(self, coord):
         if len(coord) == 2:
-            increments = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, -1)]
+            index = self.tile_index(coord)
+            adjacency = 'tile_to_tiles'
         elif len(coord) == 3:
-            increments = [(0, 0), (-1, -1), (0, -1) if coord[2] else (-1, 0)]
+            index = self.node_index(coord)
+            adjacency = 'node_to_tiles'
         else:
             raise (ValueError('incorrect coordinate length: {} - expected [2, 3]'.format(len(coord))))
 
-        return [(coord[0] + dx, coord[1] + dy) for dx, dy in increments if
-                ((coord[0] + dx, coord[1] + dy) in self.logic_tiles_board)]
+        if index < 0:
+            return []
+        return [self.tile_coord(tile) for tile in self.neighbours(adjacency, index)]
 
     def adjacent_nodes(self, node_coord):
-        up = int(not node_coord[2])
-        increments = [(0, 0), (1, 0), (0, -1)]
-        if up:
-            increments = [(-dx, -dy) for (dx, dy) in increments]
-
-        return [(node_coord[0] + dx, node_coord[1] + dy, up) for dx, dy in increments if
-                ((node_coord[0] + dx, node_coord[1] + dy, up) in self.logic_nodes_board)]
+        index = self.node_index(node_coord)
+        if index < 0:
+            return []
+        return [self.node_coord(node) for node in self.neighbours('node_to_nodes', index)]
 
     def can_perform(self, player, action, coord):
         if action == GameAction.CONQUER:
-            if len(coord) != 3:
+            if len(coord) != 3 or not self.has_node(coord):
                 return False
-            if self.logic_nodes_board[coord].owner != -2:
+            node = self.node_index(coord)
+            if self.node_owner[node] != -2:
                 return False
             if self.owned_tiles[player] == 0:
                 return True
 
-            owner_check = functools.partial(LogicObject.ownership_check, owner=player)
-            adjacent = self[self.adjacent_tiles(coord)]
-            ownership = map(owner_check, adjacent)
-            return any(ownership)
+            return bool(numpy.any(self.tile_owner[self.neighbours('node_to_tiles', node)] == player))
 
         raise (TypeError('unknown action: {}'.format(action)))
 
-    def change_node_owner(self, node, new_owner):
-        old_owner = self.logic_nodes_board[node].owner
-        self.logic_nodes_board[node].owner = new_owner
-        to_update = set()
-        to_update.add(node)
+    def conquerable(self, player):
+        """indices of the nodes the player can conquer, vectorised version of can_perform"""
+        empty = self.node_owner == -2
+        if self.owned_tiles[player] == 0:
+            return numpy.flatnonzero(empty)
 
-        for tile_coord in self.adjacent_tiles(node):
-            tile = self.logic_tiles_board[tile_coord]
-            old_tile_owner = tile.owner
+        adjacent = self.padded_neighbours('node_to_tiles')
+        owned = (self.tile_owner[numpy.maximum(adjacent, 0)] == player) & (adjacent >= 0)
+        return numpy.flatnonzero(empty & owned.any(axis=-1))
+
+    def set_node_owner(self, node, new_owner):
+        """change the owner of a node given by its index, returns the indices of the tiles that changed owner"""
+        old_owner = int(self.node_owner[node])
+        self.node_owner[node] = new_owner
+        changed_tiles = []
+
+        for tile in self.neighbours('node_to_tiles', node):
+            old_tile_owner = int(self.tile_owner[tile])
 
             if new_owner >= 0:
-                tile.update_owner(new_owner, 1)
+                self.tile_nodes[tile, new_owner] += 1
 
             if old_owner >= 0:
-                tile.update_owner(old_owner, -1)
+                self.tile_nodes[tile, old_owner] -= 1
 
-            if old_tile_owner != tile.owner:
-                to_update.add(tile_coord)
+            tile_owner = Logic.majority(self.tile_nodes[tile])
+            self.tile_owner[tile] = tile_owner
+
+            if old_tile_owner != tile_owner:
+                changed_tiles.append(int(tile))
                 if old_tile_owner >= 0:
                     self.owned_tiles[old_tile_owner] -= 1
-                if tile.owner >= 0:
-                    self.owned_tiles[tile.owner] += 1
+                if tile_owner >= 0:
+                    self.owned_tiles[tile_owner] += 1
+
+        return changed_tiles
 
+    def change_node_owner(self, node, new_owner):
+        to_update = {self.tile_coord(tile) for tile in self.set_node_owner(self.node_index(node), new_owner)}
+        to_update.add(node)
         return to_update
 
     def resolve(self, actions):
-        to_update = set()
+        updated_tiles = set()
+        updated_nodes = set()
         check_capture = set()
         for player, action_tuple in enumerate(actions):
             action, coord = action_tuple
@@ -159,37 +433,195 @@ class Logic:
                     if actions[index] == action_tuple:
                         actions[index] = (GameAction.RESOLVED, actions[index][1])
                         conflict = True
+
+                node = self.node_index(coord)
+                updated_nodes.add(node)
                 if conflict:
-                    self.logic_nodes_board[coord].owner = -1
-                    to_update.add(coord)
+                    self.node_owner[node] = -1
                 else:
-                    to_update |= self.change_node_owner(coord, player)
-                    check_capture.add(coord)
-                    check_capture |= set(self.adjacent_nodes(coord))
+                    updated_tiles.update(self.set_node_owner(node, player))
+                    check_capture.add(node)
+                    check_capture.update(self.neighbours('node_to_nodes', node).tolist())
 
             else:
                 logger.error('unrecognized action - {}'.format(action), 'in Logic.resolve')
 
-        to_capture = set()
+        to_capture = []
         for node in check_capture:
-            if self[node].owner < 0:
+            node_owner = self.node_owner[node]
+            if node_owner < 0:
                 continue
 
-            adjacent_nodes = [node_object.owner for node_object in self[self.adjacent_nodes(node)] if
-                              node_object.owner >= 0 and node_object.owner != self[node].owner]
+            adjacent_owners = self.node_owner[self.neighbours('node_to_nodes', node)]
+            opponents = adjacent_owners[(adjacent_owners >= 0) & (adjacent_owners != node_owner)]
 
-            count = collections.Counter(adjacent_nodes)
-            if len(count) > 0:
-                player = max(count, key=count.get)
-                if count[player] >= 2:
-                    to_capture.add(node)
-                    self.captures[player] += 1
+            # a node has at most 3 neighbours, so at most one player can surround it
+            count = numpy.bincount(opponents, minlength=self.total_players)
+            player = int(count.argmax())
+            if count[player] >= 2:
+                to_capture.append(node)
+                self.captures[player] += 1
 
         for node in to_capture:
-            to_update |= self.change_node_owner(node, -2)
+            updated_tiles.update(self.set_node_owner(node, -2))
+        updated_nodes.update(to_capture)
 
-        self.victory_points = [self.captures[player] + self.owned_tiles[player] for player in
-                               range(len(self.victory_points))]
+        self.victory_points = self.captures + self.owned_tiles
+
+        self.turn += 1
+        self.history.append((self.turn, numpy.fromiter(updated_tiles, dtype=numpy.int64, count=len(updated_tiles)),
+                             numpy.fromiter(updated_nodes, dtype=numpy.int64, count=len(updated_nodes))))
 
         self.turn_validated = [False] * self.total_players
-        return to_update
+        return {self.tile_coord(tile) for tile in updated_tiles} | {self.node_coord(node) for node in updated_nodes}
+
+    def changes_since(self, turn):
+        """
+        indices of the tiles and nodes changed after a given turn
+        :return: (tile indices, node indices), None if the history does not go back that far
+        """
+        if turn is None or turn > self.turn:
+            return None
+        if turn < self.turn and (len(self.history) == 0 or self.history[0][0] > turn + 1):
+            return None
+
+        changes = [entry for entry in self.history if entry[0] > turn]
+        tiles = numpy.unique(numpy.concatenate([entry[1] for entry in changes] + [numpy.zeros(0, dtype=numpy.int64)]))
+        nodes = numpy.unique(numpy.concatenate([entry[2] for entry in changes] + [numpy.zeros(0, dtype=numpy.int64)]))
+        return tiles, nodes
+
+
+class LogicBatch:
+    """
+    many independent games sharing the board layout of a template Logic, stacked along the first axis
+    actions are given as an (games, players) array of node indices, -1 for no action
+    """
+
+    def __init__(self, template, games):
+        self.total_players = template.total_players
+        self.games = games
+
+        self.tile_type = template.tile_type.copy()
+        self.tile_present = self.tile_type != Logic.NO_TILE
+        self.node_to_tiles = template.padded_neighbours('node_to_tiles')
+        self.node_to_nodes = template.padded_neighbours('node_to_nodes')
+
+        self.tile_owner = numpy.repeat(template.tile_owner[None], games, axis=0)
+        self.tile_nodes = numpy.repeat(template.tile_nodes[None], games, axis=0)
+        self.node_owner = numpy.repeat(template.node_owner[None], games, axis=0)
+
+        self.owned_tiles = numpy.repeat(template.owned_tiles[None], games, axis=0)
+        self.captures = numpy.repeat(template.captures[None], games, axis=0)
+        self.victory_points = numpy.repeat(numpy.asarray(template.victory_points)[None], games, axis=0)
+
+    @staticmethod
+    def stack(logics):
+        """batch built from several games played on the same board layout"""
+        batch = LogicBatch(logics[0], len(logics))
+        for game, logic in enumerate(logics):
+            batch.tile_owner[game] = logic.tile_owner
+            batch.tile_nodes[game] = logic.tile_nodes
+            batch.node_owner[game] = logic.node_owner
+            batch.owned_tiles[game] = logic.owned_tiles
+            batch.captures[game] = logic.captures
+            batch.victory_points[game] = logic.victory_points
+        return batch
+
+    def unstack(self, game, template):
+        """copy the state of one game back into a Logic with the layout of template"""
+        logic = Logic(template.total_players, rows=template.rows, cols=template.cols)
+        logic.tile_types = list(template.tile_types)
+        logic.tile_type[:] = self.tile_type
+        logic.tile_owner[:] = self.tile_owner[game]
+        logic.tile_nodes[:] = self.tile_nodes[game]
+        logic.node_owner[:] = self.node_owner[game]
+        logic.owned_tiles[:] = self.owned_tiles[game]
+        logic.captures[:] = self.captures[game]
+        logic.victory_points = self.victory_points[game].copy()
+        return logic
+
+    def can_perform(self, player):
+        """(games, nodes) mask of the nodes the player can conquer, like Logic.can_perform"""
+        adjacent = self.node_to_tiles
+        owned = (self.tile_owner[:, numpy.maximum(adjacent, 0)] == player) & (adjacent >= 0)
+        first_move = self.owned_tiles[:, player, None] == 0
+        return (self.node_owner == -2) & (first_move | owned.any(axis=-1))
+
+    def move_nodes(self, games, nodes, owners, value):
+        """add value to the node counts of owners on the tiles around nodes, returns the touched tiles"""
+        tiles = self.node_to_tiles[nodes]
+        valid = (tiles >= 0) & (owners >= 0)[:, None]
+        games = numpy.broadcast_to(games[:, None], tiles.shape)[valid]
+        players = numpy.broadcast_to(owners[:, None], tiles.shape)[valid]
+        numpy.add.at(self.tile_nodes, (games, tiles[valid], players), value)
+        return games, tiles[valid]
+
+    def resolve(self, actions):
+        """
+        resolve one turn of every game at once
+        :param actions: (games, players) array of node indices
+        :return: (games, tiles) mask of tiles that changed owner, (games, nodes) mask of updated nodes
+        """
+        actions = numpy.asarray(actions)
+        games = numpy.arange(self.games)
+        updated_tiles = numpy.zeros(self.tile_owner.shape, dtype=bool)
+        updated_nodes = numpy.zeros(self.node_owner.shape, dtype=bool)
+
+        acting = actions >= 0
+        same = (actions[:, :, None] == actions[:, None, :]) & acting[:, :, None] & acting[:, None, :]
+        conflict = acting & (numpy.count_nonzero(same, axis=-1) > 1)
+        conquer = acting & ~conflict
+
+        # black stones on conflicting nodes
+        conflict_games = numpy.broadcast_to(games[:, None], actions.shape)[conflict]
+        self.node_owner[conflict_games, actions[conflict]] = -1
+        updated_nodes[conflict_games, actions[conflict]] = True
+
+        # conquered nodes move to their new owner
+        conquer_games = numpy.broadcast_to(games[:, None], actions.shape)[conquer]
+        conquer_nodes = actions[conquer]
+        conquer_players = numpy.broadcast_to(numpy.arange(self.total_players), actions.shape)[conquer]
+        old_owners = self.node_owner[conquer_games, conquer_nodes].astype(numpy.int64)
+        self.node_owner[conquer_games, conquer_nodes] = conquer_players
+        updated_nodes[conquer_games, conquer_nodes] = True
+
+        touched = numpy.zeros(self.tile_owner.shape, dtype=bool)
+        touched[self.move_nodes(conquer_games, conquer_nodes, conquer_players, 1)] = True
+        touched[self.move_nodes(conquer_games, conquer_nodes, old_owners, -1)] = True
+
+        # captures are checked on the conquered nodes and their neighbours
+        check = numpy.zeros(self.node_owner.shape, dtype=bool)
+        check[conquer_games, conquer_nodes] = True
+        neighbours = self.node_to_nodes[conquer_nodes]
+        valid = neighbours >= 0
+        check[numpy.broadcast_to(conquer_games[:, None], neighbours.shape)[valid], neighbours[valid]] = True
+
+        node_owner = self.node_owner.astype(numpy.int64)
+        check &= node_owner >= 0
+        adjacent = self.node_to_nodes
+        adjacent_owners = numpy.where(adjacent >= 0, node_owner[:, numpy.maximum(adjacent, 0)], -1)
+        opponents = (adjacent_owners >= 0) & (adjacent_owners != node_owner[:, :, None])
+        count = numpy.stack([numpy.count_nonzero(opponents & (adjacent_owners == player), axis=-1)
+                             for player in range(self.total_players)], axis=-1)
+        captured = check & (count.max(axis=-1) >= 2)
+
+        capture_games, capture_nodes = numpy.nonzero(captured)
+        numpy.add.at(self.captures, (capture_games, count[capture_games, capture_nodes].argmax(axis=-1)), 1)
+        touched[self.move_nodes(capture_games, capture_nodes, node_owner[capture_games, capture_nodes], -1)] = True
+        self.node_owner[capture_games, capture_nodes] = -2
+        updated_nodes[capture_games, capture_nodes] = True
+
+        # owner recount of every touched tile, ex aequo gives no owner
+        touched &= self.tile_present
+        new_owner = numpy.where(touched, Logic.majorities(self.tile_nodes), self.tile_owner)
+
+        updated_tiles[:] = new_owner != self.tile_owner
+        change_games, change_tiles = numpy.nonzero(updated_tiles)
+        old_tile_owner = self.tile_owner[change_games, change_tiles]
+        new_tile_owner = new_owner[change_games, change_tiles]
+        numpy.add.at(self.owned_tiles, (change_games[old_tile_owner >= 0], old_tile_owner[old_tile_owner >= 0]), -1)
+        numpy.add.at(self.owned_tiles, (change_games[new_tile_owner >= 0], new_tile_owner[new_tile_owner >= 0]), 1)
+        self.tile_owner[:] = new_owner
+
+        self.victory_points = self.captures + self.owned_tiles
+        return updated_tiles, updated_nodes
@@ -9,6 +9,7 @@ from pyglet_gui.manager import Manager
 
 from ahriman import strings
 from ahriman.activities.customGUIs import *
+from ahriman.events import Event, SymbolsToggleEvent
 
 
 class Overlay:
@@ -73,10 +74,10 @@ class Overlay:
         return any(manager.is_inside(x, y) for manager in self.managers)
 
     def press_end_turn(self, is_pressed):
-        self.window.fire_event((constants.Event.PLAYER_EVENT, constants.PlayerEvent.END_TURN))
+        self.window.fire_event(Event(constants.Event.PLAYER_EVENT, constants.PlayerEvent.END_TURN))
 
     def press_symbol_toggle(self, is_pressed):
-        self.window.fire_event((constants.Event.PLAYER_EVENT, constants.PlayerEvent.SYMBOLS_TOGGLE, is_pressed))
+        self.window.fire_event(SymbolsToggleEvent(is_pressed))
 
     def draw(self):
         self.window.draw_2D()
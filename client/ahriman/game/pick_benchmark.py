@@ -0,0 +1,157 @@
+import random
+import time
+from math import atan, tan, floor, sqrt, acos, degrees
+
+import numpy
+import pyglet
+
+from ahriman import constants
+from ahriman import logger
+from .board import Board
+
+
+def trigonometric_virtual(project, x, y):
+    """previous Projector.get_virtual, with the ray angle computed by atan and tan"""
+    alpha = - atan(((y / project.height) - 1) * project.tanthet)
+    yv = (project.cam.lz - project.cam.y * ((1 / tan(alpha + project.cam.angle)) - project.cotgam))
+
+    yp = y * project.cosgam
+    xv = (project.cam.lx + project.cam.y * (x - project.width) / (project.R - yp))
+
+    return xv, yv
+
+
+def trigonometric_board_coord(board, x, y):
+    (vx, vy) = trigonometric_virtual(board.project, x, y)
+    hyf = vy / constants.BOARD_Y_STRIDE
+    hxf = (vx / constants.BOARD_X_STRIDE) + constants.BOARD_X_Y_SLOPE * floor(hyf) - (
+            1 - constants.BOARD_X_STRIDE) / 2
+
+    return hxf, hyf
+
+
+def trigonometric_tile_coord(board, x, y):
+    """previous Board.mouse_to_tile_coord"""
+    hxf, hyf = trigonometric_board_coord(board, x, y)
+
+    if hyf % 1 < 0.5:
+        hyf2 = hyf - abs(hxf % 1 - 0.5) * sqrt(3) / 3
+        if floor(hyf2) != floor(hyf):
+            hxf -= constants.BOARD_X_Y_SLOPE
+            hyf = hyf2
+
+    hy = floor(hyf)
+    hx = floor(hxf)
+
+    if (hx, hy) in board.tiles:
+        return hx, hy
+
+    return None
+
+
+def trigonometric_node_coord(board, x, y):
+    """previous Board.mouse_to_node_coord, with the sector found from the angle"""
+    hxf, hyf = trigonometric_board_coord(board, x, y)
+    fx, fy = floor(hxf), floor(hyf)
+
+    trigo_x = (hxf % 1) * sqrt(3) / 2 - sqrt(3) / 4
+    trigo_y = (hyf % 1) * 0.75 - 0.5
+    vector_norm = sqrt(trigo_x ** 2 + trigo_y ** 2)
+    if vector_norm < Board.NODE_SELECT_MIN_DIST:
+        return None
+
+    cosine = trigo_x / vector_norm
+    angle = degrees(acos(cosine))
+
+    if Board.NODE_SELECT_ANGLE_MARGIN < angle < 60 - Board.NODE_SELECT_ANGLE_MARGIN:
+        if trigo_y > 0:
+            node = (fx + 1, fy + 1, 1)
+        else:
+            node = (fx + 1, fy, 0)
+    elif 60 + Board.NODE_SELECT_ANGLE_MARGIN < angle < 120 - Board.NODE_SELECT_ANGLE_MARGIN:
+        if trigo_y > 0:
+            node = (fx + 1, fy + 1, 0)
+        else:
+            node = (fx, fy, 1)
+    elif 120 + Board.NODE_SELECT_ANGLE_MARGIN < angle < 180 - Board.NODE_SELECT_ANGLE_MARGIN:
+        if trigo_y > 0:
+            node = (fx, fy + 1, 1)
+        else:
+            node = (fx, fy, 0)
+    else:
+        return None
+
+    if node in board.nodes:
+        return node
+    return None
+
+
+def picks_per_second(pick, points):
+    start = time.perf_counter()
+    for x, y in points:
+        pick(x, y)
+    return len(points) / (time.perf_counter() - start)
+
+
+def mouse_path(rng, width, height, points, max_step=4):
+    """positions of a mouse moving across the window, as received by the motion events"""
+    x, y = width // 2, height // 2
+    path = []
+    for _ in range(points):
+        x = min(max(x + rng.randint(-max_step, max_step), 0), width - 1)
+        y = min(max(y + rng.randint(-max_step, max_step), 0), height - 1)
+        path.append((x, y))
+    return path
+
+
+def pick_benchmark(points=50000, size=20, seed=0):
+    """
+    compare the board picking functions to the previous trigonometric ones on random mouse positions,
+    and the cached tile picking to the uncached one on the path of a moving mouse
+    """
+    window = pyglet.window.Window(800, 500, visible=False)
+    board = Board(window, rows=size, cols=size)
+
+    rng = random.Random(seed)
+    positions = [(rng.randrange(window.width), rng.randrange(window.height)) for _ in range(points)]
+    path = mouse_path(rng, window.width, window.height, points)
+
+    mismatches = sum(board.pick_tile(x, y)[0] != trigonometric_tile_coord(board, x, y)
+                     or board.mouse_to_node_coord(x, y) != trigonometric_node_coord(board, x, y) for x, y in positions)
+    logger.info('{} different picks on {} positions'.format(mismatches, points), title='picking')
+
+    picks = 0
+    mismatches = 0
+    for x, y in path:
+        last_pick = board.last_pick
+        mismatches += board.mouse_to_tile_coord(x, y) != board.pick_tile(x, y)[0]
+        picks += board.last_pick is not last_pick
+    logger.info('{} different picks on {} positions of a moving mouse, {:.1%} read from the last pick'.format(
+        mismatches, points, 1 - picks / points), title='cached tile picking')
+
+    timings = (('previous node picking', lambda x, y: trigonometric_node_coord(board, x, y), positions),
+               ('node picking', board.mouse_to_node_coord, positions),
+               ('previous tile picking', lambda x, y: trigonometric_tile_coord(board, x, y), positions),
+               ('tile picking', board.pick_tile, positions),
+               ('tile picking, moving mouse', board.pick_tile, path),
+               ('cached tile picking, moving mouse', board.mouse_to_tile_coord, path))
+    for title, pick, picked in timings:
+        board.last_pick = None
+        logger.info('{:.0f} picks per second'.format(picks_per_second(pick, picked)), title=title)
+
+    xs, ys = numpy.array(positions).T
+    start = time.perf_counter()
+    hx, hy, upper, found = board.mouse_to_node_coords(xs, ys)
+    elapsed = time.perf_counter() - start
+
+    bulk_nodes = [(int(hx[i]), int(hy[i]), int(upper[i])) if found[i] else None for i in range(points)]
+    mismatches = sum(node != board.mouse_to_node_coord(x, y) for node, (x, y) in zip(bulk_nodes, positions))
+    logger.info('{:.0f} picks per second, {} different picks'.format(points / elapsed, mismatches),
+                title='bulk node picking')
+
+    board.delete()
+    window.close()
+
+
+if __name__ == '__main__':
+    pick_benchmark()
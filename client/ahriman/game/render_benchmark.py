@@ -0,0 +1,70 @@
+import random
+import time
+
+import pyglet
+from pyglet.gl import *
+
+from ahriman import logger
+from ahriman.constants import RenderMode
+from .board import Board
+from .clock import AnimationClock
+from .game import Game
+from .gameTex import TextureManager, TextureScheduler
+from .logic import Logic
+
+
+def filled_board(window, size, render_mode, seed=0):
+    """board of size x size generated like Game.init_board, with random owners"""
+    rng = random.Random(seed)
+    board = Board(window, rows=size, cols=size, render_mode=render_mode)
+    logic = Logic(2, rows=size, cols=size)
+    logic.init_board(board.tiles.keys(), board.nodes.keys(), Game.RULES_DICT['board'])
+
+    for coord, tile in board.tiles.items():
+        tile.set_object(Game.OBJECTS_DICT['tiles'][logic[coord].type], rng.randrange(-1, 2))
+    for node in board.nodes.values():
+        node.set_object(Game.OBJECTS_DICT['nodes'][Game.RULES_DICT['board']['node_object']], rng.randrange(-2, 2))
+
+    TextureScheduler.update()
+    return board
+
+
+def frame_times(window, board, frames):
+    """:return: (mean, worst) frame time in ms, culling and texture updates included"""
+    times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        board.update(1 / 60, move=False)
+        AnimationClock.tick(1 / 60)
+        TextureScheduler.update()
+        window.clear()
+        board.draw()
+        glFinish()
+        times.append(time.perf_counter() - start)
+    return 1000 * sum(times) / len(times), 1000 * max(times)
+
+
+def render_benchmark(sizes=(5, 20, 60), frames=120):
+    """compare the frame times of the batch and instanced board renderers"""
+    window = pyglet.window.Window(800, 500, visible=False)
+    TextureManager.load_textures()
+    Game.parse_logic()
+
+    for size in sizes:
+        for render_mode in RenderMode:
+            board = filled_board(window, size, render_mode.value)
+            if board.render_mode != render_mode:
+                continue
+
+            # first frame builds the draw lists and uploads the buffers
+            frame_times(window, board, 1)
+            mean, worst = frame_times(window, board, frames)
+            logger.info('{:.2f}ms per frame ({:.2f}ms worst)'.format(mean, worst),
+                        title='{}x{} board, {} rendering'.format(size, size, render_mode.value))
+            board.delete()
+
+    window.close()
+
+
+if __name__ == '__main__':
+    render_benchmark()
@@ -0,0 +1,177 @@
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from os import path
+from threading import Thread
+
+import numpy
+import pyglet
+
+from ahriman import constants
+from ahriman import logger
+from ahriman.decoding import decode_png
+
+
+class DecodedCache:
+    """
+    raw RGBA pixels of decoded images, kept between launches in the local directory
+    frames are concatenated in one data file read through a memory map, the index stores their offsets
+    an entry is valid while the modification time and size of its source file are unchanged
+    """
+
+    VERSION = 1
+    INDEX_FILE = 'index.json'
+    DATA_FILE = 'frames.rgba'
+
+    def __init__(self, directory=constants.TEXTURE_CACHE_PATH):
+        self.directory = directory
+        self.entries = {}
+        self.data = None
+
+        try:
+            with open(path.join(directory, DecodedCache.INDEX_FILE), 'r') as file:
+                index = json.load(file)
+            if index.get('version') == DecodedCache.VERSION and index['entries']:
+                self.data = numpy.memmap(path.join(directory, DecodedCache.DATA_FILE), dtype=numpy.uint8, mode='r')
+                self.entries = index['entries']
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, OSError) as e:
+            logger.warning(e, title='ignoring invalid texture cache')
+            self.entries = {}
+            self.data = None
+
+    @staticmethod
+    def key(file):
+        return path.relpath(file, constants.RESOURCE_PATH)
+
+    @staticmethod
+    def signature(file):
+        stat = os.stat(file)
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def get(self, file):
+        """:return: the cached RGBA image of file, None if missing or outdated"""
+        entry = self.entries.get(DecodedCache.key(file))
+        if entry is None or entry['signature'] != DecodedCache.signature(file):
+            return None
+
+        offset, width, height = entry['offset'], entry['width'], entry['height']
+        if offset + 4 * width * height > len(self.data):
+            return None
+        return pyglet.image.ImageData(width, height, 'RGBA', self.data[offset:offset + 4 * width * height].tobytes())
+
+    def save(self, images):
+        """
+        rewrite the cache with the given images, replacing the previous files atomically
+        :param images: dict of source file -> RGBA ImageData
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        entries = {}
+        offset = 0
+
+        data_file = path.join(self.directory, DecodedCache.DATA_FILE)
+        index_file = path.join(self.directory, DecodedCache.INDEX_FILE)
+        with open(data_file + '.tmp', 'wb') as file:
+            for source, image in images.items():
+                pixels = image.get_data('RGBA', 4 * image.width)
+                file.write(pixels)
+                entries[DecodedCache.key(source)] = {
+                    'signature': DecodedCache.signature(source),
+                    'offset': offset,
+                    'width': image.width,
+                    'height': image.height,
+                }
+                offset += len(pixels)
+
+        with open(index_file + '.tmp', 'w') as file:
+            json.dump({'version': DecodedCache.VERSION, 'entries': entries}, file)
+
+        # data first: a new index never points into an old data file
+        os.replace(data_file + '.tmp', data_file)
+        os.replace(index_file + '.tmp', index_file)
+
+
+class TextureLoader:
+    """
+    decode image files in a process pool, reading the decoded cache first
+    PNG decoding is pure python and holds the GIL, in threads it would only compete with the main thread: the
+    workers are processes returning raw RGBA pixels, turned into images on the main thread in order for the GL upload
+    """
+
+    # priority increment of the workers (where supported): on few cores, the frames of the loading screen come first
+    WORKER_NICENESS = 10
+
+    def __init__(self, files, workers=None):
+        self.files = list(files)
+        self.cache = DecodedCache()
+        self.images = {}
+        self.cache_misses = 0
+
+        # cache hits are read from the memory map right away, the workers are only started for the misses
+        self.pending = [self.cache.get(file) for file in self.files]
+        misses = [index for index, image in enumerate(self.pending) if image is None]
+        self.executor = None
+        if misses:
+            # spawned: forking would copy the OpenGL context and the grpc threads of the client
+            self.executor = ProcessPoolExecutor(max_workers=min(workers or os.cpu_count(), len(misses)),
+                                                mp_context=multiprocessing.get_context('spawn'),
+                                                initializer=getattr(os, 'nice', None),
+                                                initargs=(TextureLoader.WORKER_NICENESS,))
+            for index in misses:
+                self.pending[index] = self.executor.submit(decode_png, self.files[index])
+            self.cache_misses = len(misses)
+        self.next = 0
+
+    @property
+    def done(self):
+        return self.next == len(self.files)
+
+    @staticmethod
+    def decode_file(file):
+        """:return: the RGBA image of an image file"""
+        width, height, pixels = decode_png(file)
+        return pyglet.image.ImageData(width, height, 'RGBA', pixels)
+
+    def collect(self, budget=None):
+        """
+        decoded images, in the order of the files, that are ready
+        :param budget: maximum amount of images returned, None to wait for all the remaining ones
+        :return: list of (file, image)
+        """
+        ready = []
+        while not self.done and (budget is None or len(ready) < budget):
+            image = self.pending[self.next]
+            if not isinstance(image, pyglet.image.ImageData):
+                if budget is not None and not image.done():
+                    break
+                width, height, pixels = image.result()
+                image = pyglet.image.ImageData(width, height, 'RGBA', pixels)
+
+            self.pending[self.next] = None
+            self.images[self.files[self.next]] = image
+            ready.append((self.files[self.next], image))
+            self.next += 1
+
+        if self.done:
+            self.close()
+        return ready
+
+    def close(self):
+        """stop the workers, the cache is rewritten in the background if anything had to be decoded"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+        if self.cache_misses > 0 and self.done:
+            logger.info('{} textures decoded, updating the cache'.format(self.cache_misses))
+            # the memory map of the previous data file is released before replacing it
+            self.cache.data = None
+            Thread(target=self.save_cache, args=(dict(self.images),), name='TextureCache').start()
+            self.cache_misses = 0
+
+    def save_cache(self, images):
+        try:
+            self.cache.save(images)
+        except OSError as e:
+            logger.warning(e, title='could not write the texture cache')
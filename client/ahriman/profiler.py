@@ -0,0 +1,166 @@
+import json
+import os
+from collections import deque
+from threading import get_ident
+from time import perf_counter
+
+import numpy
+
+from ahriman import constants
+from ahriman import logger
+
+
+class NullScope:
+    """scope returned while the profiler is disabled, does nothing"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class Scope:
+    """timed section of code, added to the current frame of the profiler"""
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        Profiler.record(self.name, self.start, perf_counter())
+        return False
+
+
+class Profiler:
+    """
+    frame time instrumentation: named scopes are timed and summed per frame, the totals of the last frames are kept
+    in rolling windows for the statistics of the overlay
+    while tracing, every scope is also recorded as an event of a Chrome trace (chrome://tracing, Perfetto)
+    disabled, a scope costs one attribute lookup and an empty context manager
+    """
+
+    # frames kept in the rolling windows
+    HISTORY = 300
+
+    NULL_SCOPE = NullScope()
+
+    enabled = False
+    tracing = False
+
+    frame_start = None
+    frame_times = deque(maxlen=HISTORY)
+    # per frame totals of the scopes, and totals of the current frame (seconds)
+    scopes = {}
+    current = {}
+    trace = []
+
+    @staticmethod
+    def scope(name):
+        """
+        usage: with Profiler.scope('Board.draw'): ...
+        nested scopes are measured independently, their times are inclusive
+        """
+        if not Profiler.enabled:
+            return Profiler.NULL_SCOPE
+        return Scope(name)
+
+    @staticmethod
+    def record(name, start, end):
+        Profiler.current[name] = Profiler.current.get(name, 0) + end - start
+        if Profiler.tracing:
+            Profiler.trace.append((name, start, end, get_ident()))
+
+    @staticmethod
+    def end_frame():
+        """close the current frame, called once per drawn frame"""
+        if not Profiler.enabled:
+            return
+
+        now = perf_counter()
+        if Profiler.frame_start is not None:
+            Profiler.frame_times.append(now - Profiler.frame_start)
+            if Profiler.tracing:
+                Profiler.trace.append(('frame', Profiler.frame_start, now, get_ident()))
+        Profiler.frame_start = now
+
+        for name, total in Profiler.current.items():
+            if name not in Profiler.scopes:
+                Profiler.scopes[name] = deque(maxlen=Profiler.HISTORY)
+            Profiler.scopes[name].append(total)
+        Profiler.current = {}
+
+    @staticmethod
+    def toggle():
+        Profiler.enabled = not Profiler.enabled
+        Profiler.frame_start = None
+        Profiler.frame_times.clear()
+        Profiler.scopes = {}
+        Profiler.current = {}
+        if not Profiler.enabled and Profiler.tracing:
+            Profiler.stop_trace()
+
+    @staticmethod
+    def toggle_trace():
+        """start recording a trace, or stop and dump the recorded one"""
+        if Profiler.tracing:
+            Profiler.stop_trace()
+        else:
+            if not Profiler.enabled:
+                Profiler.toggle()
+            Profiler.trace = []
+            Profiler.tracing = True
+            logger.info('recording a trace', title='profiler')
+
+    @staticmethod
+    def stop_trace(file=constants.PROFILER_TRACE_FILE):
+        Profiler.tracing = False
+        try:
+            Profiler.dump_trace(file)
+            logger.info('trace of {} events saved to {}'.format(len(Profiler.trace), file), title='profiler')
+        except OSError as e:
+            logger.error(e, title='could not save the profiler trace')
+        Profiler.trace = []
+
+    @staticmethod
+    def dump_trace(file):
+        """write the recorded scopes in the Chrome trace event format"""
+        pid = os.getpid()
+        origin = Profiler.trace[0][1] if Profiler.trace else 0
+        events = [{'name': name, 'cat': 'ahriman', 'ph': 'X', 'pid': pid, 'tid': tid,
+                   'ts': (start - origin) * 1e6, 'dur': (end - start) * 1e6}
+                  for name, start, end, tid in Profiler.trace]
+
+        with open(file, 'w') as trace_file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, trace_file)
+
+    @staticmethod
+    def histogram(name, bins=20):
+        """:return: (counts, edges in ms) of the totals per frame of a scope in the rolling window"""
+        return numpy.histogram(1000 * numpy.array(Profiler.scopes[name]), bins=bins)
+
+    @staticmethod
+    def summary(top=5):
+        """
+        statistics of the rolling window
+        :return: (fps, p50 frame time, p99 frame time, [(scope, mean, p99)] of the slowest scopes), times in ms
+        """
+        if not Profiler.frame_times:
+            return 0, 0, 0, []
+
+        frame_times = 1000 * numpy.array(Profiler.frame_times)
+        p50, p99 = numpy.percentile(frame_times, (50, 99))
+
+        scopes = []
+        for name, totals in Profiler.scopes.items():
+            totals = 1000 * numpy.array(totals)
+            scopes.append((name, totals.mean(), numpy.percentile(totals, 99)))
+        scopes.sort(key=lambda scope: scope[1], reverse=True)
+
+        return 1000 / frame_times.mean(), p50, p99, scopes[:top]
@@ -0,0 +1,16 @@
+from ahriman import constants
+
+
+def headless():
+    """
+    use the game logic without the pyglet graphics, before the modules of this package import ahriman.game
+    called by the entry points and the worker processes, never on import
+    """
+    constants.HEADLESS = True
+
+
+def main():
+    """self-play simulation entry point (ahriman-simulation, python -m ahriman.simulation)"""
+    headless()
+    from .runner import main as run
+    run()
@@ -0,0 +1,4 @@
+from ahriman.simulation import main
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+import pickle
+import random
+import timeit
+
+from ahriman import logger
+from ahriman.constants import GameAction
+from ahriman.simulation import headless
+
+
+def played_logic(rows, cols, turns, seed=0):
+    """board of the given size after some turns between random bots"""
+    # imported once the entry point made the game headless
+    from ahriman.game.logic import Logic
+    from .bots import RandomBot
+    from .runner import load_rules
+
+    random.seed(seed)
+    rules = load_rules()['board']
+    logic = Logic(2, rows=rows, cols=cols)
+    logic.init_board(*Logic.layout(rows, cols), rules)
+    bots = [RandomBot(player, random.Random(seed + player)) for player in range(2)]
+
+    for _ in range(turns):
+        moves = [bot.play(logic) for bot in bots]
+        if None in moves:
+            break
+        logic.resolve([(GameAction.CONQUER, move) for move in moves])
+
+    return logic
+
+
+def serialization_benchmark(sizes=((5, 5), (20, 20), (60, 60)), turns=50, number=200):
+    """compare payload size and encode/decode time of BoardState snapshots and deltas against pickle"""
+    from ahriman.game.board_state import BoardState
+
+    for rows, cols in sizes:
+        logic = played_logic(rows, cols, turns)
+        pickled = pickle.dumps(logic)
+        encoded = BoardState.encode(logic)
+
+        times = {
+            'pickle.dumps': timeit.timeit(lambda: pickle.dumps(logic), number=number),
+            'pickle.loads': timeit.timeit(lambda: pickle.loads(pickled), number=number),
+            'encode': timeit.timeit(lambda: BoardState.encode(logic), number=number),
+            'decode': timeit.timeit(lambda: BoardState.decode(encoded), number=number),
+        }
+
+        delta = BoardState.encode_delta(logic, max(logic.turn - 5, 0))
+
+        logger.info('pickle {} bytes, board state {} bytes ({:.1f}x smaller), delta of 5 turns {} bytes'.format(
+            len(pickled), len(encoded), len(pickled) / len(encoded), len(delta)), title='{}x{} board'.format(rows, cols))
+        logger.info(', '.join('{} {:.1f}us'.format(name, 1e6 * total / number) for name, total in times.items()),
+                    title='{}x{} board'.format(rows, cols))
+
+
+if __name__ == '__main__':
+    headless()
+    serialization_benchmark()
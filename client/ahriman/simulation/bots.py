@@ -0,0 +1,81 @@
+import random
+from abc import ABCMeta
+from abc import abstractmethod
+
+import numpy
+
+from ahriman.game.logic import Logic
+
+
+class Bot(metaclass=ABCMeta):
+    """self-play bot choosing one node to conquer per turn"""
+
+    def __init__(self, player, rng=None):
+        self.player = player
+        self.random = rng if rng is not None else random.Random()
+
+    @abstractmethod
+    def choose(self, logic, candidates):
+        """:return: the index of the node to conquer among the candidates (conquerable node indices)"""
+        pass
+
+    def play(self, logic):
+        """
+        pick the next move of the bot
+        :return: node coordinate to conquer, None if the bot cannot play
+        """
+        candidates = logic.conquerable(self.player)
+        if len(candidates) == 0:
+            return None
+
+        return logic.node_coord(self.choose(logic, candidates))
+
+
+class RandomBot(Bot):
+    """conquers any legal node"""
+
+    def choose(self, logic, candidates):
+        return candidates[self.random.randrange(len(candidates))]
+
+
+class GreedyBot(Bot):
+    """conquers the node with the best immediate gain in tiles and captures"""
+
+    def choose(self, logic, candidates):
+        player = self.player
+        scores = numpy.zeros(len(candidates))
+
+        # tiles won or taken from another player once the node is added
+        tiles = logic.padded_neighbours('node_to_tiles')[candidates]
+        valid = tiles >= 0
+        counts = logic.tile_nodes[numpy.maximum(tiles, 0)].astype(numpy.int32)
+        counts[..., player] += 1
+        new_owner = Logic.majorities(counts)
+        old_owner = logic.tile_owner[numpy.maximum(tiles, 0)]
+        gain = (new_owner == player).astype(int) - (old_owner == player)
+        gain += (old_owner >= 0) & (old_owner != player) & (new_owner != old_owner)
+        scores += (gain * valid).sum(axis=-1)
+
+        # opponent nodes that would be surrounded, and the risk of being surrounded
+        node_to_nodes = logic.padded_neighbours('node_to_nodes')
+        adjacent = node_to_nodes[candidates]
+        adjacent_owner = numpy.where(adjacent >= 0, logic.node_owner[numpy.maximum(adjacent, 0)], -2)
+        around = node_to_nodes[numpy.maximum(adjacent, 0)]
+        around_owner = numpy.where(around >= 0, logic.node_owner[numpy.maximum(around, 0)], -2)
+        surrounding = numpy.count_nonzero(around_owner == player, axis=-1) + 1
+        scores += numpy.count_nonzero((adjacent_owner >= 0) & (adjacent_owner != player) & (surrounding >= 2),
+                                      axis=-1)
+
+        opponents = (adjacent_owner >= 0) & (adjacent_owner != player)
+        for opponent in range(logic.total_players):
+            if opponent != player:
+                scores -= numpy.count_nonzero(opponents & (adjacent_owner == opponent), axis=-1) >= 2
+
+        best_moves = numpy.flatnonzero(scores == scores.max())
+        return candidates[best_moves[self.random.randrange(len(best_moves))]]
+
+
+BOTS = {
+    'random': RandomBot,
+    'greedy': GreedyBot,
+}
@@ -0,0 +1,180 @@
+import argparse
+import json
+import multiprocessing
+import random
+import time
+
+import numpy
+
+from ahriman import constants
+from ahriman import logger
+from ahriman.constants import GameAction
+from ahriman.game.logic import Logic, LogicBatch
+from ahriman.simulation import headless
+from .bots import BOTS
+
+DEFAULT_MAX_TURNS = 500
+
+
+def load_rules():
+    """load RULES_DICT and check that the initial tiles exist in OBJECTS_DICT"""
+    with open(constants.LOGIC_RULES, 'r') as file:
+        rules = json.load(file)
+    with open(constants.LOGIC_OBJECTS, 'r') as file:
+        objects = json.load(file)
+
+    for tile in list(rules['board']['init']) + [rules['board']['fill']]:
+        if tile not in objects['tiles']:
+            logger.error(tile, title='unknown tile in rules.json')
+            raise KeyError('invalid rules.json')
+
+    return rules
+
+
+def new_logic(rules, total_players):
+    """board generated like Game.init_board, without the graphic board"""
+    rows = rules['board']['rows']
+    cols = rules['board']['cols']
+    logic = Logic(total_players, rows=rows, cols=cols)
+    logic.init_board(*Logic.layout(rows, cols), rules['board'])
+    return logic
+
+
+def winner(victory_points):
+    """player with the most victory points, -1 for a draw"""
+    return Logic.majority(numpy.asarray(victory_points))
+
+
+def play_game(rules, bot_names, max_turns=DEFAULT_MAX_TURNS, seed=None):
+    """
+    play one game between bots until a player cannot move
+    :return: (winner, turns, victory points)
+    """
+    rng = random.Random(seed)
+    logic = new_logic(rules, len(bot_names))
+    bots = [BOTS[name](player, random.Random(rng.random())) for player, name in enumerate(bot_names)]
+
+    turn = 0
+    while turn < max_turns:
+        moves = [bot.play(logic) for bot in bots]
+        if None in moves:
+            break
+
+        logic.resolve([(GameAction.CONQUER, move) for move in moves])
+        turn += 1
+
+    return winner(logic.victory_points), turn, list(logic.victory_points)
+
+
+def play_batch(rules, total_players, games, max_turns=DEFAULT_MAX_TURNS, seed=None):
+    """
+    play many games between random bots at once with LogicBatch, all on the same generated board
+    :return: list of (winner, turns, victory points)
+    """
+    rng = numpy.random.default_rng(seed)
+    batch = LogicBatch(new_logic(rules, total_players), games)
+    turns = numpy.zeros(games, dtype=int)
+    playing = numpy.ones(games, dtype=bool)
+
+    for _ in range(max_turns):
+        actions = numpy.full((games, total_players), -1)
+        for player in range(total_players):
+            legal = batch.can_perform(player)
+            playing &= legal.any(axis=-1)
+            # random legal node: highest random score among the legal ones
+            actions[:, player] = numpy.where(legal, rng.random(legal.shape), -1).argmax(axis=-1)
+
+        if not playing.any():
+            break
+
+        actions[~playing] = -1
+        batch.resolve(actions)
+        turns += playing
+
+    return [(winner(batch.victory_points[game]), int(turns[game]), list(batch.victory_points[game]))
+            for game in range(games)]
+
+
+def run_chunk(job):
+    """worker entry point, plays a chunk of games in one process"""
+    rules, bot_names, games, max_turns, seed, batch = job
+    if batch:
+        return play_batch(rules, len(bot_names), games, max_turns, seed)
+
+    random.seed(seed)
+    return [play_game(rules, bot_names, max_turns, seed='{}:{}'.format(seed, game)) for game in range(games)]
+
+
+def simulate(games, bot_names=('random', 'random'), processes=None, max_turns=DEFAULT_MAX_TURNS, seed=None,
+             batch=False, chunk_size=64):
+    """
+    play games on all cores and report the results and throughput
+    :param games: total number of games
+    :param bot_names: one bot name from BOTS per player
+    :param processes: worker processes, all cores by default
+    :param batch: resolve games with LogicBatch (random bots only)
+    :return: dict with wins per player, draws, mean turns and games per second
+    """
+    for name in bot_names:
+        if name not in BOTS:
+            raise ValueError('unknown bot: {} - expected one of {}'.format(name, list(BOTS)))
+    if batch and any(name != 'random' for name in bot_names):
+        raise ValueError('batch simulation only supports random bots')
+
+    rules = load_rules()
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+
+    if batch:
+        # vectorised resolution pays off with one large batch per worker
+        chunk_size = max(chunk_size, -(-games // (processes or multiprocessing.cpu_count())))
+
+    jobs = []
+    for chunk, start in enumerate(range(0, games, chunk_size)):
+        jobs.append((rules, tuple(bot_names), min(chunk_size, games - start), max_turns, seed + chunk, batch))
+
+    start_time = time.perf_counter()
+    # spawned workers import this module again: they need the headless game before
+    with multiprocessing.Pool(processes, initializer=headless) as pool:
+        results = [result for chunk in pool.imap_unordered(run_chunk, jobs) for result in chunk]
+    elapsed = time.perf_counter() - start_time
+
+    wins = [0] * len(bot_names)
+    draws = 0
+    for game_winner, _, _ in results:
+        if game_winner >= 0:
+            wins[game_winner] += 1
+        else:
+            draws += 1
+
+    return {
+        'games': len(results),
+        'wins': wins,
+        'draws': draws,
+        'mean_turns': sum(result[1] for result in results) / max(len(results), 1),
+        'seconds': elapsed,
+        'games_per_second': len(results) / elapsed if elapsed > 0 else float('inf'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='headless Ahriman self-play simulation')
+    parser.add_argument('-n', '--games', type=int, default=1000, help='number of games to play')
+    parser.add_argument('-b', '--bots', nargs='+', default=['random', 'random'], choices=sorted(BOTS),
+                        help='one bot per player')
+    parser.add_argument('-p', '--processes', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('-t', '--max-turns', type=int, default=DEFAULT_MAX_TURNS)
+    parser.add_argument('-s', '--seed', type=int, default=None)
+    parser.add_argument('--batch', action='store_true', help='vectorised resolution with LogicBatch')
+    args = parser.parse_args()
+
+    logger.info('playing {} games: {}'.format(args.games, ' vs '.join(args.bots)), title='simulation')
+    report = simulate(args.games, args.bots, processes=args.processes, max_turns=args.max_turns, seed=args.seed,
+                      batch=args.batch)
+
+    for player, wins in enumerate(report['wins']):
+        logger.info('{} wins ({:.1%})'.format(wins, wins / report['games']), title='player {} ({})'.format(
+            player, args.bots[player]))
+    logger.info('{} draws, {:.1f} turns per game'.format(report['draws'], report['mean_turns']), title='simulation')
+    logger.confirm('{:.1f} games per second ({} games in {:.2f}s)'.format(
+        report['games_per_second'], report['games'], report['seconds']), title='simulation')
@@ -1,6 +1,6 @@
-import queue
 from enum import Enum, auto
 from os import path
+from time import perf_counter
 
 import pyglet
 from pyglet.gl import *
@@ -11,6 +11,38 @@ from ahriman import strings
 from ahriman.activities.introActivity import IntroActivity
 from ahriman.activities.popupActivity import PopupActivity
 from ahriman.communication import GameClient
+from ahriman.events import Event, EventBus
+from ahriman.game.clock import AnimationClock
+from ahriman.profiler import Profiler
+
+
+class ProfilerOverlay:
+    """frame rate, frame times and slowest scopes of the profiler, drawn over the window"""
+
+    # seconds between two refreshes of the text
+    REFRESH_DELAY = 0.25
+
+    def __init__(self, window):
+        self.window = window
+        self.label = pyglet.text.Label('', font_size=10, color=(0, 0, 0, 255), x=10, y=window.height - 10,
+                                       anchor_y='top', multiline=True, width=400)
+        self.refresh_time = 0
+
+    def refresh(self):
+        fps, p50, p99, scopes = Profiler.summary()
+        lines = ['{:.0f} fps - frame {:.1f} ms p50, {:.1f} ms p99'.format(fps, p50, p99)]
+        for name, mean, scope_p99 in scopes:
+            lines.append('{}: {:.2f} ms ({:.2f} ms p99)'.format(name, mean, scope_p99))
+        self.label.text = '\n'.join(lines)
+
+    def draw(self):
+        if perf_counter() - self.refresh_time > ProfilerOverlay.REFRESH_DELAY:
+            self.refresh_time = perf_counter()
+            self.refresh()
+
+        self.label.y = self.window.height - 10
+        self.window.draw_2D()
+        self.label.draw()
 
 
 class Window(pyglet.window.Window):
@@ -52,24 +84,24 @@ class Window(pyglet.window.Window):
         # cursor = pyglet.window.ImageMouseCursor(cur_image, 6, 32)
         # self.set_mouse_cursor(cursor)
 
-        self.event_queue = queue.Queue()
-        self.priority_queue = queue.Queue()
+        self.events = EventBus()
+        # events handled by the window itself, the others go to the activity
+        self.handlers = {(constants.Event.WINDOW_EVENT, constants.WindowEvent.ERROR): self.show_error,
+                         (constants.Event.WINDOW_EVENT, constants.WindowEvent.FADE_END): self.end_fade}
         self.gameClient = GameClient(self)
 
         self.activity = IntroActivity(window=self)
+        self.profiler_overlay = ProfilerOverlay(self)
 
         pyglet.clock.schedule_interval(self.update, interval=1 / 120)
 
     def fire_event(self, event, priority=False):
         """
-        put an event in the queue
-        event: (tuple) with event[0] (constants.event)
-        priority: (int) priority level, lowest = most important
+        post an event on the bus, from any thread
+        event: (events.Event) dispatched on its kind and subkind
+        priority: (bool) handled before the other events, regardless of the frame budget
         """
-        if priority:
-            self.priority_queue.put(event)
-        else:
-            self.event_queue.put(event)
+        self.events.post(event, priority)
 
     @property
     def mouse(self):
@@ -149,77 +181,82 @@ class Window(pyglet.window.Window):
         self.activity.on_resize(width, height)
 
     def update(self, dt):
-        try:
-            # first check the event queue until it is empty
-            while True:
-                try:
-                    event = self.priority_queue.get(block=False)
-                except queue.Empty:
-                    event = self.event_queue.get(block=False)
-
-                # these events must be handled by the window itself
-                if event[0] == constants.Event.WINDOW_EVENT:
-                    if event[1] == constants.WindowEvent.ERROR:
-                        bg_activity = self.activity
-                        if self.next_activity is not None:
-                            bg_activity = self.next_activity[0]
-
-                        self.force_activity(
-                            PopupActivity(self, bg_activity, (event[2],), on_true=self.close,
-                                          resume_on_event=False, ok_message=strings.QUIT_BUTTON))
-                        self.error_state = True
-
-                    elif event[1] == constants.WindowEvent.FADE_END:
-                        # transition ended, switch to the next activity
-                        self.change_activity(new_activity=self.next_activity[0],
-                                             fade_in=self.next_activity[1])
-
-                elif not self.error_state:
-                    # event must be handled by the activity
-                    if self.fading == Window.Fading.FADE_OUT:
-                        # if fading out, redirect events to the future activity
-                        self.next_activity[0].event_handler(event)
-                    else:
-                        self.activity.event_handler(event)
-        except queue.Empty:
-            pass
-
-        # update the transition opacity for fades
-        if self.fading == Window.Fading.FADE_OUT:
-            new_alpha = self.fading_alpha + dt * constants.FADING_SPEED
-            if new_alpha > 1:
-                new_alpha = 1
-                self.fire_event((constants.Event.WINDOW_EVENT, constants.WindowEvent.FADE_END))
-                # fading must end, but not to none else opacity will come back to 1 immediately
-                self.fading = Window.Fading.DONE
-            self.fading_alpha = new_alpha
-
-        elif self.fading == Window.Fading.FADE_IN:
-            new_alpha = self.fading_alpha - dt * constants.FADING_SPEED
-            if new_alpha < 0:
-                new_alpha = 0
-                self.fading = Window.Fading.NONE
-            self.fading_alpha = new_alpha
+        with Profiler.scope('Window.update'):
+            with Profiler.scope('Window.events'):
+                self.process_events()
+
+            # update the transition opacity for fades
+            if self.fading == Window.Fading.FADE_OUT:
+                new_alpha = self.fading_alpha + dt * constants.FADING_SPEED
+                if new_alpha > 1:
+                    new_alpha = 1
+                    self.fire_event(Event(constants.Event.WINDOW_EVENT, constants.WindowEvent.FADE_END))
+                    # fading must end, but not to none else opacity will come back to 1 immediately
+                    self.fading = Window.Fading.DONE
+                self.fading_alpha = new_alpha
+
+            elif self.fading == Window.Fading.FADE_IN:
+                new_alpha = self.fading_alpha - dt * constants.FADING_SPEED
+                if new_alpha < 0:
+                    new_alpha = 0
+                    self.fading = Window.Fading.NONE
+                self.fading_alpha = new_alpha
+
+            # card moves are driven by the clock, textures read its frame index when the activity updates
+            AnimationClock.tick(dt)
+            with Profiler.scope('Activity.update'):
+                self.activity.update(dt)
+
+    def process_events(self):
+        for event in self.events.drain():
+            handler = self.handlers.get(event.key)
+            if handler is not None:
+                handler(event)
+
+            elif not self.error_state:
+                # event must be handled by the activity
+                if self.fading == Window.Fading.FADE_OUT:
+                    # if fading out, redirect events to the future activity
+                    self.next_activity[0].event_handler(event)
+                else:
+                    self.activity.event_handler(event)
+
+    def show_error(self, event):
+        bg_activity = self.activity
+        if self.next_activity is not None:
+            bg_activity = self.next_activity[0]
+
+        self.force_activity(
+            PopupActivity(self, bg_activity, (event.message,), on_true=self.close,
+                          resume_on_event=False, ok_message=strings.QUIT_BUTTON))
+        self.error_state = True
 
-        self.activity.update(dt)
+    def end_fade(self, event):
+        # transition ended, switch to the next activity
+        self.change_activity(new_activity=self.next_activity[0], fade_in=self.next_activity[1])
 
     # noinspection PyMethodOverriding
     def on_draw(self):
-        # draw the foreground activity
-        self.clear()
-        self.activity.draw()
-
-        # if transition, draw a rectangle in superposition for the fading effect
-        if self.fading != Window.Fading.NONE:
-            glEnable(GL_BLEND)
-            glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-            glColor4f(*constants.FADING_COLOR, self.fading_alpha)
-            glBegin(GL_QUADS)
-            glVertex2f(0, 0)
-            glVertex2f(self.width, 0)
-            glVertex2f(self.width, self.height)
-            glVertex2f(0, self.height)
-            glEnd()
+        with Profiler.scope('Window.on_draw'):
+            # draw the foreground activity
+            self.clear()
+            self.activity.draw()
+
+            # if transition, draw a rectangle in superposition for the fading effect
+            if self.fading != Window.Fading.NONE:
+                glEnable(GL_BLEND)
+                glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+                glColor4f(*constants.FADING_COLOR, self.fading_alpha)
+                glBegin(GL_QUADS)
+                glVertex2f(0, 0)
+                glVertex2f(self.width, 0)
+                glVertex2f(self.width, self.height)
+                glVertex2f(0, self.height)
+                glEnd()
+
+        if Profiler.enabled:
+            self.profiler_overlay.draw()
+        Profiler.end_frame()
 
     def draw_2D(self):
         """
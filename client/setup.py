@@ -2,8 +2,10 @@ from setuptools import setup, find_packages
 
 requires = [
     'pyglet',
-    'grpcio',
-    'grpcio-tools',
+    # the generated code of ahriman/communication/grpc_proto checks these versions at import
+    'grpcio>=1.84',
+    'grpcio-tools>=1.84',
+    'protobuf>=7.35.1',
     'numpy',
     ]
 
@@ -24,6 +26,7 @@ setup(
     entry_points={
         'console_scripts': [
             'ahriman = ahriman:main',
+            'ahriman-simulation = ahriman.simulation:main',
             ],
 
         },